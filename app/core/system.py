@@ -1,8 +1,14 @@
-from autoop.core.storage import LocalStorage
+import hashlib
+import os
+from functools import partial
+from autoop.core.storage import IO_WORKERS, LocalStorage
 from autoop.core.database import Database
+from autoop.core.sqlite_database import SQLiteDatabase
 from autoop.core.ml.artifact import Artifact
+from autoop.core.ml.columnar import profile
+from autoop.core.ml.dataset import Dataset
 from autoop.core.storage import Storage
-from typing import List
+from typing import List, Optional, Union
 
 
 class ArtifactRegistry():
@@ -15,89 +21,303 @@ class ArtifactRegistry():
     functionalities to handle artifacts efficiently.
 
     """
+    INDEXED_FIELDS = ["type", "name", "version", "tags"]
+
     def __init__(self,
-                 database: Database,
+                 database: Union[Database, SQLiteDatabase],
                  storage: Storage) -> None:
         """
         Initializes the ArtifactRegistry.
 
         Args:
-            database (Database): The database for storing artifact metadata.
+            database (Union[Database, SQLiteDatabase]): The database for
+            storing artifact metadata.
             storage (Storage): The storage system for managing artifact data.
         """
         self._database = database
         self._storage = storage
+        for field in self.INDEXED_FIELDS:
+            self._database.create_index("artifacts", field)
 
     def register(self, artifact: Artifact) -> None:
         """
         Registers an artifact by saving its data in
         storage and its metadata in the database.
 
+        Datasets are profiled on registration, so their schema and column
+        statistics can be read from the metadata without decoding them.
+
         Args:
             artifact (Artifact): The artifact to register
-            including its data and metadata.
+            including its data and metadata. An artifact without data,
+            such as an ingested dataset, must already be stored at its
+            asset path.
         """
-        # save the artifact in the storage
-        self._storage.save(artifact.data, artifact.asset_path)
+        # save the artifact in the storage, unless it was streamed there
+        if artifact.data is not None:
+            self._storage.save(artifact.data, artifact.asset_path)
         # save the metadata in the database
-        entry = {
-            "name": artifact.name,
-            "version": artifact.version,
-            "asset_path": artifact.asset_path,
-            "tags": artifact.tags,
-            "metadata": artifact.metadata,
-            "type": artifact.type,
-        }
-        self._database.set("artifacts", artifact.id, entry)
+        self._database.set("artifacts", artifact.id,
+                           self._registered_entry(artifact))
+
+    def register_many(self, artifacts: List[Artifact],
+                      max_workers: int = None) -> None:
+        """
+        Registers many artifacts at once.
+
+        The data of the artifacts is written to storage in parallel on a
+        thread pool, after which all metadata is written to the database
+        in a single batch.
+
+        Args:
+            artifacts (List[Artifact]): The artifacts to register. As for
+            register, artifacts without data must already be stored.
+            max_workers (int): The number of threads writing the data.
+            Defaults to IO_WORKERS.
+        """
+        self._storage.save_many(
+            [(artifact.data, artifact.asset_path) for artifact in artifacts
+             if artifact.data is not None],
+            max_workers or IO_WORKERS)
+        with self._database.batch():
+            for artifact in artifacts:
+                self._database.set("artifacts", artifact.id,
+                                   self._registered_entry(artifact))
 
-    def list(self, type: str = None) -> List[Artifact]:
+    @property
+    def storage(self) -> Storage:
+        """
+        Getter method for self._storage
+
+        Returns:
+            Storage: The storage holding the data of the artifacts.
+        """
+        return self._storage
+
+    def list(self, type: str = None,
+             load_data: bool = True) -> List[Artifact]:
         """
         Lists all artifacts with an option to filter by type.
 
         Args:
             type (str): The type of artifacts to list.
+            load_data (bool): Whether to load the data of the artifacts,
+            as for find.
 
         Returns:
             List[Artifact]: A list of artifacts matching the specified type.
         """
-        entries = self._database.list("artifacts")
-        artifacts = []
-        for id, data in entries:
-            if type is not None and data["type"] != type:
-                continue
-            artifact = Artifact(
-                name=data["name"],
-                version=data["version"],
-                asset_path=data["asset_path"],
-                tags=data["tags"],
-                metadata=data["metadata"],
-                data=self._storage.load(data["asset_path"]),
-                type=data["type"],
-            )
-            artifacts.append(artifact)
-        return artifacts
+        return self.find(type=type, load_data=load_data)
+
+    def find(self, type: str = None, name: str = None, version: str = None,
+             tag: str = None, load_data: bool = True) -> List[Artifact]:
+        """
+        Finds the artifacts matching all given attributes.
+
+        The lookups go through the database indexes, so only the
+        matching artifacts are touched and their data loaded, with the
+        loads overlapping on a thread pool.
+
+        Args:
+            type (str): The type the artifacts must have.
+            name (str): The name the artifacts must have.
+            version (str): The version the artifacts must have.
+            tag (str): A tag the artifacts must carry.
+            load_data (bool): Whether to load the data of the artifacts.
+            Without it only the metadata is read, such as the names,
+            versions and profiles listed by the pages; the artifacts have
+            no data, and datasets made of them by dataset load it when it
+            is read. Defaults to loading it.
+
+        Returns:
+            List[Artifact]: The matching artifacts, ordered by ID.
+        """
+        entries = [data for _, data in
+                   self._find_entries(type, name, version, tag)]
+        if not load_data:
+            return [self._to_artifact(data, load_data=False)
+                    for data in entries]
+        return self._to_artifacts(entries)
+
+    def dataset(self, artifact: Artifact) -> Dataset:
+        """
+        Converts an artifact to a Dataset whose parent versions, if it is
+        a delta version, are loaded from the registry when it is read.
+        The data of an artifact found without it is loaded the same way.
+
+        Args:
+            artifact (Artifact): A dataset artifact of the registry.
+
+        Returns:
+            Dataset: The dataset.
+        """
+        loader = None
+        if artifact.data is None:
+            loader = partial(self._storage.load, artifact.asset_path)
+        delta = artifact.metadata.get("delta")
+        if delta is None:
+            return Dataset.from_artifact(artifact, loader=loader)
+        return Dataset.from_artifact(
+            artifact, loader=loader,
+            parent=lambda: self.dataset(
+                self.get(delta["parent"], load_data=False)))
+
+    def get_many(self, artifact_ids: List[str]) -> List[Artifact]:
+        """
+        Retrieves many artifacts by their IDs, loading their data
+        concurrently.
 
-    def get(self, artifact_id: str) -> Artifact:
+        Args:
+            artifact_ids (List[str]): The IDs of the artifacts.
+
+        Returns:
+            List[Artifact]: The artifacts, in the order of the IDs.
+        """
+        return self._to_artifacts([
+            self._database.get("artifacts", artifact_id)
+            for artifact_id in artifact_ids
+        ])
+
+    def find_one(self, type: str = None, name: str = None,
+                 version: str = None, tag: str = None,
+                 load_data: bool = True) -> Optional[Artifact]:
+        """
+        Finds the first artifact matching all given attributes.
+
+        Args:
+            type (str): The type the artifact must have.
+            name (str): The name the artifact must have.
+            version (str): The version the artifact must have.
+            tag (str): A tag the artifact must carry.
+            load_data (bool): Whether to load the data of the artifact,
+            as for find.
+
+        Returns:
+            Optional[Artifact]: The artifact with the lowest matching ID,
+            or None if no artifact matches.
+        """
+        entries = self._find_entries(type, name, version, tag)
+        if not entries:
+            return None
+        return self._to_artifact(entries[0][1], load_data=load_data)
+
+    def get(self, artifact_id: str, load_data: bool = True) -> Artifact:
         """
         Retrieves an artifact by its ID loading its data from storage.
 
         Args:
             artifact_id (str): The ID of the artifact to retrieve.
+            load_data (bool): Whether to load the data of the artifact,
+            as for find.
 
         Returns:
             Artifact: The artifact corresponding to the specified ID.
         """
         data = self._database.get("artifacts", artifact_id)
+        return self._to_artifact(data, load_data=load_data)
+
+    def _find_entries(self, type: str, name: str, version: str,
+                      tag: str) -> List[tuple]:
+        """
+        Queries the database for the artifact entries matching the
+        attributes that are not None.
+
+        Returns:
+            List[tuple]: The matching (id, entry) pairs, ordered by ID.
+        """
+        criteria = {"type": type, "name": name, "version": version,
+                    "tags": tag}
+        criteria = {
+            field: value for field, value in criteria.items()
+            if value is not None
+        }
+        return self._database.find("artifacts", **criteria)
+
+    @staticmethod
+    def _to_entry(artifact: Artifact) -> dict:
+        """
+        Builds the database entry holding the metadata of an artifact.
+
+        Args:
+            artifact (Artifact): The artifact to describe.
+
+        Returns:
+            dict: The database entry of the artifact.
+        """
+        return {
+            "name": artifact.name,
+            "version": artifact.version,
+            "asset_path": artifact.asset_path,
+            "tags": artifact.tags,
+            "metadata": artifact.metadata,
+            "type": artifact.type,
+        }
+
+    def _registered_entry(self, artifact: Artifact) -> dict:
+        """
+        Builds the database entry of an artifact being registered, adding
+        the profile and content hash of a dataset that has none yet.
+
+        Args:
+            artifact (Artifact): The artifact being registered.
+
+        Returns:
+            dict: The database entry of the artifact.
+        """
+        entry = self._to_entry(artifact)
+        metadata = entry["metadata"]
+        if artifact.type == "dataset" and artifact.data is not None:
+            if "profile" not in metadata:
+                data = Dataset.from_artifact(artifact).read()
+                metadata["profile"] = profile(data)
+            if "content_hash" not in metadata:
+                metadata["content_hash"] = hashlib.sha256(
+                    artifact.data).hexdigest()
+        return entry
+
+    def _to_artifact(self, data: dict, blob: bytes = None,
+                     load_data: bool = True) -> Artifact:
+        """
+        Builds an artifact from its database entry, loading its data.
+
+        Args:
+            data (dict): The database entry of the artifact.
+            blob (bytes): The data of the artifact, if it was loaded
+            already.
+            load_data (bool): Whether to load the data, if it was not
+            loaded already.
+
+        Returns:
+            Artifact: The artifact described by the entry.
+        """
+        if blob is None and load_data:
+            blob = self._storage.load(data["asset_path"])
         return Artifact(
             name=data["name"],
             version=data["version"],
             asset_path=data["asset_path"],
             tags=data["tags"],
             metadata=data["metadata"],
-            data=self._storage.load(data["asset_path"]),
+            data=blob,
             type=data["type"],
         )
 
+    def _to_artifacts(self, entries: List[dict]) -> List[Artifact]:
+        """
+        Builds the artifacts of many database entries, loading their data
+        concurrently.
+
+        Args:
+            entries (List[dict]): The database entries of the artifacts.
+
+        Returns:
+            List[Artifact]: The artifacts, in the order of the entries.
+        """
+        blobs = self._storage.load_many(
+            [data["asset_path"] for data in entries])
+        return [self._to_artifact(data, blob)
+                for data, blob in zip(entries, blobs)]
+
     def delete(self, artifact_id: str) -> None:
         """
         Deletes an artifact by its ID removing its data
@@ -120,21 +340,23 @@ class AutoMLSystem:
     """
     _instance = None
 
-    def __init__(self, storage: LocalStorage, database: Database) -> None:
+    def __init__(self, storage: LocalStorage,
+                 database: Union[Database, SQLiteDatabase]) -> None:
         """
         Initializes the AutoML system with storage and database components.
 
         Args:
             storage (LocalStorage): The storage system for
             managing artifact files.
-            database (Database): The database for storing artifact metadata.
+            database (Union[Database, SQLiteDatabase]): The database for
+            storing artifact metadata.
         """
         self._storage = storage
         self._database = database
         self._registry = ArtifactRegistry(database, storage)
 
     @staticmethod
-    def get_instance() -> "AutoMLSystem":
+    def get_instance(backend: str = None) -> "AutoMLSystem":
         """
         Creates and retrieves the singleton instance of the AutoMLSystem.
 
@@ -142,19 +364,48 @@ class AutoMLSystem:
         exists across the application managing the storage and database
         components through a single centralized system.
 
+        Args:
+            backend (str): The database backend used when the instance is
+            created, either "json" (one file per record) or "sqlite".
+            Defaults to the AUTOOP_DATABASE environment variable, or
+            "json" when it is not set.
+
         Returns:
             AutoMLSystem: The singleton instance of the AutoML system.
         """
         if AutoMLSystem._instance is None:
             AutoMLSystem._instance = AutoMLSystem(
                 LocalStorage("./assets/objects"),
-                Database(
-                    LocalStorage("./assets/dbo")
-                )
+                AutoMLSystem._create_database(backend)
             )
         AutoMLSystem._instance._database.refresh()
         return AutoMLSystem._instance
 
+    @staticmethod
+    def _create_database(backend: str = None) -> Union[Database,
+                                                       SQLiteDatabase]:
+        """
+        Creates the database of the given backend.
+
+        Args:
+            backend (str): Either "json" or "sqlite".
+
+        Raises:
+            ValueError: If the backend is unknown.
+
+        Returns:
+            Union[Database, SQLiteDatabase]: The created database.
+        """
+        if backend is None:
+            backend = os.environ.get("AUTOOP_DATABASE", "json")
+        if backend == "json":
+            # every record is written through this storage, so it can
+            # list the records from its manifest
+            return Database(LocalStorage("./assets/dbo", manifest=True))
+        if backend == "sqlite":
+            return SQLiteDatabase("./assets/dbo.sqlite3")
+        raise ValueError(f"Unknown database backend: {backend}")
+
     @property
     def registry(self) -> "ArtifactRegistry":
         """
@@ -5,7 +5,7 @@ from app.core.system import AutoMLSystem
 from autoop.core.ml.dataset import Dataset
 
 automl = AutoMLSystem.get_instance()
-datasets = automl.registry.list(type="dataset")
+datasets = automl.registry.list(type="dataset", load_data=False)
 
 st.title("Dataset Management")
 
@@ -13,35 +13,71 @@ st.subheader("Upload a New Dataset")
 uploaded_file = st.file_uploader("Choose a file to upload", type=["csv"])
 
 if uploaded_file:
-    data = pd.read_csv(uploaded_file)
-
     file_name = uploaded_file.name.split(".")[0]
     asset_path = f"dataset/{file_name}"
 
-    new_dataset = Dataset.from_dataframe(
-        data=data, name=file_name, asset_path=asset_path,
-        version="1.0.0"
-    )
-
     if st.button("Upload/Save Dataset"):
-        automl.registry.register(new_dataset)
-        st.success(f"Dataset '{file_name}' uploaded successfully.")
-        time.sleep(1)
-        st.rerun()
+        # the upload is streamed into storage in chunks, never parsed whole
+        try:
+            new_dataset = Dataset.ingest(
+                uploaded_file, name=file_name, asset_path=asset_path,
+                storage=automl.registry.storage, version="1.0.0"
+            )
+        except ValueError as error:
+            st.error(f"Could not ingest '{file_name}': {error}")
+        else:
+            automl.registry.register(new_dataset)
+            st.success(f"Dataset '{file_name}' uploaded successfully.")
+            time.sleep(1)
+            st.rerun()
 
 
 if datasets:
     st.subheader("Uploaded Datasets")
-    dataset_list = [dataset.name for dataset in datasets]
-    selected = st.selectbox("Select a dataset to view or delete", dataset_list)
-
-    selected_dataset = next(file for file in datasets if file.name == selected)
+    selected_dataset = st.selectbox(
+        "Select a dataset to view, extend or delete", datasets,
+        format_func=lambda dataset: f"{dataset.name} {dataset.version}")
+    selected = selected_dataset.name
 
+    preview_rows = st.number_input("Rows to preview", min_value=1,
+                                   value=100, step=100)
     if st.button("View Dataset"):
-        asset_path = selected_dataset.asset_path
-        data = pd.read_csv(f"assets/objects/{asset_path}")
-        st.write(f"Displaying contents of {selected}:")
+        dataset = automl.registry.dataset(selected_dataset)
+        data = dataset.head(automl.registry.storage, int(preview_rows))
+        st.write(f"Displaying the first {len(data)} rows of {selected}:")
         st.dataframe(data)
+        if dataset.profile is not None:
+            st.write(f"{dataset.profile['num_rows']} rows in total.")
+        if dataset.profile is not None and "statistics" in dataset.profile:
+            statistics = pd.DataFrame(dataset.profile["statistics"]).T
+            st.dataframe(statistics.drop(columns="top"))
+
+    if st.button("Memory Report"):
+        report = automl.registry.dataset(selected_dataset).memory_report(
+            automl.registry.storage)
+        st.write(f"Compact dtypes take {report['compact_bytes']:,} instead "
+                 f"of {report['bytes']:,} bytes, {report['saved']:.0%} "
+                 "less.")
+        st.dataframe(pd.DataFrame(report["columns"]).T)
+
+    # a new version stores only the appended rows
+    appended_file = st.file_uploader("Append rows as a new version",
+                                     type=["csv"], key="appended_file")
+    if appended_file:
+        new_version = st.text_input("Version of the new dataset",
+                                    value=f"{selected_dataset.version}.1")
+        if st.button("Save New Version"):
+            try:
+                new_dataset = automl.registry.dataset(
+                    selected_dataset).append(pd.read_csv(appended_file),
+                                             version=new_version)
+            except ValueError as error:
+                st.error(f"Could not append to '{selected}': {error}")
+            else:
+                automl.registry.register(new_dataset)
+                st.success(f"Version {new_version} of '{selected}' saved.")
+                time.sleep(1)
+                st.rerun()
 
     if st.button("Delete Dataset"):
         automl.registry.delete(selected_dataset.id)
@@ -4,9 +4,11 @@ import numpy as np
 import os
 
 from app.core.system import AutoMLSystem
-from autoop.core.ml.dataset import Dataset
 from autoop.core.ml.metric import get_metric
-from autoop.core.ml.pipeline import Pipeline
+from autoop.core.ml.pipeline import DTYPES, Pipeline
+from autoop.core.ml.preprocessing_cache import PreprocessingCache
+from autoop.core.ml.profiler import StageProfiler
+from autoop.core.ml.split import SPLITS, get_split
 from autoop.functional.feature import detect_feature_types
 
 from autoop.core.ml.model.regression import (
@@ -15,6 +17,12 @@ from autoop.core.ml.model.regression import (
 from autoop.core.ml.model.classification import (
     KNN, Neural_network_classifier, Random_forest
 )
+from autoop.core.ml.model.classification.k_nearest_nerighbors import (
+    ALGORITHMS as KNN_ALGORITHMS
+)
+from autoop.core.ml.model.regression.gradient_boosting_regressor import (
+    ENGINES as GBR_ENGINES
+)
 
 selected_model_name = None
 
@@ -23,7 +31,13 @@ st.set_page_config(page_title="Modelling", page_icon="📈")
 st.write("# ⚙ Modelling")
 
 automl = AutoMLSystem.get_instance()
-datasets = automl.registry.list(type="dataset")
+datasets = automl.registry.list(type="dataset", load_data=False)
+
+# preprocessed data is reused across runs that only change the model,
+# metrics or split, evicted entries are kept next to the artifacts
+if "preprocessing_cache" not in st.session_state:
+    st.session_state["preprocessing_cache"] = PreprocessingCache(
+        spill_path="./assets/objects/.preprocessing_cache")
 
 regression_models = {
     "Lasso": Lasso,
@@ -60,13 +74,13 @@ if datasets:
     )
 
     if selected_dataset_name:
-        selected_dataset = next(
-            ds for ds in datasets if ds.name == selected_dataset_name
+        selected_dataset = automl.registry.find_one(
+            type="dataset", name=selected_dataset_name, load_data=False
         )
 
-        features_data = Dataset.from_artifact(selected_dataset)
+        features_data = automl.registry.dataset(selected_dataset)
+        # read from the dataset profile, without decoding the data
         features = detect_feature_types(features_data)
-        data = features_data.to_dataframe()
 
         continuous_columns = [
             f.name for f in features if f.type == "numerical"
@@ -85,6 +99,7 @@ if datasets:
             st.session_state.regression_selected = False
 
         selected_metrics = []
+        model_options = {}
         if st.session_state.regression_selected:
             selected_model_name = st.selectbox(
                 "Please select a regression model", list(
@@ -92,6 +107,10 @@ if datasets:
                 )
             )
             st.write(f"Selected Model: {selected_model_name}")
+            if selected_model_name == "Gradient Boosting Regression":
+                model_options["engine"] = st.selectbox(
+                    "Boosting engine (histogram is faster on large data)",
+                    GBR_ENGINES)
             st.write("### Select Metrics for Regression")
             for metric in regression_metrics:
                 if st.checkbox(metric):
@@ -107,9 +126,54 @@ if datasets:
                     selected_metrics.append(metric)
 
             if selected_model_name == "K Nearest Neighbors":
-                k_value = st.number_input(
+                model_options["k"] = st.number_input(
                     "Enter the number of neighbors (k) for KNN:",
                     min_value=1, value=3)
+                model_options["algorithm"] = st.selectbox(
+                    "Neighbor search backend", KNN_ALGORITHMS)
+                if model_options["algorithm"] == "approximate":
+                    model_options["n_trees"] = st.slider(
+                        "Number of trees (higher recall, slower queries)",
+                        min_value=1, max_value=50, value=10)
+
+        if selected_model_name in ["Gradient Boosting Regression",
+                                   "Neural Network Classifier"]:
+            default_iterations = 200 \
+                if selected_model_name == "Neural Network Classifier" \
+                else 100
+            model_options["max_iter"] = st.number_input(
+                "Maximum number of iterations", min_value=1,
+                value=default_iterations)
+            model_options["early_stopping"] = st.checkbox(
+                "Stop early when a validation set stops improving")
+            if model_options["early_stopping"]:
+                model_options["validation_fraction"] = st.slider(
+                    "Validation fraction", min_value=0.05, max_value=0.5,
+                    value=0.1)
+
+        with st.expander("Training resources"):
+            n_jobs = st.number_input(
+                "Number of cores (-1 for all cores, 0 for the default)",
+                min_value=-1, value=-1)
+            memory_budget = st.number_input(
+                "Memory budget for chunked computations (MiB, 0 for the "
+                "default)", min_value=0, value=0)
+            random_state = st.number_input(
+                "Random seed", min_value=0, value=0)
+            dtype = st.selectbox(
+                "Floating point precision (float32 halves the memory)",
+                DTYPES)
+        resources = {
+            "n_jobs": None if n_jobs == 0 else int(n_jobs),
+            "memory_budget": int(memory_budget) or None,
+            "random_state": int(random_state),
+        }
+
+        with st.expander("Profiling"):
+            st.write("Every run reports the time of its stages. Tracing "
+                     "memory and profiling calls slow the run down.")
+            trace_memory = st.checkbox("Trace peak memory per stage")
+            profile_calls = st.checkbox("Profile the slowest functions")
 
         st.write("### Select Features for Modelling")
         input_feature_names = st.multiselect("Select input features", [
@@ -138,6 +202,16 @@ if datasets:
             "Select the training data split ratio (0.0 - 1.0)",
             min_value=0.1, max_value=0.9, value=0.8)
         st.write(f"Selected Split Ratio: {split_ratio}")
+        split_name = st.selectbox(
+            "Select the split strategy (ordered takes the leading rows, "
+            "which is biased on sorted data)", SPLITS)
+        split_column = None
+        if split_name in ["grouped", "time_ordered"]:
+            split_column = st.selectbox(
+                "Select the group column" if split_name == "grouped"
+                else "Select the time column", [f.name for f in features])
+        split_strategy = get_split(split_name, column=split_column,
+                                   random_state=resources["random_state"])
 
         st.write("# 📋 Pipeline Summary")
         col1, col2, col3 = st.columns(3)
@@ -161,18 +235,16 @@ if datasets:
             st.write(f"- **Selected Metrics**: {metric_text}")
             st.write("#### Split Ratio")
             st.write(f"- **Training/Test Split**: {split_ratio}")
+            st.write(f"- **Split Strategy**: {split_strategy}")
 
+        results = None
         if st.button("Run Pipeline"):
-            if selected_model_name == "K Nearest Neighbors":
-                selected_model = (
-                    classification_models[selected_model_name](k=k_value)
-                )
-            else:
-                selected_model = (
-                    regression_models[selected_model_name]()
-                    if st.session_state.regression_selected
-                    else classification_models[selected_model_name]()
-                )
+            models = regression_models \
+                if st.session_state.regression_selected \
+                else classification_models
+            selected_model = models[selected_model_name](
+                **model_options, **resources
+            )
 
             metrics_instances = [
                 get_metric(
@@ -188,13 +260,36 @@ if datasets:
                 model=selected_model,
                 input_features=input_features,
                 target_feature=target_feature,
-                split=split_ratio
+                split=split_ratio,
+                dtype=dtype,
+                split_strategy=split_strategy,
+                cache=st.session_state["preprocessing_cache"],
+                profiler=StageProfiler(trace_memory=trace_memory,
+                                       profile_calls=profile_calls)
             )
 
             st.session_state["pipeline"] = pipeline
 
             results = pipeline.execute()
 
+        if "pipeline" in st.session_state:
+            with st.expander("Continue training"):
+                st.write("Trains the model of the last run further instead "
+                         "of fitting it from scratch.")
+                extra_iterations = st.number_input(
+                    "Additional iterations (boosting stages, trees or "
+                    "epochs)", min_value=1, value=50)
+                if st.button("Continue Training"):
+                    pipeline = st.session_state["pipeline"]
+                    results = pipeline.continue_training(
+                        n_iterations=int(extra_iterations))
+                st.write("Refits the model of the last run on the selected "
+                         "split strategy, reusing its preprocessed data.")
+                if st.button("Retrain on Selected Split"):
+                    pipeline = st.session_state["pipeline"]
+                    results = pipeline.resplit(split_strategy)
+
+        if results is not None:
             metrics_data = {
                 metric.__class__.__name__: [result] for metric,
                 result in results["train_metrics"]
@@ -210,6 +305,29 @@ if datasets:
                 "Actual": actual_values_flat
             })
 
+            st.write(f"Model fitted in {results['fit_time']:.3f} seconds")
+            cache_stats = st.session_state["preprocessing_cache"].stats
+            st.write(f"Preprocessing cache: {cache_stats['hits']} hits, "
+                     f"{cache_stats['spill_hits']} from disk, "
+                     f"{cache_stats['misses']} misses")
+
+            st.write("### Profile")
+            stages = results["profile"]["stages"]
+            st.dataframe(pd.DataFrame({
+                "Stage": [stage["name"] for stage in stages],
+                "Wall time (s)": [stage["wall_time"] for stage in stages],
+                "CPU time (s)": [stage["cpu_time"] for stage in stages],
+                "Peak memory (MiB)": [
+                    stage.get("peak_memory", np.nan) / 2**20
+                    for stage in stages],
+                "Arrays (MiB)": [
+                    sum(a["bytes"] for a in stage["arrays"].values()) / 2**20
+                    for stage in stages],
+            }))
+            for stage in stages:
+                if "calls" in stage:
+                    with st.expander(f"Slowest functions: {stage['name']}"):
+                        st.dataframe(pd.DataFrame(stage["calls"]))
             st.write("### Metrics Results")
             st.dataframe(metrics_df)
 
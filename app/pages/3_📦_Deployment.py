@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
 import time
 from app.core.system import AutoMLSystem
 from autoop.core.ml.pipeline import Pipeline
@@ -15,7 +16,7 @@ st.write("""
 """)
 
 automl = AutoMLSystem.get_instance()
-saved_pipelines = automl.registry.list(type="pipeline")
+saved_pipelines = automl.registry.list(type="pipeline", load_data=False)
 
 if saved_pipelines:
     pipeline_names = [pipeline.name for pipeline in saved_pipelines]
@@ -24,8 +25,8 @@ if saved_pipelines:
         "Select a pipeline to view or delete:", pipeline_names
     )
 
-    selected_pipeline = next(
-        p for p in saved_pipelines if p.name == selected_pipeline_name
+    selected_pipeline = automl.registry.find_one(
+        type="pipeline", name=selected_pipeline_name, load_data=False
     )
 
     if st.button("Load Pipeline"):
@@ -73,6 +74,44 @@ if saved_pipelines:
             st.write("#### Split Ratio")
             st.write(f"- **Training/Test Split**: {split_ratio}")
 
+        st.write("### Refresh on New Data")
+        trained_on = loaded_pipeline._dataset.id
+        newer_versions = [
+            dataset for dataset
+            in automl.registry.list(type="dataset", load_data=False)
+            if dataset.name == dataset_name and dataset.id != trained_on
+        ]
+        if newer_versions:
+            selected_version = st.selectbox(
+                "Dataset version", newer_versions,
+                format_func=lambda dataset: dataset.version)
+            new_pipeline_version = st.text_input(
+                "Version of the refreshed pipeline",
+                value=f"{selected_pipeline.version}.1")
+            if st.button("Refresh Pipeline"):
+                # appended rows update the model without retraining it
+                refresh = loaded_pipeline.refresh(
+                    automl.registry.dataset(selected_version))
+                if refresh["mode"] == "incremental":
+                    st.write(f"Trained further on {refresh['rows']} new "
+                             "rows. Metrics on them before training:")
+                    st.dataframe(pd.DataFrame(
+                        [(type(metric).__name__, value)
+                         for metric, value in refresh["delta_metrics"]],
+                        columns=["Metric", "Value"]))
+                else:
+                    st.write("Retrained on the whole dataset.")
+                asset_path = os.path.join(
+                    "assets/pipeline",
+                    f"{selected_pipeline_name}_{new_pipeline_version}.pkl")
+                automl.registry.register(loaded_pipeline.save(
+                    name=selected_pipeline_name,
+                    version=new_pipeline_version, save_path=asset_path))
+                st.success(f"Saved version {new_pipeline_version} of "
+                           f"'{selected_pipeline_name}'.")
+        else:
+            st.write("There are no other versions of the dataset.")
+
         st.write("### Perform Predictions")
         uploaded_file = st.file_uploader(
             "Upload a CSV file with input features", type="csv")
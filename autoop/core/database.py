@@ -1,13 +1,40 @@
 
 import json
-from typing import Tuple, List, Union
+from contextlib import contextmanager
+from typing import (
+    Dict, Hashable, Iterable, Iterator, List, Set, Tuple, Union
+)
 import os
 
-from autoop.core.storage import Storage
+from autoop.core.storage import NotFoundError, Storage
+
+GENERATION_KEY = ".generation"
+REVISION_KEY = "_rev"
+
+
+class ConflictError(Exception):
+    """
+    Exception raised when records were changed by another writer since
+    they were last loaded.
+    """
+    def __init__(self, keys: List[str]) -> None:
+        """
+        Initializes the error with the conflicting keys.
+
+        Args:
+            keys (List[str]): The storage keys of the conflicting records.
+        """
+        super().__init__(
+            f"Records changed by another writer: {', '.join(keys)}")
 
 
 class Database():
     """Database class
+
+    Every record carries a revision number, stored under the reserved
+    "_rev" key, which is checked under a storage lock before writing. A
+    write based on an outdated revision raises a ConflictError instead of
+    overwriting the other writer's change.
     """
     def __init__(self, storage: Storage) -> None:
         """Initializer method
@@ -18,6 +45,13 @@ class Database():
         """
         self._storage = storage
         self._data = {}
+        self._indexes = {}
+        self._stats = {}
+        self._revisions = {}
+        self._dirty = set()
+        self._generation = None
+        self._depth = 0
+        self._undo = {}
         self._load()
 
     def set(self, collection: str, id: str, entry: dict) -> dict:
@@ -32,9 +66,10 @@ class Database():
         assert isinstance(entry, dict), "Data must be a dictionary"
         assert isinstance(collection, str), "Collection must be a string"
         assert isinstance(id, str), "ID must be a string"
-        if not self._data.get(collection, None):
-            self._data[collection] = {}
-        self._data[collection][id] = entry
+        assert REVISION_KEY not in entry, f"'{REVISION_KEY}' is reserved"
+        self._remember(collection, id)
+        self._put(collection, id, entry)
+        self._dirty.add((collection, id))
         self._persist()
         return entry
 
@@ -62,7 +97,9 @@ class Database():
         if not self._data.get(collection, None):
             return
         if self._data[collection].get(id, None):
-            del self._data[collection][id]
+            self._remember(collection, id)
+            self._remove(collection, id)
+            self._dirty.add((collection, id))
         self._persist()
 
     def list(self, collection: str) -> List[Tuple[str, dict]]:
@@ -77,33 +114,320 @@ class Database():
             return []
         return [(id, data) for id, data in self._data[collection].items()]
 
+    def collections(self) -> List[str]:
+        """Lists the names of all non-empty collections
+        Returns:
+            List[str]: The collection names
+        """
+        return sorted(name for name, data in self._data.items() if data)
+
+    def create_index(self, collection: str, field: str) -> None:
+        """Create a secondary index on a field of a collection
+
+        The index maps every value of the field to the ids of the entries
+        holding it and is kept up to date on set, delete and refresh. List
+        values are indexed per element, so a tag can be looked up directly.
+        Args:
+            collection (str): The collection to index
+            field (str): The entry field to index
+        Returns:
+            None
+        """
+        fields = self._indexes.setdefault(collection, {})
+        if field in fields:
+            return
+        fields[field] = {}
+        for id, entry in self._data.get(collection, {}).items():
+            self._index_field(fields[field], id, entry.get(field, None))
+
+    def find(self, collection: str, **criteria) -> List[Tuple[str, dict]]:
+        """Find the entries of a collection matching all given criteria
+        Args:
+            collection (str): The collection to search
+            **criteria: Field values the entries must match. For list
+                fields an entry matches when the value is one of its
+                elements. Indexed fields are resolved through the index,
+                other fields are checked on the remaining candidates.
+        Returns:
+            List[Tuple[str, dict]]: A list of tuples containing the id and
+            data of every matching entry, sorted by id
+        """
+        data = self._data.get(collection, {})
+        indexes = self._indexes.get(collection, {})
+        candidates = None
+        unindexed = {}
+        for field, value in criteria.items():
+            if field not in indexes or not isinstance(value, Hashable):
+                unindexed[field] = value
+                continue
+            ids = indexes[field].get(value, set())
+            if candidates is None or len(ids) < len(candidates):
+                candidates, ids = ids, candidates
+            if ids is not None:
+                candidates = candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = data.keys()
+        return [
+            (id, data[id]) for id in sorted(candidates)
+            if all(self._matches(data[id].get(field, None), value)
+                   for field, value in unindexed.items())
+        ]
+
     def refresh(self) -> None:
-        """Refresh the database by loading the data from storage"""
-        self._load()
+        """Refresh the database by loading the changes made in storage
+
+        Every persist bumps a generation counter in storage, so a refresh
+        without changes only reads that counter. Otherwise only the entries
+        that were added, removed, or whose size or modification time
+        changed since the last refresh are reloaded.
+        """
+        generation = self._read_generation()
+        if generation is not None and generation == self._generation:
+            return
+        self._sync()
+        self._generation = generation
+
+    @contextmanager
+    def batch(self) -> Iterator["Database"]:
+        """Group writes into a single persist
+
+        Sets and deletes made inside the block are applied in memory right
+        away, but written to storage together, with a single generation
+        bump, when the block exits. If the block raises, the changes are
+        rolled back and nothing is written. Batches can be nested, in
+        which case only the outermost one persists.
+
+        Yields:
+            Database: The database itself
+        """
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._rollback()
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self._undo = {}
+            self._persist()
+
+    def _remember(self, collection: str, id: str) -> None:
+        """Remember the state of an entry before a batch first changes it"""
+        if self._depth and (collection, id) not in self._undo:
+            self._undo[(collection, id)] = self.get(collection, id)
+
+    def _rollback(self) -> None:
+        """Restore the entries changed by the current batch"""
+        for (collection, id), entry in self._undo.items():
+            if entry is None:
+                self._remove(collection, id)
+            else:
+                self._put(collection, id, entry)
+        self._undo = {}
+        self._dirty = set()
+
+    @staticmethod
+    def _matches(stored: object, value: object) -> bool:
+        """Check whether a stored field value matches a query value"""
+        if isinstance(stored, list):
+            return value in stored
+        return stored == value
+
+    @staticmethod
+    def _index_values(value: object) -> Iterable[Hashable]:
+        """Get the hashable index keys of a field value"""
+        values = value if isinstance(value, list) else [value]
+        return [v for v in values
+                if v is not None and isinstance(v, Hashable)]
+
+    def _index_field(self, index: Dict[Hashable, Set[str]], id: str,
+                     value: object) -> None:
+        """Add an entry id to a single field index"""
+        for key in self._index_values(value):
+            index.setdefault(key, set()).add(id)
+
+    def _index(self, collection: str, id: str, entry: dict) -> None:
+        """Add an entry to every index of its collection"""
+        for field, index in self._indexes.get(collection, {}).items():
+            self._index_field(index, id, entry.get(field, None))
+
+    def _unindex(self, collection: str, id: str, entry: dict) -> None:
+        """Remove an entry from every index of its collection"""
+        for field, index in self._indexes.get(collection, {}).items():
+            for key in self._index_values(entry.get(field, None)):
+                ids = index.get(key, None)
+                if ids is None:
+                    continue
+                ids.discard(id)
+                if not ids:
+                    del index[key]
+
+    def _put(self, collection: str, id: str, entry: dict) -> None:
+        """Store an entry in memory and in the indexes"""
+        if not self._data.get(collection, None):
+            self._data[collection] = {}
+        previous = self._data[collection].get(id, None)
+        if previous is not None:
+            self._unindex(collection, id, previous)
+        self._data[collection][id] = entry
+        self._index(collection, id, entry)
+
+    def _remove(self, collection: str, id: str) -> None:
+        """Remove an entry from memory and from the indexes"""
+        entry = self._data.get(collection, {}).pop(id, None)
+        if entry is not None:
+            self._unindex(collection, id, entry)
+
+    def _read_generation(self) -> Union[int, None]:
+        """Read the generation counter from storage
+
+        Returns:
+            Union[int, None]: The counter, 0 if it was never written, or
+            None if it cannot be read
+        """
+        try:
+            return int(self._storage.load(GENERATION_KEY).decode())
+        except NotFoundError:
+            return 0
+        except ValueError:
+            return None
 
     def _persist(self) -> None:
-        """Persist the data to storage"""
-        for collection, data in self._data.items():
-            if not data:
-                continue
-            for id, item in data.items():
-                self._storage.save(json.dumps(item).encode(),
-                                   f"{collection}{os.sep}{id}")
+        """Persist the changed entries to storage
 
-        # for things that were deleted, we need to remove them from the storage
-        keys = self._storage.list("")
-        for key in keys:
-            collection, id = key.split(os.sep)[-2:]
-            if not self._data.get(collection, {}).get(id):
-                self._storage.delete(f"{collection}{os.sep}{id}")
+        Only the entries set or deleted since the last persist are written,
+        after which the generation counter is bumped so that other
+        instances notice the change on their next refresh. Inside a batch
+        nothing is written until the batch exits.
+
+        The records are locked while their revisions are checked and
+        written. If any of them changed in storage since it was loaded,
+        nothing is written, the changed entries are reloaded from storage
+        and a ConflictError is raised.
+        """
+        if self._depth or not self._dirty:
+            return
+        dirty = sorted(self._dirty)
+        self._dirty = set()
+        keys = {item: f"{item[0]}{os.sep}{item[1]}" for item in dirty}
+        with self._storage.lock(*keys.values()):
+            conflicts = []
+            for item in dirty:
+                revision = self._read_revision(keys[item])
+                deleted = self._data.get(item[0], {}).get(item[1]) is None
+                if revision != self._revisions.get(item) and not (
+                        deleted and revision is None):
+                    conflicts.append(keys[item])
+            if conflicts:
+                for collection, id in dirty:
+                    self._reload(collection, id)
+                raise ConflictError(conflicts)
+            for item in dirty:
+                self._write(*item)
+        self._bump_generation()
+
+    def _write(self, collection: str, id: str) -> None:
+        """Write an entry to storage with the next revision, or delete it"""
+        key = f"{collection}{os.sep}{id}"
+        item = self._data.get(collection, {}).get(id, None)
+        if item is None:
+            try:
+                self._storage.delete(key)
+            except NotFoundError:
+                pass
+            self._stats.pop((collection, id), None)
+            self._revisions.pop((collection, id), None)
+            return
+        revision = self._revisions.get((collection, id), 0) + 1
+        self._storage.save(
+            json.dumps({**item, REVISION_KEY: revision}).encode(), key)
+        self._revisions[(collection, id)] = revision
+        self._stats[(collection, id)] = self._stat(key)
+
+    def _bump_generation(self) -> None:
+        """Increment the generation counter in storage"""
+        with self._storage.lock(GENERATION_KEY):
+            generation = self._read_generation()
+            self._storage.save(str((generation or 0) + 1).encode(),
+                               GENERATION_KEY)
+        # our view is only current if nobody else wrote in between
+        if generation is not None and generation == self._generation:
+            self._generation = generation + 1
+        else:
+            self._generation = None
+
+    def _read_revision(self, key: str) -> Union[int, None]:
+        """Read the revision of a record in storage
+
+        Returns:
+            Union[int, None]: The revision, or None if the record does not
+            exist
+        """
+        try:
+            data = self._storage.load(key)
+        except NotFoundError:
+            return None
+        return json.loads(data.decode()).get(REVISION_KEY, 0)
+
+    def _reload(self, collection: str, id: str) -> None:
+        """Replace an entry in memory with its state in storage"""
+        key = f"{collection}{os.sep}{id}"
+        stat = self._stat(key)
+        try:
+            data = self._storage.load(key)
+        except NotFoundError:
+            self._remove(collection, id)
+            self._stats.pop((collection, id), None)
+            self._revisions.pop((collection, id), None)
+            return
+        entry = json.loads(data.decode())
+        self._revisions[(collection, id)] = entry.pop(REVISION_KEY, 0)
+        self._stats[(collection, id)] = stat
+        self._put(collection, id, entry)
+
+    def _stat(self, key: str) -> Union[Tuple[int, int], None]:
+        """Get the stat of a key, or None if it cannot be determined"""
+        try:
+            return self._storage.stat(key)
+        except (NotFoundError, NotImplementedError):
+            return None
+
+    def _sync(self) -> None:
+        """Reload the entries whose stat differs from the last load"""
+        seen = {}
+        # the listing carries the stats, no extra stat call per record
+        for key, stat in self._storage.scan(""):
+            parts = key.split(os.sep)
+            if len(parts) < 2 or parts[0].startswith("."):
+                continue
+            collection, id = parts[-2:]
+            seen[(collection, id)] = stat
+            if stat is not None and self._stats.get((collection, id)) == stat:
+                continue
+            try:
+                data = self._storage.load(f"{collection}{os.sep}{id}")
+            except NotFoundError:
+                del seen[(collection, id)]
+                continue
+            entry = json.loads(data.decode())
+            self._revisions[(collection, id)] = entry.pop(REVISION_KEY, 0)
+            self._put(collection, id, entry)
+        for collection, id in set(self._stats) - set(seen):
+            self._remove(collection, id)
+            self._revisions.pop((collection, id), None)
+        self._stats = seen
 
     def _load(self) -> None:
-        """Load the data from storage"""
+        """Load all data from storage"""
         self._data = {}
-        for key in self._storage.list(""):
-            collection, id = key.split(os.sep)[-2:]
-            data = self._storage.load(f"{collection}{os.sep}{id}")
-            # Ensure the collection exists in the dictionary
-            if collection not in self._data:
-                self._data[collection] = {}
-            self._data[collection][id] = json.loads(data.decode())
+        self._stats = {}
+        self._revisions = {}
+        for fields in self._indexes.values():
+            for field in fields:
+                fields[field] = {}
+        self._generation = self._read_generation()
+        self._sync()
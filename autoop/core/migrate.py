@@ -0,0 +1,58 @@
+"""
+Migrates the JSON-file database layout to a SQLite database.
+
+Usage:
+    python -m autoop.core.migrate --source ./assets/dbo \
+        --target ./assets/dbo.sqlite3
+"""
+import argparse
+
+from autoop.core.database import Database
+from autoop.core.sqlite_database import SQLiteDatabase
+from autoop.core.storage import LocalStorage
+
+
+def migrate(source: Database, target: SQLiteDatabase) -> int:
+    """
+    Copies every record of a database into a SQLite database.
+
+    All records are written in a single transaction, so an interrupted
+    migration leaves the target untouched.
+
+    Args:
+        source (Database): The database to copy the records from.
+        target (SQLiteDatabase): The database to copy the records into.
+
+    Returns:
+        int: The number of records copied.
+    """
+    count = 0
+    with target.batch():
+        for collection in source.collections():
+            for id, entry in source.list(collection):
+                target.set(collection, id, entry)
+                count += 1
+    return count
+
+
+def main() -> None:
+    """
+    Runs the migration from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Migrate a JSON-file database to SQLite."
+    )
+    parser.add_argument("--source", default="./assets/dbo",
+                        help="directory of the JSON-file database")
+    parser.add_argument("--target", default="./assets/dbo.sqlite3",
+                        help="path of the SQLite file to write")
+    args = parser.parse_args()
+    source = Database(LocalStorage(args.source))
+    target = SQLiteDatabase(args.target)
+    count = migrate(source, target)
+    target.close()
+    print(f"Migrated {count} records from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
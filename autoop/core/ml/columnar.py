@@ -0,0 +1,825 @@
+import io
+import json
+import struct
+import zlib
+from collections import Counter
+from typing import (
+    BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+)
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"AOCOL1"
+ROW_GROUP_ROWS = 65536
+DTYPES = ["int64", "float64", "bool", "string"]
+TOP_K = 10
+DISTINCT_LIMIT = 10000
+COMPRESSION_SAMPLE = 65536
+CATEGORY_RATIO = 0.5
+DTYPE_BACKENDS = ["numpy", "numpy_nullable", "pyarrow"]
+_FOOTER_LENGTH = struct.Struct("<Q")
+_NUMPY_TYPES = {"int64": "<i8", "float64": "<f8", "bool": "?",
+                "string": object}
+
+
+def is_columnar(data: bytes) -> bool:
+    """
+    Checks whether data is in the columnar format, rather than CSV.
+
+    Args:
+        data (bytes): The data, or at least its first len(MAGIC) bytes.
+
+    Returns:
+        bool: Whether the data starts with the format's magic bytes.
+    """
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def infer_schema(data: pd.DataFrame) -> List[dict]:
+    """
+    Infers the schema of a DataFrame, from the dtypes pandas inferred.
+
+    Integer, floating point and boolean columns keep their type, every
+    other column is stored as strings.
+
+    Args:
+        data (pd.DataFrame): The DataFrame, usually the first chunk read.
+
+    Returns:
+        List[dict]: The name and one of DTYPES of every column.
+    """
+    schema = []
+    for name, dtype in data.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            kind = "bool"
+        elif pd.api.types.is_integer_dtype(dtype):
+            kind = "int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            kind = "float64"
+        else:
+            kind = "string"
+        schema.append({"name": str(name), "dtype": kind})
+    return schema
+
+
+def encode(data: pd.DataFrame,
+           schema: List[dict] = None) -> Tuple[bytes, dict]:
+    """
+    Converts a DataFrame in memory to the columnar format.
+
+    Args:
+        data (pd.DataFrame): The DataFrame.
+        schema (List[dict]): The name and dtype of every column, as
+        returned by infer_schema. Defaults to inferring it.
+
+    Raises:
+        ValueError: If the data does not fit the schema.
+
+    Returns:
+        Tuple[bytes, dict]: The columnar data, and the schema, the number
+        of rows and the statistics of every column.
+    """
+    buffer = io.BytesIO()
+    writer = ColumnarWriter(buffer, schema or infer_schema(data))
+    writer.write(data)
+    summary = writer.close()
+    return buffer.getvalue(), summary
+
+
+def ingest_csv(source: BinaryIO, file: BinaryIO,
+               chunksize: int = ROW_GROUP_ROWS,
+               schema: List[dict] = None) -> dict:
+    """
+    Converts CSV data to the columnar format, chunk by chunk.
+
+    Only one chunk of rows is in memory at a time. The schema is inferred
+    from the first chunk, unless given, and every later chunk must fit it.
+
+    Args:
+        source (BinaryIO): The CSV data, for example an uploaded file.
+        file (BinaryIO): The file the columnar data is written to.
+        chunksize (int): The number of rows per chunk and row group.
+        schema (List[dict]): The name and dtype of every column, as
+        returned by infer_schema. Defaults to inferring it.
+
+    Raises:
+        ValueError: If a chunk does not fit the schema.
+
+    Returns:
+        dict: The schema, the number of rows and the statistics of every
+        column, as stored in the footer.
+    """
+    writer = None
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        if writer is None:
+            writer = ColumnarWriter(file, schema or infer_schema(chunk),
+                                    chunksize)
+        writer.write(chunk)
+    if writer is None:
+        raise ValueError("The CSV data holds no rows")
+    return writer.close()
+
+
+def profile(data: pd.DataFrame, schema: List[dict] = None) -> dict:
+    """
+    Profiles a DataFrame the way ingest_csv profiles the data it converts.
+
+    Args:
+        data (pd.DataFrame): The DataFrame.
+        schema (List[dict]): The name and dtype of every column, as
+        returned by infer_schema. Defaults to inferring it.
+
+    Raises:
+        ValueError: If the data does not fit the schema.
+
+    Returns:
+        dict: The schema, the number of rows and the statistics of every
+        column.
+    """
+    schema = schema or infer_schema(data)
+    statistics = {}
+    for column in schema:
+        column_statistics = ColumnStatistics(column["dtype"])
+        column_statistics.update(_cast(data[column["name"]], column, 0,
+                                       len(data)))
+        statistics[column["name"]] = column_statistics.to_dict()
+    return {"schema": schema, "num_rows": len(data),
+            "statistics": statistics}
+
+
+def categorical_columns(statistics: dict) -> List[str]:
+    """
+    Chooses the string columns worth loading as categoricals.
+
+    Args:
+        statistics (dict): The statistics of every column, by name, as in
+        a profile.
+
+    Returns:
+        List[str]: The string columns whose number of distinct values is
+        known and at most CATEGORY_RATIO of their present values.
+    """
+    names = []
+    for name, column in statistics.items():
+        if column["dtype"] != "string" or not column["distinct_exact"]:
+            continue
+        present = max(column["count"] - column["nulls"], 1)
+        if column["distinct"] <= CATEGORY_RATIO * present:
+            names.append(name)
+    return names
+
+
+def compact_dtypes(data: pd.DataFrame, statistics: dict = None,
+                   dtype_backend: str = "numpy") -> pd.DataFrame:
+    """
+    Converts the columns of a DataFrame to compact dtypes.
+
+    Integers are downcast to the narrowest signed type holding their
+    minimum and maximum, or with missing values treated as floats by the
+    numpy backend, floats to float32 when that loses no value, and
+    low-cardinality strings become categoricals. Columns that are
+    categorical already are kept.
+
+    Args:
+        data (pd.DataFrame): The DataFrame, with the dtypes pandas infers.
+        statistics (dict): The statistics of every column, by name, as in
+        a profile. Missing statistics are computed from the data.
+        dtype_backend (str): One of DTYPE_BACKENDS. "numpy_nullable"
+        uses the pandas extension types, such as Int8, Float32, boolean
+        and string, and "pyarrow" types backed by Arrow arrays, which
+        needs pyarrow.
+
+    Raises:
+        ValueError: If the backend is unknown.
+
+    Returns:
+        pd.DataFrame: The converted DataFrame.
+    """
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"Unknown dtype backend: {dtype_backend}")
+    statistics = dict(statistics or {})
+    missing = [name for name in data.columns if name not in statistics]
+    if missing:
+        statistics.update(profile(data[missing])["statistics"])
+    categorical = set(categorical_columns(statistics))
+    dtypes = {}
+    for name in data.columns:
+        column = data[name]
+        summary = statistics[name]
+        kind = summary["dtype"]
+        # numpy integers cannot hold missing values, they stay floats
+        nullable = dtype_backend != "numpy" or summary["nulls"] == 0
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            continue
+        if kind == "string" and name in categorical:
+            dtypes[name] = "category"
+        elif kind == "int64" and summary["min"] is not None and nullable:
+            dtypes[name] = _backend_dtype(
+                _integer_type(summary["min"], summary["max"]), dtype_backend)
+        elif kind in ["int64", "float64"]:
+            dtypes[name] = _backend_dtype(
+                "float32" if _fits_float32(column) else "float64",
+                dtype_backend)
+        elif dtype_backend != "numpy":
+            dtypes[name] = _backend_dtype(kind, dtype_backend)
+    return data.astype(dtypes) if dtypes else data
+
+
+def _integer_type(low: int, high: int) -> str:
+    """
+    Returns the narrowest signed integer type holding a range.
+    """
+    for dtype in ["int8", "int16", "int32"]:
+        limits = np.iinfo(dtype)
+        if limits.min <= low and high <= limits.max:
+            return dtype
+    return "int64"
+
+
+def _fits_float32(values: pd.Series) -> bool:
+    """
+    Checks whether float values survive a round trip through float32.
+    """
+    values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(over="ignore"):
+        narrow = values.astype(np.float32)
+    return np.array_equal(narrow, values, equal_nan=True)
+
+
+def _backend_dtype(dtype: str, dtype_backend: str) -> str:
+    """
+    Names a numpy dtype, or "bool" or "string", in a dtype backend.
+    """
+    if dtype_backend == "pyarrow":
+        return f"{dtype}[pyarrow]"
+    if dtype_backend == "numpy_nullable":
+        return {"bool": "boolean", "string": "string"}.get(
+            dtype, dtype.capitalize())
+    return dtype
+
+
+def memory_report(data: pd.DataFrame, compacted: pd.DataFrame) -> dict:
+    """
+    Compares the memory of a DataFrame before and after compact_dtypes.
+
+    Args:
+        data (pd.DataFrame): The DataFrame with the inferred dtypes.
+        compacted (pd.DataFrame): The same data in compact dtypes.
+
+    Returns:
+        dict: The dtype and bytes of every column before and after, by
+        name, the total bytes before and after, and the fraction saved.
+    """
+    columns = {
+        name: {
+            "dtype": str(data[name].dtype),
+            "bytes": int(data[name].memory_usage(index=False, deep=True)),
+            "compact_dtype": str(compacted[name].dtype),
+            "compact_bytes": int(compacted[name].memory_usage(index=False,
+                                                              deep=True)),
+        }
+        for name in data.columns
+    }
+    before = sum(column["bytes"] for column in columns.values())
+    after = sum(column["compact_bytes"] for column in columns.values())
+    return {"columns": columns, "bytes": before, "compact_bytes": after,
+            "saved": 1 - after / before if before else 0.0}
+
+
+class ColumnStatistics():
+    """
+    Summarizes the values of a column as they are written, chunk by chunk.
+
+    Records the number of values and of missing values, the minimum,
+    maximum and mean of numerical columns, and the number of distinct
+    values with the TOP_K most frequent ones. Distinct values are counted
+    exactly up to DISTINCT_LIMIT, and the most frequent ones only for
+    string and boolean columns. Past the limit no new values are kept,
+    so memory stays bounded for columns such as IDs, and the most
+    frequent values are those among the values kept.
+    """
+
+    def __init__(self, dtype: str) -> None:
+        """
+        Initializes empty statistics.
+
+        Args:
+            dtype (str): The dtype of the column, one of DTYPES.
+        """
+        self._dtype = dtype
+        self._count = 0
+        self._nulls = 0
+        self._min = None
+        self._max = None
+        self._sum = 0.0
+        self._counts = Counter()
+        self._distinct = set()
+
+    def update(self, values: pd.Series) -> None:
+        """
+        Adds a chunk of values.
+
+        Args:
+            values (pd.Series): The values, cast to the dtype.
+        """
+        if self._dtype == "string":
+            self.update_codes(*pd.factorize(values))
+            return
+        self._count += len(values)
+        present = values.dropna()
+        self._nulls += len(values) - len(present)
+        if len(present) == 0:
+            return
+        if self._dtype in ["int64", "float64"]:
+            low, high = present.min(), present.max()
+            self._min = low if self._min is None else min(self._min, low)
+            self._max = high if self._max is None else max(self._max, high)
+            self._sum += float(present.sum())
+            if len(self._distinct) <= DISTINCT_LIMIT:
+                self._distinct.update(np.unique(present.to_numpy()).tolist())
+        else:
+            self._count_values(present.value_counts().to_dict())
+
+    def update_codes(self, codes: np.ndarray, uniques: pd.Index) -> None:
+        """
+        Adds a chunk of factorized values, counting them from their codes
+        instead of hashing the values again.
+
+        Args:
+            codes (np.ndarray): The code of every value, -1 when missing.
+            uniques (pd.Index): The distinct values, by code.
+        """
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self._count += len(codes)
+        self._nulls += len(codes) - int(counts.sum())
+        self._count_values(dict(zip(uniques, counts.tolist())))
+
+    def _count_values(self, counts: dict) -> None:
+        """
+        Adds the counts of a chunk's values. New values are only kept
+        while at most DISTINCT_LIMIT are, one more marks the count as
+        inexact, as for the distinct numbers.
+        """
+        if len(self._counts) + len(counts) <= DISTINCT_LIMIT + 1:
+            self._counts.update(counts)
+            return
+        for value, count in counts.items():
+            if value in self._counts:
+                self._counts[value] += count
+            elif len(self._counts) <= DISTINCT_LIMIT:
+                self._counts[value] = count
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics in a JSON serializable form.
+
+        Returns:
+            dict: The dtype, count, nulls, min, max, mean, distinct and top
+            values. Values that do not apply to the column are None.
+        """
+        present = self._count - self._nulls
+        numerical = self._dtype in ["int64", "float64"]
+        distinct = len(self._distinct) if numerical else len(self._counts)
+        return {
+            "dtype": self._dtype,
+            "count": self._count,
+            "nulls": self._nulls,
+            "min": _scalar(self._min),
+            "max": _scalar(self._max),
+            "mean": self._sum / present if numerical and present else None,
+            "distinct": min(distinct, DISTINCT_LIMIT),
+            "distinct_exact": distinct <= DISTINCT_LIMIT,
+            "top": [[_scalar(value), count] for value, count
+                    in self._counts.most_common(TOP_K)],
+        }
+
+
+def _scalar(value: object) -> object:
+    """
+    Converts a numpy scalar to the Python scalar json can serialize.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnarWriter():
+    """
+    Writes DataFrames to a file in the columnar format.
+
+    The rows are stored in row groups. Within a row group every column is
+    stored as one contiguous chunk: numbers and booleans as little-endian
+    arrays, strings as a dictionary of the distinct values followed by
+    int32 codes, with -1 for missing values. Integer chunks with missing
+    values are followed by a validity bitmap, and read as floats with NaN,
+    the way pandas reads such columns. Chunks are compressed with
+    zlib when a sample of them compresses well. A JSON footer at the end of the
+    file records the schema, the position of every chunk and the column
+    statistics, so a reader can fetch single row groups and columns with
+    range reads.
+
+    Layout: MAGIC, the chunks, the footer, its length as an unsigned
+    64-bit integer, MAGIC.
+    """
+
+    def __init__(self, file: BinaryIO, schema: List[dict],
+                 row_group_rows: int = ROW_GROUP_ROWS) -> None:
+        """
+        Starts a columnar file.
+
+        Args:
+            file (BinaryIO): The file to write to, positioned at its start.
+            schema (List[dict]): The name and dtype of every column. The
+            schema is locked: every DataFrame written must fit it.
+            row_group_rows (int): The maximum number of rows per row group.
+        """
+        for column in schema:
+            if column["dtype"] not in DTYPES:
+                raise ValueError(f"Unknown column dtype: {column['dtype']}")
+        self._file = file
+        self._schema = schema
+        self._row_group_rows = row_group_rows
+        self._row_groups = []
+        self._statistics = [ColumnStatistics(column["dtype"])
+                            for column in schema]
+        self._rows = 0
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+
+    def write(self, data: pd.DataFrame) -> None:
+        """
+        Appends rows, as one or more row groups.
+
+        Args:
+            data (pd.DataFrame): The rows, with the columns of the schema.
+
+        Raises:
+            ValueError: If the columns or their values do not fit the
+            schema.
+        """
+        names = [column["name"] for column in self._schema]
+        if [str(name) for name in data.columns] != names:
+            raise ValueError(
+                f"Expected the columns {names}, got {list(data.columns)}")
+        for start in range(0, len(data), self._row_group_rows):
+            self._write_row_group(
+                data.iloc[start:start + self._row_group_rows])
+
+    def close(self) -> dict:
+        """
+        Writes the footer. The file itself is left open.
+
+        Returns:
+            dict: The schema, the number of rows and the statistics of
+            every column.
+        """
+        footer = {
+            "schema": self._schema,
+            "num_rows": self._rows,
+            "row_groups": self._row_groups,
+            "statistics": {
+                column["name"]: statistics.to_dict()
+                for column, statistics in zip(self._schema, self._statistics)
+            },
+        }
+        encoded = json.dumps(footer).encode()
+        self._file.write(encoded)
+        self._file.write(_FOOTER_LENGTH.pack(len(encoded)))
+        self._file.write(MAGIC)
+        return {key: footer[key]
+                for key in ["schema", "num_rows", "statistics"]}
+
+    def _write_row_group(self, data: pd.DataFrame) -> None:
+        """
+        Writes every column of the rows as a chunk of one row group.
+        """
+        chunks = []
+        for column, statistics in zip(self._schema, self._statistics):
+            values = _cast(data[column["name"]], column,
+                           self._rows, self._rows + len(data))
+            if column["dtype"] == "string":
+                codes, uniques = pd.factorize(values)
+                statistics.update_codes(codes, uniques)
+                payload, chunk = _encode_strings(codes, uniques)
+            else:
+                statistics.update(values)
+                payload, chunk = _encode_values(values, column["dtype"])
+            compressed = _compress(payload)
+            if compressed is not None:
+                payload = compressed
+                chunk["compressed"] = True
+            chunk.update(offset=self._offset, length=len(payload))
+            self._file.write(payload)
+            self._offset += len(payload)
+            chunks.append(chunk)
+        self._row_groups.append({"num_rows": len(data), "columns": chunks})
+        self._rows += len(data)
+
+
+def _cast(values: pd.Series, column: dict, start: int,
+          end: int) -> pd.Series:
+    """
+    Casts the values of a chunk to the dtype of their column.
+
+    Raises:
+        ValueError: If the values do not fit the dtype, naming the column
+        and the rows.
+    """
+    dtype = column["dtype"]
+    if dtype == "string":
+        if isinstance(values.dtype, pd.StringDtype):
+            return values
+        return values.where(values.isna(), values.astype(str))
+    if dtype == "int64":
+        return _cast_integers(values, column, start, end)
+    fits = {
+        "float64": pd.api.types.is_numeric_dtype(values),
+        "bool": pd.api.types.is_bool_dtype(values),
+    }[dtype]
+    if not fits:
+        raise ValueError(
+            f"Column '{column['name']}' does not fit the schema type "
+            f"{dtype} in rows {start} to {end}")
+    return values.astype(dtype)
+
+
+def _cast_integers(values: pd.Series, column: dict, start: int,
+                   end: int) -> pd.Series:
+    """
+    Casts the values of a chunk to int64, or to float64 with NaN when
+    some are missing, as pandas reads integers with missing values.
+
+    A chunk is inferred as float when it holds missing values, or when
+    its numbers have no fractions; both fit.
+
+    Raises:
+        ValueError: If a present value is not an integer.
+    """
+    if pd.api.types.is_integer_dtype(values) and not values.hasnans:
+        return values.astype("int64")
+    numbers = pd.to_numeric(values, errors="coerce")
+    present = numbers[values.notna()]
+    if not (present.notna().all() and (present == np.round(present)).all()):
+        raise ValueError(
+            f"Column '{column['name']}' does not fit the schema type "
+            f"int64 in rows {start} to {end}")
+    if len(present) == len(values):
+        return numbers.astype("int64")
+    return numbers.astype("float64")
+
+
+def _compress(payload: bytes) -> Optional[bytes]:
+    """
+    Compresses a chunk, unless a sample of it shows that compression
+    saves less than a tenth, as with random floating point numbers.
+
+    Returns:
+        Optional[bytes]: The compressed chunk, or None to store it as is.
+    """
+    sample = payload[:COMPRESSION_SAMPLE]
+    if len(zlib.compress(sample, 1)) > 0.9 * len(sample):
+        return None
+    compressed = zlib.compress(payload, 1)
+    return compressed if len(compressed) < len(payload) else None
+
+
+def _encode_values(values: pd.Series, dtype: str) -> tuple:
+    """
+    Encodes a chunk of numbers or booleans as a little-endian array.
+
+    Integers with missing values are stored as zeros, followed by a
+    validity bitmap of the chunk's rows.
+
+    Returns:
+        tuple: The payload bytes and the chunk description.
+    """
+    if dtype == "int64" and values.hasnans:
+        valid = values.notna().to_numpy()
+        array = values.fillna(0).to_numpy().astype(_NUMPY_TYPES[dtype])
+        return array.tobytes() + np.packbits(valid).tobytes(), {
+            "validity": True}
+    array = np.asarray(values.to_numpy(), dtype=_NUMPY_TYPES[dtype])
+    return array.tobytes(), {}
+
+
+def _encode_strings(codes: np.ndarray, uniques: pd.Index) -> tuple:
+    """
+    Encodes a factorized chunk of strings as its dictionary and codes.
+
+    Returns:
+        tuple: The payload bytes and the chunk description.
+    """
+    dictionary = json.dumps(list(uniques)).encode()
+    payload = dictionary + codes.astype("<i4").tobytes()
+    return payload, {"dictionary": len(dictionary)}
+
+
+class ColumnarReader():
+    """
+    Reads data in the columnar format through range reads, fetching only
+    the footer and the chunks of the row groups and columns asked for.
+    """
+
+    def __init__(self, read_range: Callable[[int, int], bytes],
+                 size: int) -> None:
+        """
+        Opens columnar data by reading its footer.
+
+        Args:
+            read_range (Callable[[int, int], bytes]): Returns the given
+            number of bytes from the given offset of the data, such as a
+            Storage's load_range for the key of the data.
+            size (int): The size of the data in bytes.
+
+        Raises:
+            ValueError: If the data is not in the columnar format.
+        """
+        self._read_range = read_range
+        trailer = len(MAGIC) + _FOOTER_LENGTH.size
+        if size < len(MAGIC) + trailer:
+            raise ValueError("The data is not in the columnar format")
+        end = read_range(size - trailer, trailer)
+        if not is_columnar(end[_FOOTER_LENGTH.size:]):
+            raise ValueError("The data is not in the columnar format")
+        length = _FOOTER_LENGTH.unpack(end[:_FOOTER_LENGTH.size])[0]
+        self._footer = json.loads(read_range(size - trailer - length, length))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "ColumnarReader":
+        """
+        Opens columnar data held in memory.
+
+        Args:
+            data (bytes): The data.
+
+        Returns:
+            ColumnarReader: The reader of the data.
+        """
+        return ColumnarReader(
+            lambda offset, length: data[offset:offset + length], len(data))
+
+    @property
+    def schema(self) -> List[dict]:
+        """
+        Getter method for the name and dtype of every column.
+        """
+        return [dict(column) for column in self._footer["schema"]]
+
+    @property
+    def num_rows(self) -> int:
+        """
+        Getter method for the number of rows.
+        """
+        return self._footer["num_rows"]
+
+    @property
+    def statistics(self) -> dict:
+        """
+        Getter method for the statistics of every column, by name.
+        """
+        return json.loads(json.dumps(self._footer["statistics"]))
+
+    def read(self, rows: int = None, columns: List[str] = None,
+             categorical: List[str] = None) -> pd.DataFrame:
+        """
+        Reads the data as a DataFrame.
+
+        Args:
+            rows (int): The number of leading rows to read, only the row
+            groups holding them are fetched. Defaults to all rows.
+            columns (List[str]): The columns to read, in this order, only
+            their chunks are fetched. Defaults to all columns.
+            categorical (List[str]): String columns to read as
+            categoricals, built from the dictionaries and codes of their
+            chunks without creating a string per row. Defaults to none.
+
+        Raises:
+            ValueError: If a column does not exist.
+
+        Returns:
+            pd.DataFrame: The rows.
+        """
+        indices = self._column_indices(columns)
+        groups = []
+        remaining = self.num_rows if rows is None else rows
+        for group in self._footer["row_groups"]:
+            if remaining <= 0:
+                break
+            groups.append(self._decode_group(group, indices))
+            remaining -= group["num_rows"]
+        schema = self._footer["schema"]
+        names = [schema[index]["name"] for index in indices]
+        categorical = set(categorical or [])
+        data = {}
+        for position, index in enumerate(indices):
+            parts = [group[position] for group in groups]
+            name = schema[index]["name"]
+            if name in categorical and schema[index]["dtype"] == "string":
+                data[name] = self._categorical(parts)
+            elif parts:
+                data[name] = np.concatenate(
+                    [self._strings(*part) if isinstance(part, tuple)
+                     else part for part in parts])
+            else:
+                data[name] = np.empty(0, _NUMPY_TYPES[schema[index]["dtype"]])
+        frame = pd.DataFrame(data, columns=names)
+        return frame if rows is None else frame.iloc[:rows]
+
+    def iter_row_groups(self,
+                        columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Reads the data one row group at a time.
+
+        Args:
+            columns (List[str]): The columns to read, in this order.
+            Defaults to all columns.
+
+        Yields:
+            pd.DataFrame: The rows of a row group.
+        """
+        indices = self._column_indices(columns)
+        names = [self._footer["schema"][index]["name"] for index in indices]
+        for group in self._footer["row_groups"]:
+            arrays = [self._strings(*array) if isinstance(array, tuple)
+                      else array
+                      for array in self._decode_group(group, indices)]
+            yield pd.DataFrame(dict(zip(names, arrays)), columns=names)
+
+    def _column_indices(self, columns: Optional[List[str]]) -> List[int]:
+        """
+        Finds the positions of columns in the schema.
+        """
+        names = [column["name"] for column in self._footer["schema"]]
+        if columns is None:
+            return list(range(len(names)))
+        unknown = [name for name in columns if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return [names.index(name) for name in columns]
+
+    def _decode_group(self, group: dict,
+                      indices: List[int]) -> List[np.ndarray]:
+        """
+        Fetches and decodes the column chunks of a row group at the given
+        positions of the schema.
+        """
+        arrays = []
+        for index in indices:
+            chunk = group["columns"][index]
+            payload = self._read_range(chunk["offset"], chunk["length"])
+            arrays.append(self._decode(payload, chunk,
+                                       self._footer["schema"][index]["dtype"],
+                                       group["num_rows"]))
+        return arrays
+
+    @staticmethod
+    def _strings(dictionary: List[str], codes: np.ndarray) -> np.ndarray:
+        """
+        Looks up the codes of a string chunk, with NaN for missing strings.
+        """
+        # code -1 selects the trailing NaN
+        values = np.array(dictionary + [np.nan], dtype=object)
+        return values[codes]
+
+    @staticmethod
+    def _categorical(parts: List[tuple]) -> pd.Categorical:
+        """
+        Joins the dictionaries and codes of string chunks into a
+        categorical with sorted categories.
+        """
+        dictionaries = [dictionary for dictionary, _ in parts]
+        categories = pd.Index(np.unique(np.array(
+            [value for dictionary in dictionaries for value in dictionary],
+            dtype=object)))
+        codes = []
+        for dictionary, chunk_codes in parts:
+            # code -1 of a missing string stays -1
+            mapping = np.append(categories.get_indexer(dictionary), -1)
+            codes.append(mapping[chunk_codes])
+        return pd.Categorical.from_codes(
+            np.concatenate(codes) if codes else np.empty(0, np.int64),
+            categories=categories)
+
+    @staticmethod
+    def _decode(payload: bytes, chunk: dict, dtype: str,
+                rows: int) -> Union[np.ndarray, tuple]:
+        """
+        Decodes a column chunk into an array of its values, or the
+        dictionary and codes of a string chunk.
+        """
+        if chunk.get("compressed"):
+            payload = zlib.decompress(payload)
+        if chunk.get("validity"):
+            # integers with missing values read as floats with NaN
+            values = np.frombuffer(payload, dtype=_NUMPY_TYPES[dtype],
+                                   count=rows).astype(np.float64)
+            valid = np.unpackbits(np.frombuffer(payload[8 * rows:], "u1"),
+                                  count=rows).astype(bool)
+            values[~valid] = np.nan
+            return values
+        if dtype != "string":
+            return np.frombuffer(payload, dtype=_NUMPY_TYPES[dtype],
+                                 count=rows)
+        size = chunk["dictionary"]
+        dictionary = json.loads(payload[:size])
+        codes = np.frombuffer(payload[size:], dtype="<i4", count=rows)
+        return dictionary, codes
@@ -1,7 +1,44 @@
 from autoop.core.ml.artifact import Artifact
+from autoop.core.ml.columnar import (
+    MAGIC, ROW_GROUP_ROWS, ColumnarReader, categorical_columns,
+    compact_dtypes, encode, infer_schema, ingest_csv, is_columnar,
+    memory_report
+)
+from autoop.core.storage import Storage
 import pandas as pd
+from typing import BinaryIO, Callable, Iterator, List, Optional, Union
+import hashlib
 import io
 
+MAX_DELTA_DEPTH = 8
+
+
+class _HashingWriter():
+    """
+    Passes written bytes on to a file, hashing them along the way.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        """
+        Args:
+            file (BinaryIO): The file the bytes are written to.
+        """
+        self._file = file
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """
+        Writes bytes to the file and adds them to the hash.
+        """
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self) -> str:
+        """
+        Returns the SHA-256 hash of the bytes written so far.
+        """
+        return self._hash.hexdigest()
+
 
 class Dataset(Artifact):
     """
@@ -9,22 +46,72 @@ class Dataset(Artifact):
     storage, retrieval and conversion of tabular data
     between a pandas DataFrame and byte-encoded CSV format.
 
+    Datasets ingested in chunks are stored in the columnar format of
+    autoop.core.ml.columnar instead, which every read recognizes.
+
+    A delta version stores only the rows appended to its parent version,
+    and the positions of the parent's rows it deletes. It is rebuilt from
+    its parent when it is read, and a version more than MAX_DELTA_DEPTH
+    deltas away from a full version is stored in full instead.
+
     This class extends the base Artifact class
     to handle dataset-specific functionality,
     including reading from and saving to a DataFrame format.
     """
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args,
+                 parent: Callable[[], "Dataset"] = None,
+                 loader: Callable[[], bytes] = None, **kwargs) -> None:
         """
         Initializes the dataset artifact with a type set to 'dataset'.
 
         Args:
             *args: Variable length argument
             list for superclass initialization.
+            parent (Callable[[], Dataset]): Returns the parent version of
+            a delta version, called only when the parent is needed.
+            loader (Callable[[], bytes]): Returns the data of a dataset
+            created without it, called only when the data is needed.
             **kwargs: Arbitrary keyword arguments
             for superclass initialization.
         """
         super().__init__(type="dataset", *args, **kwargs)
+        self._parent = parent
+        self._loader = loader
+
+    @property
+    def data(self) -> Optional[bytes]:
+        """
+        Getter method for the data of the dataset, loaded on first use
+        when the dataset has a loader.
+        """
+        loader = getattr(self, "_loader", None)
+        if self._data is None and loader is not None:
+            self._data = loader()
+            self._loader = None
+        return self._data
+
+    def __getstate__(self) -> dict:
+        """
+        Pickles the dataset. A delta version is pickled in full, so the
+        pickle does not depend on the registry holding its parents.
+
+        Returns:
+            dict: The attributes of the dataset.
+        """
+        state = dict(self.__dict__)
+        state["_parent"] = None
+        state["_data"] = self.data
+        state["_loader"] = None
+        if self.delta is not None:
+            state["_data"], profile = encode(self.read(),
+                                             self.profile["schema"])
+            state["_metadata"] = {
+                key: value for key, value in self._metadata.items()
+                if key != "delta"
+            }
+            state["_metadata"]["profile"] = profile
+        return state
 
     @staticmethod
     def from_dataframe(data: pd.DataFrame, name: str, asset_path: str,
@@ -45,21 +132,145 @@ class Dataset(Artifact):
         return Dataset(
             name=name,
             asset_path=asset_path,
-            data=data.to_csv(index=False).encode(),
+            data=Dataset._encode(data),
+            version=version,
+        )
+
+    @staticmethod
+    def ingest(source: BinaryIO, name: str, asset_path: str,
+               storage: Storage, version: str = "1_0_0",
+               chunksize: int = ROW_GROUP_ROWS) -> "Dataset":
+        """
+        Creates a Dataset by streaming CSV data into storage in the
+        columnar format, one chunk of rows at a time.
+
+        The schema is inferred from the first chunk and locked, and the
+        statistics of every column are computed along the way and kept as
+        the dataset's profile, next to the hash of the stored bytes. The
+        returned dataset holds no data, it is already stored at its asset
+        path.
+
+        Args:
+            source (BinaryIO): The CSV data, such as an uploaded file.
+            name (str): The name of the dataset artifact.
+            asset_path (str): The key the dataset is stored at.
+            storage (Storage): The storage to write to.
+            version: The version of the dataset artifact. Defaults to "1_0_0".
+            chunksize (int): The number of rows per chunk.
+
+        Raises:
+            ValueError: If a chunk does not fit the locked schema.
+
+        Returns:
+            Dataset: A Dataset object whose metadata holds the profile.
+        """
+        with storage.open_write(asset_path) as f:
+            writer = _HashingWriter(f)
+            summary = ingest_csv(source, writer, chunksize)
+        return Dataset(
+            name=name,
+            asset_path=asset_path,
             version=version,
+            metadata={"profile": summary,
+                      "content_hash": writer.hexdigest()},
         )
 
-    def read(self) -> pd.DataFrame:
+    @staticmethod
+    def _encode(data: pd.DataFrame) -> bytes:
+        """
+        Encodes a DataFrame as CSV bytes, written straight into a binary
+        buffer instead of through an intermediate string.
+
+        Args:
+            data (DataFrame): The DataFrame to encode.
+
+        Returns:
+            bytes: The CSV encoded DataFrame.
+        """
+        buffer = io.BytesIO()
+        data.to_csv(buffer, index=False)
+        return buffer.getvalue()
+
+    def read(self, columns: List[str] = None, compact: bool = False,
+             dtype_backend: str = "numpy") -> pd.DataFrame:
         """
         Reads the dataset's byte-encoded CSV data
         and converts it to a pandas DataFrame.
 
+        Args:
+            columns (List[str]): The columns to read, in this order. Only
+            they are parsed of CSV data, and only their chunks are decoded
+            of columnar data. Defaults to all columns.
+            compact (bool): Whether to read the columns in the compact
+            dtypes of autoop.core.ml.columnar.compact_dtypes, chosen from
+            the statistics of the profile. Low-cardinality strings are
+            read straight into categoricals. Defaults to the dtypes
+            pandas infers.
+            dtype_backend (str): The dtype backend of a compact read, one
+            of DTYPE_BACKENDS of autoop.core.ml.columnar.
+
+        Raises:
+            ValueError: If a column does not exist.
+
         Returns:
             DataFrame: The decoded DataFrame of the dataset.
         """
-        bytes = super().read()
-        csv = bytes.decode()
-        return pd.read_csv(io.StringIO(csv))
+        if self.delta is not None:
+            data = self._rebuild(self.parent.read(columns),
+                                 self.read_delta(columns),
+                                 self.delta["deleted"])
+            # a delta profile has no statistics, compact_dtypes computes
+            # them from the rows
+            return compact_dtypes(data, dtype_backend=dtype_backend) \
+                if compact else data
+        statistics = (self.profile or {}).get("statistics") \
+            if compact else None
+        categorical = [
+            name for name in categorical_columns(statistics or {})
+            if columns is None or name in columns
+        ]
+        data = super().read()
+        if is_columnar(data):
+            frame = ColumnarReader.from_bytes(data).read(
+                columns=columns, categorical=categorical)
+        else:
+            frame = self._project(pd.read_csv(
+                io.BytesIO(data), usecols=columns,
+                dtype={name: "category" for name in categorical}), columns)
+        if not compact:
+            return frame
+        return compact_dtypes(frame, statistics, dtype_backend)
+
+    def memory_report(self, storage: Storage = None,
+                      dtype_backend: str = "numpy") -> dict:
+        """
+        Reports the memory a compact read saves.
+
+        Args:
+            storage (Storage): The storage holding the dataset at its
+            asset path, for datasets ingested into storage. Defaults to
+            the data of the artifact.
+            dtype_backend (str): The dtype backend of the compact read.
+
+        Returns:
+            dict: The dtype and bytes of every column in a default and a
+            compact read, the totals and the fraction saved, as returned
+            by autoop.core.ml.columnar.memory_report.
+        """
+        data = self.read() if storage is None else self.read_from(storage)
+        statistics = (self.profile or {}).get("statistics")
+        return memory_report(data, compact_dtypes(data, statistics,
+                                                  dtype_backend))
+
+    @staticmethod
+    def _project(data: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Puts the columns read with usecols, which keeps the order of the
+        file, in the order they were asked for.
+        """
+        if columns is None or list(data.columns) == list(columns):
+            return data
+        return data[list(columns)]
 
     def save(self, data: pd.DataFrame) -> bytes:
         """
@@ -72,16 +283,124 @@ class Dataset(Artifact):
         Returns:
             bytes: The encoded byte representation of the DataFrame.
         """
-        bytes = data.to_csv(index=False).encode()
-        return super().save(bytes)
+        return super().save(self._encode(data))
+
+    def read_from(self, storage: Storage, chunksize: int = None,
+                  columns: List[str] = None
+                  ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Reads the dataset's data from storage as a stream, without
+        loading the encoded data into memory first.
+
+        Args:
+            storage (Storage): The storage holding the dataset at its
+            asset path.
+            chunksize (int): The number of rows per chunk of CSV data.
+            Columnar data is read in chunks of one row group. Defaults to
+            reading all rows at once.
+            columns (List[str]): The columns to read, as for read.
+            Defaults to all columns.
+
+        Returns:
+            Union[DataFrame, Iterator[DataFrame]]: The DataFrame of the
+            dataset, or an iterator over DataFrames of chunksize rows.
+        """
+        if self.delta is not None:
+            data = self._rebuild(
+                self.parent.read_from(storage, columns=columns),
+                self.read_delta(columns), self.delta["deleted"])
+            if chunksize is None:
+                return data
+            return (data.iloc[start:start + chunksize]
+                    for start in range(0, len(data), chunksize))
+        reader = self._columnar_reader(storage)
+        if reader is not None:
+            if chunksize is None:
+                return reader.read(columns=columns)
+            return reader.iter_row_groups(columns)
+        if chunksize is None:
+            with storage.open_read(self.asset_path) as f:
+                return self._project(pd.read_csv(f, usecols=columns),
+                                     columns)
+        return self._read_chunks(storage, chunksize, columns)
+
+    def head(self, storage: Storage, rows: int) -> pd.DataFrame:
+        """
+        Reads the leading rows of the dataset's data in storage, for a
+        preview. Only the row groups holding them are read of columnar
+        data, and only the lines holding them of CSV data.
+
+        Args:
+            storage (Storage): The storage holding the dataset at its
+            asset path.
+            rows (int): The number of rows.
+
+        Returns:
+            DataFrame: The leading rows.
+        """
+        if self.delta is not None:
+            # enough parent rows to be left with rows after the deletions
+            deleted = self.delta["deleted"]
+            base = self.parent.head(storage, rows + len(deleted))
+            deleted = [row for row in deleted if row < len(base)]
+            return self._rebuild(base, self.read_delta(), deleted).head(rows)
+        reader = self._columnar_reader(storage)
+        if reader is not None:
+            return reader.read(rows=rows)
+        with storage.open_read(self.asset_path) as f:
+            return pd.read_csv(f, nrows=rows)
+
+    def _columnar_reader(self, storage: Storage) -> Optional[ColumnarReader]:
+        """
+        Opens the dataset's data in storage with range reads, if it is in
+        the columnar format.
+        """
+        if not is_columnar(storage.load_range(self.asset_path, 0,
+                                              len(MAGIC))):
+            return None
+        return ColumnarReader(
+            lambda offset, length: storage.load_range(self.asset_path,
+                                                      offset, length),
+            storage.size(self.asset_path))
+
+    def _read_chunks(self, storage: Storage, chunksize: int,
+                     columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yields the rows of the dataset's CSV data in storage in chunks,
+        keeping the data open until the last chunk is read.
+        """
+        with storage.open_read(self.asset_path) as f:
+            for chunk in pd.read_csv(f, chunksize=chunksize,
+                                     usecols=columns):
+                yield self._project(chunk, columns)
+
+    def write_to(self, storage: Storage, data: pd.DataFrame) -> None:
+        """
+        Writes a DataFrame as CSV data to the dataset's asset path in
+        storage as a stream, without building the encoded data in memory.
+
+        The data of the artifact itself is left unchanged.
+
+        Args:
+            storage (Storage): The storage to write to.
+            data (DataFrame): The DataFrame to write.
+        """
+        with storage.open_write(self.asset_path) as f:
+            data.to_csv(f, index=False)
 
     @staticmethod
-    def from_artifact(artifact: Artifact) -> "Dataset":
+    def from_artifact(artifact: Artifact,
+                      parent: Callable[[], "Dataset"] = None,
+                      loader: Callable[[], bytes] = None) -> "Dataset":
         """
     Creates a Dataset instance from an existing Artifact.
 
     Args:
         artifact (Artifact): The artifact to convert into a Dataset.
+        parent (Callable[[], Dataset]): Returns the parent version, if the
+            artifact is a delta version.
+        loader (Callable[[], bytes]): Returns the data, if the artifact
+            was found without it.
 
     Returns:
         Dataset: A Dataset object initialized with
@@ -93,9 +412,160 @@ class Dataset(Artifact):
             asset_path=artifact.asset_path,
             tags=artifact.tags,
             metadata=artifact.metadata,
-            data=artifact.data
+            data=artifact.data,
+            parent=parent,
+            loader=loader,
         )
 
+    @property
+    def delta(self) -> Optional[dict]:
+        """
+        Getter method for the description of a delta version.
+
+        Returns:
+            Optional[dict]: The id of the parent version, the number of
+            deltas to the nearest full version, the positions of the
+            deleted parent rows and the number and statistics of the
+            appended rows, or None if this is a full version.
+        """
+        return self._metadata.get("delta")
+
+    @property
+    def parent(self) -> "Dataset":
+        """
+        Getter method for the parent version of a delta version.
+
+        Raises:
+            ValueError: If this is not a delta version, or its parent was
+            not given.
+
+        Returns:
+            Dataset: The parent version.
+        """
+        if self.delta is None:
+            raise ValueError(f"Dataset {self.id} is not a delta version")
+        if self._parent is None:
+            raise ValueError(
+                f"The parent {self.delta['parent']} of dataset {self.id} "
+                "is not available, load it through the registry")
+        return self._parent()
+
+    def read_delta(self, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Reads only the rows a delta version appends to its parent.
+
+        Args:
+            columns (List[str]): The columns to read. Defaults to all
+            columns.
+
+        Returns:
+            DataFrame: The appended rows.
+        """
+        return ColumnarReader.from_bytes(super().read()).read(
+            columns=columns)
+
+    def append(self, rows: pd.DataFrame, version: str,
+               deleted: List[int] = None,
+               asset_path: str = None) -> "Dataset":
+        """
+        Creates a new version of the dataset that appends rows to it and
+        optionally deletes some of its rows.
+
+        The new version stores only the appended rows, in the schema of
+        this version, unless it would be more than MAX_DELTA_DEPTH deltas
+        away from a full version; then it is compacted into a full
+        version. Neither this version nor its parents are read otherwise.
+
+        Args:
+            rows (DataFrame): The rows to append, with the columns of the
+            dataset.
+            version (str): The version of the new dataset artifact.
+            deleted (List[int]): The positions of the rows of this version
+            to delete. Defaults to none.
+            asset_path (str): The path where the new version will be
+            stored. Defaults to this version's path with "@version".
+
+        Raises:
+            ValueError: If the rows do not fit the schema, or a deleted
+            position does not exist.
+
+        Returns:
+            Dataset: The new version, not registered yet.
+        """
+        deleted = sorted(set(deleted or []))
+        if self.profile is not None:
+            schema = self.profile["schema"]
+            num_rows = self.profile["num_rows"]
+        else:
+            data = self.read()
+            schema, num_rows = infer_schema(data), len(data)
+        if deleted and (deleted[0] < 0 or deleted[-1] >= num_rows):
+            raise ValueError(
+                f"Deleted rows must be positions below {num_rows}")
+        depth = (self.delta or {}).get("depth", 0) + 1
+        fields = {
+            "name": self.name,
+            "version": version,
+            "asset_path": asset_path or f"{self.asset_path}@{version}",
+            "tags": self.tags,
+        }
+        if depth > MAX_DELTA_DEPTH:
+            data, profile = encode(
+                self._rebuild(self.read(), rows, deleted), schema)
+            return Dataset(data=data, metadata={"profile": profile},
+                           **fields)
+        data, appended = encode(rows, schema)
+        metadata = {
+            "profile": {"schema": schema,
+                        "num_rows": num_rows - len(deleted) + len(rows)},
+            "delta": {"parent": self.id, "depth": depth,
+                      "deleted": deleted, "num_rows": len(rows),
+                      "statistics": appended["statistics"]},
+        }
+        return Dataset(data=data, metadata=metadata, parent=lambda: self,
+                       **fields)
+
+    @staticmethod
+    def _rebuild(base: pd.DataFrame, rows: pd.DataFrame,
+                 deleted: List[int]) -> pd.DataFrame:
+        """
+        Applies a delta to the rows of its parent version.
+        """
+        if deleted:
+            base = base.drop(index=base.index[deleted])
+        return pd.concat([base, rows], ignore_index=True)
+
+    @property
+    def profile(self) -> Optional[dict]:
+        """
+        Getter method for the profile of the dataset, computed when it was
+        ingested or registered.
+
+        Returns:
+            Optional[dict]: The schema, the number of rows and the
+            statistics of every column, as returned by
+            autoop.core.ml.columnar.profile, or None if the dataset was
+            not profiled.
+        """
+        return self.metadata.get("profile")
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        """
+        Getter method for the SHA-256 hash of the dataset's data, stored in
+        the metadata when it was ingested or registered.
+
+        A dataset that was not registered is hashed from the data it holds
+        in memory. Data that was not loaded yet is never loaded for it.
+
+        Returns:
+            Optional[str]: The hexadecimal hash, or None if it is unknown.
+        """
+        stored = self._metadata.get("content_hash")
+        if stored is not None or self._data is None:
+            return stored
+        return hashlib.sha256(self._data).hexdigest()
+
     def to_dataframe(self) -> pd.DataFrame:
         """
         Converts the dataset's stored
@@ -0,0 +1,286 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from autoop.core.ml.feature import Feature
+
+ORDERS = ["C", "F"]
+
+
+def expand_columns(matrix: np.ndarray, change: dict) -> np.ndarray:
+    """
+    Applies a change of the columns to a design matrix built before it.
+
+    Args:
+        matrix (np.ndarray): The design matrix of rows seen before the
+        change.
+        change (dict): The change, as returned by
+        DesignMatrixBuilder.partial_fit.
+
+    Returns:
+        np.ndarray: The design matrix the builder now builds of the rows.
+    """
+    expanded = np.zeros((matrix.shape[0], change["n_columns"]),
+                        dtype=matrix.dtype)
+    expanded[:, change["positions"]] = matrix * change["scale"]
+    expanded[:, change["positions"]] += change["shift"]
+    return expanded
+
+
+def _numbers(column: pd.Series) -> np.ndarray:
+    """
+    Returns a numerical column as a float64 column vector, whatever its
+    dtype, with NaN for missing values.
+    """
+    return column.to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1)
+
+
+def _unique(column: pd.Series) -> np.ndarray:
+    """
+    Returns the distinct values of a column. Of a categorical column only
+    its codes are scanned.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        present = np.unique(codes)
+        values = column.cat.categories.to_numpy(dtype=object)[
+            present[present >= 0]]
+        if len(present) and present[0] < 0:
+            return np.append(values, np.nan)
+        return values
+    return pd.unique(column.to_numpy())
+
+
+def _category_codes(column: pd.Series, categories: np.ndarray) -> np.ndarray:
+    """
+    Returns the position of every value of a column in the categories of
+    an encoder, -1 for unknown values. The categories of a categorical
+    column are looked up once, instead of every value. Missing values
+    are encoded as the NaN category when the encoder has one, whatever
+    the dtype of the column.
+    """
+    index = pd.Index(categories)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # code -1 of a missing value selects the trailing position of NaN
+        missing = index.get_indexer([np.nan])[0]
+        mapping = np.append(index.get_indexer(column.cat.categories),
+                            missing)
+        return mapping[column.cat.codes.to_numpy()]
+    return index.get_indexer(column.to_numpy())
+
+
+class DesignMatrixBuilder():
+    """
+    Builds the design matrix of a list of features in a single array.
+
+    The column layout is computed before any data is transformed: every
+    feature gets a block of columns, one for a numerical feature and one
+    per category for a categorical feature. The matrix is then allocated
+    once, in row major (C) or column major (Fortran) order, and every
+    feature transformer writes straight into its own block, so no
+    per-feature arrays are concatenated.
+    """
+
+    def __init__(self, features: List[Feature],
+                 dtype: np.dtype = np.float64, order: str = "C") -> None:
+        """
+        Initializes the builder.
+
+        Args:
+            features (List[Feature]): The features, laid out in the order
+            of their names.
+            dtype (np.dtype): The floating point type of the matrix.
+            order (str): The memory layout of the matrix, one of ORDERS.
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown memory layout: {order}")
+        self._features = sorted(features, key=lambda feature: feature.name)
+        self._dtype = np.dtype(dtype)
+        self._order = order
+        self._transformers = {}
+        self._artifacts = {}
+        self._column_map = {}
+        self._columns = []
+
+    @property
+    def column_map(self) -> Dict[str, slice]:
+        """
+        Getter method for the columns of every feature.
+
+        Returns:
+            Dict[str, slice]: The block of matrix columns of every feature,
+            by feature name.
+        """
+        return dict(self._column_map)
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Getter method for the names of the matrix columns.
+
+        Returns:
+            List[str]: The feature name of every numerical column and
+            "<feature>=<category>" for every one-hot column.
+        """
+        return list(self._columns)
+
+    @property
+    def artifacts(self) -> Dict[str, dict]:
+        """
+        Getter method for the fitted transformers of every feature.
+
+        Returns:
+            Dict[str, dict]: The preprocessing artifact of every feature,
+            by feature name.
+        """
+        return dict(self._artifacts)
+
+    def fit(self, data: pd.DataFrame) -> "DesignMatrixBuilder":
+        """
+        Fits the transformer of every feature and computes the layout.
+
+        Args:
+            data (DataFrame): The raw data of the dataset.
+
+        Returns:
+            DesignMatrixBuilder: The builder itself.
+        """
+        self._transformers = {}
+        self._artifacts = {}
+        self._column_map = {}
+        self._columns = []
+        for feature in self._features:
+            column = data[feature.name]
+            if feature.type == "categorical":
+                # the encoder sorts the distinct values into categories
+                encoder = OneHotEncoder(dtype=self._dtype).fit(
+                    _unique(column).reshape(-1, 1))
+                transformer = encoder
+                names = [f"{feature.name}={category}"
+                         for category in encoder.categories_[0]]
+                artifact = {
+                    "type": "OneHotEncoder", "encoder": encoder.get_params()}
+            else:
+                # statistics in float64 whatever the dtype of the matrix
+                scaler = StandardScaler().fit(_numbers(column))
+                transformer = scaler
+                names = [feature.name]
+                artifact = {
+                    "type": "StandardScaler", "scaler": scaler.get_params()}
+            start = len(self._columns)
+            self._transformers[feature.name] = transformer
+            self._artifacts[feature.name] = artifact
+            self._column_map[feature.name] = slice(start, start + len(names))
+            self._columns += names
+        return self
+
+    def partial_fit(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Updates the fitted transformers with new rows.
+
+        Scalers update their mean and variance with running statistics,
+        and encoders add the categories they had not seen, after the
+        known ones. Both change the design matrix of the rows seen
+        before; the returned change lets a fitted model follow it.
+
+        Args:
+            data (DataFrame): The new rows.
+
+        Returns:
+            Dict[str, np.ndarray]: The change of the columns: for every
+            old column its new position, and a scale and shift such that
+            new[:, positions] = old * scale + shift for the old rows. The
+            columns of new categories are zero for the old rows. Under
+            "n_columns" the new number of columns.
+        """
+        positions, scales, shifts = [], [], []
+        columns = []
+        for feature in self._features:
+            old = self._column_map[feature.name]
+            start = len(columns)
+            column = data[feature.name]
+            transformer = self._transformers[feature.name]
+            if isinstance(transformer, OneHotEncoder):
+                categories = transformer.categories_[0]
+                unique = _unique(column)
+                unseen = unique[pd.Index(categories).get_indexer(unique) < 0]
+                # sorted with NaN last, as the encoder sorts its categories
+                missing = pd.isna(unseen)
+                unseen = np.concatenate([np.sort(unseen[~missing]),
+                                         unseen[missing][:1]])
+                # only transform reads the categories
+                transformer.categories_ = [
+                    np.concatenate([categories, unseen])]
+                names = [f"{feature.name}={category}"
+                         for category in transformer.categories_[0]]
+                scale = np.ones(old.stop - old.start)
+                shift = np.zeros(old.stop - old.start)
+            else:
+                mean = transformer.mean_.copy()
+                deviation = transformer.scale_.copy()
+                transformer.partial_fit(_numbers(column))
+                names = [feature.name]
+                scale = deviation / transformer.scale_
+                shift = (mean - transformer.mean_) / transformer.scale_
+            positions.append(start + np.arange(old.stop - old.start))
+            scales.append(scale)
+            shifts.append(shift)
+            self._column_map[feature.name] = slice(start, start + len(names))
+            columns += names
+        self._columns = columns
+        return {
+            "positions": np.concatenate(positions),
+            "scale": np.concatenate(scales),
+            "shift": np.concatenate(shifts),
+            "n_columns": len(columns),
+        }
+
+    def transform(self, data: pd.DataFrame,
+                  rows: np.ndarray = None) -> np.ndarray:
+        """
+        Allocates the matrix and writes every feature into its block.
+
+        Args:
+            data (DataFrame): The raw data, with the columns of the fitted
+            features.
+            rows (np.ndarray): The data rows to write, in the order they
+            appear in the matrix. Defaults to all rows in order.
+
+        Returns:
+            np.ndarray: The design matrix. Categories unknown to a fitted
+            encoder are written as all zero columns.
+        """
+        n_rows = len(data) if rows is None else len(rows)
+        matrix = np.empty((n_rows, len(self._columns)),
+                          dtype=self._dtype, order=self._order)
+        for feature in self._features:
+            block = matrix[:, self._column_map[feature.name]]
+            column = data[feature.name]
+            if rows is not None:
+                column = column.iloc[rows]
+            transformer = self._transformers[feature.name]
+            if isinstance(transformer, OneHotEncoder):
+                codes = _category_codes(column, transformer.categories_[0])
+                known = np.flatnonzero(codes >= 0)
+                block[...] = 0
+                block[known, codes[known]] = 1
+            else:
+                block[:, 0] = transformer.transform(_numbers(column))[:, 0]
+        return matrix
+
+    def build(self, data: pd.DataFrame,
+              rows: np.ndarray = None) -> np.ndarray:
+        """
+        Fits the transformers on the data and builds its design matrix.
+
+        Args:
+            data (DataFrame): The raw data of the dataset.
+            rows (np.ndarray): The data rows to write, in the order they
+            appear in the matrix. Defaults to all rows in order.
+
+        Returns:
+            np.ndarray: The design matrix.
+        """
+        return self.fit(data).transform(data, rows)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Tuple
 import numpy as np
 
 METRICS = [
@@ -68,6 +69,28 @@ class Metric(ABC):
 # add here concrete implementations of the Metric class
 
 
+def _as_columns(y_ground: np.ndarray,
+                y_pred: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Flattens a single target column, so values are compared row by row
+
+    A target of shape (N, 1) and predictions of shape (N,) would otherwise
+    broadcast into an (N, N) matrix. The arrays keep their dtype, so the
+    metrics run in float32 for float32 data.
+
+    Args:
+        y_ground (np.ndarray): True Values
+        y_pred (np.ndarray): Predicted Values
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The values with matching shapes
+    """
+    y_ground = np.asarray(y_ground)
+    y_pred = np.asarray(y_pred)
+    if y_ground.size == y_pred.size and y_ground.shape != y_pred.shape:
+        return y_ground.ravel(), y_pred.ravel()
+    return y_ground, y_pred
+
+
 class MeanSquaredError(Metric):
     """Class for MeanSquaredError. Inherits from Metric
     """
@@ -82,6 +105,7 @@ class MeanSquaredError(Metric):
         Returns:
             float: Calculated Mean Squared Error
         """
+        y_ground, y_pred = _as_columns(y_ground, y_pred)
         return np.mean((y_ground - y_pred)**2)
 
 
@@ -172,6 +196,7 @@ class MeanAbsoluteError(Metric):
         Returns:
             float: Calculated Mean Absolute Error
         """
+        y_ground, y_pred = _as_columns(y_ground, y_pred)
         return np.mean(np.abs(y_ground - y_pred))
 
 
@@ -189,6 +214,7 @@ class Rsquared(Metric):
         Returns:
             float: Calculated R^2
         """
+        y_ground, y_pred = _as_columns(y_ground, y_pred)
 
         ss_tot = np.sum((y_ground - np.mean(y_ground)) ** 2)
         ss_res = np.sum((y_ground - y_pred) ** 2)
@@ -2,7 +2,13 @@ import numpy as np
 from pydantic import PrivateAttr
 from sklearn.neighbors import KNeighborsClassifier as knn
 
+from autoop.core.ml.design_matrix import expand_columns
 from autoop.core.ml.model import Model
+from autoop.core.ml.model.classification.random_projection_forest import (
+    RandomProjectionForest
+)
+
+ALGORITHMS = ["auto", "brute", "kd_tree", "ball_tree", "approximate"]
 
 
 class KNN(Model):
@@ -14,10 +20,16 @@ class KNN(Model):
     input, based on distance, and predicts the outcome as the most common label
     among those neighbors.
 
+    The neighbor search backend is configurable: exact brute force search
+    (chunked matrix products), a KD-tree or ball tree, or an approximate
+    random projection forest whose number of trees trades recall for
+    speed.
     """
     _knn: knn = PrivateAttr(default=None)
 
-    def __init__(self, k: int = 3) -> None:
+    def __init__(self, k: int = 3, algorithm: str = "auto",
+                 leaf_size: int = 30, n_trees: int = 10,
+                 **resources) -> None:
         """
         Initializes the KNNWrapper model
         with the specified number of neighbors.
@@ -25,11 +37,54 @@ class KNN(Model):
         Arg:
             k:  The number of nearest neighbors to consider when making
             predictions (default is 3).
+            algorithm: The neighbor search backend, one of ALGORITHMS.
+            "auto" lets scikit-learn choose between the exact backends,
+            "approximate" uses a random projection forest.
+            leaf_size: The number of points in the leaves of the tree
+            based backends.
+            n_trees: The number of trees of the approximate backend; more
+            trees give a higher recall but slower queries.
+            **resources: The resource settings of Model. n_jobs is the
+            number of parallel jobs answering queries and random_state
+            seeds the random projections.
         """
-        super().__init__()
-        self._knn = knn(n_neighbors=k)
+        super().__init__(**resources)
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown KNN algorithm: {algorithm}")
+        self._k = k
+        self._algorithm = algorithm
+        self._leaf_size = leaf_size
+        self._n_trees = n_trees
+        self._index = None
+        self._labels = None
+        self._knn = None
+        if algorithm == "approximate":
+            self._index = RandomProjectionForest(
+                n_trees=n_trees, leaf_size=leaf_size,
+                random_state=self._resources["random_state"]
+            )
+        else:
+            self._knn = knn(n_neighbors=k, algorithm=algorithm,
+                            leaf_size=leaf_size,
+                            n_jobs=self._resources["n_jobs"])
         self._type = "classification"
 
+    @property
+    def hyperparameters(self) -> dict:
+        """
+        Getter method for the arguments the model was created with.
+
+        Returns:
+            dict: The number of neighbors and the search configuration.
+        """
+        return {
+            **super().hyperparameters,
+            "k": self._k,
+            "algorithm": self._algorithm,
+            "leaf_size": self._leaf_size,
+            "n_trees": self._n_trees,
+        }
+
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
         """
         Trains the KNN model on the provided dataset.
@@ -40,7 +95,84 @@ class KNN(Model):
             ground_truths (ndarray): An array containing the true
             labels for each observation.
         """
-        self._knn.fit(observations, ground_truths)
+        self._build(observations, ground_truths)
+        self._param = {
+            "observations": observations,
+            "ground_truths": ground_truths,
+        }
+
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Adds rows to the training data of the model.
+
+        KNN does not train, so continuing only rebuilds the neighbor
+        search backend over the old and the new rows.
+
+        Arg:
+            observations (ndarray): The new observations, a matrix where
+            each row (n) is an observation.
+            ground_truths (ndarray): An array containing the true
+            labels for each new observation.
+            n_iterations (int): Unused, KNN has no iterations.
+        """
+        if not self._param:
+            self.fit(observations, ground_truths)
+            return
+        self.fit(
+            np.concatenate([self._param["observations"], observations]),
+            np.concatenate([self._param["ground_truths"], ground_truths])
+        )
+
+    def adapt(self, inputs: dict, outputs: dict) -> None:
+        """
+        Maps the stored training data to changed columns.
+
+        Args:
+            inputs (dict): The change of the input columns, as returned
+            by DesignMatrixBuilder.partial_fit.
+            outputs (dict): The change of the label columns.
+
+        Raises:
+            NotImplementedError: If the model is not fitted or its labels
+            are not a matrix.
+        """
+        if not self._param or np.ndim(self._param["ground_truths"]) != 2:
+            raise NotImplementedError(
+                "KNN can only adapt fitted label matrices")
+        self.fit(expand_columns(self._param["observations"], inputs),
+                 expand_columns(self._param["ground_truths"], outputs))
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the model from its training data.
+
+        Args:
+            parameters (dict): The parameters of a fitted KNN model.
+        """
+        super().set_parameters(parameters)
+        self._build(parameters["observations"],
+                    parameters["ground_truths"])
+
+    def _build(self, observations: np.ndarray,
+               ground_truths: np.ndarray) -> None:
+        """
+        Builds the neighbor search backend over the training data.
+
+        For the approximate backend the labels of every output are encoded
+        as class indices, so votes can be counted with array operations.
+        """
+        if self._knn is not None:
+            self._knn.fit(observations, ground_truths)
+            return
+        self._index.build(observations)
+        labels = np.asarray(ground_truths)
+        columns = labels.reshape(labels.shape[0], -1)
+        self._labels = [
+            np.unique(column, return_inverse=True) for column in columns.T
+        ]
+        self._label_shape = labels.shape[1:]
 
     def predict(self, observations: np.ndarray) -> np.ndarray:
         """
@@ -54,4 +186,19 @@ class KNN(Model):
             A list of predicted labels for each observation the input data.
 
         """
-        return self._knn.predict(observations)
+        if self._knn is not None:
+            with self.resource_limits():
+                return self._knn.predict(observations)
+        _, neighbors = self._index.query(observations, self._k,
+                                         n_jobs=self._resources["n_jobs"])
+        found = neighbors >= 0
+        rows = np.repeat(np.arange(neighbors.shape[0]), neighbors.shape[1])
+        predictions = []
+        for classes, codes in self._labels:
+            votes = np.zeros((neighbors.shape[0], len(classes)))
+            np.add.at(votes, (rows[found.ravel()],
+                              codes[neighbors[found]]), 1)
+            # ties go to the first class, as in scikit-learn
+            predictions.append(classes[np.argmax(votes, axis=1)])
+        predictions = np.stack(predictions, axis=1)
+        return predictions.reshape((-1,) + self._label_shape)
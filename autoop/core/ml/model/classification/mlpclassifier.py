@@ -1,6 +1,8 @@
 import numpy as np
 from pydantic import PrivateAttr
 from sklearn.neural_network import MLPClassifier as mlp
+from sklearn.preprocessing import LabelBinarizer
+from sklearn.utils.multiclass import type_of_target
 
 from autoop.core.ml.model import Model
 
@@ -12,19 +14,64 @@ class Neural_network_classifier(Model):
 
     This model uses a multi-layer perceptron (MLP) to classify observations
     into specified categories trained through backpropagation on labeled data.
+
+    With early stopping, a fraction of the training data is held out and
+    training stops once the validation score no longer improves. A fitted
+    network, also one restored from its parameters, can continue training
+    from its current weights.
     """
 
     _mlp: mlp = PrivateAttr(default=None)
 
-    def __init__(self) -> None:
+    def __init__(self, max_iter: int = 200, early_stopping: bool = False,
+                 validation_fraction: float = 0.1,
+                 n_iter_no_change: int = 10, **resources) -> None:
         """
         Initializes the neural network classifier.
+
+        The network has no n_jobs argument of its own, its matrix products
+        run on as many BLAS threads as the resource settings allow.
+
+        Args:
+            max_iter (int): The maximum number of epochs.
+            early_stopping (bool): Whether to stop training when the score
+            on a held out validation set stops improving.
+            validation_fraction (float): The fraction of the training data
+            held out for early stopping.
+            n_iter_no_change (int): The number of epochs without
+            improvement after which training stops.
+            **resources: The resource settings of Model: n_jobs,
+            memory_budget and random_state.
         """
 
-        super().__init__()
-        self._logr = mlp()
+        super().__init__(**resources)
+        self._max_iter = max_iter
+        self._early_stopping = early_stopping
+        self._validation_fraction = validation_fraction
+        self._n_iter_no_change = n_iter_no_change
+        self._logr = mlp(max_iter=max_iter, early_stopping=early_stopping,
+                         validation_fraction=validation_fraction,
+                         n_iter_no_change=n_iter_no_change,
+                         random_state=self._resources["random_state"])
         self._type = "classification"
 
+    @property
+    def hyperparameters(self) -> dict:
+        """
+        Getter method for the arguments the model was created with.
+
+        Returns:
+            dict: The training and early stopping settings and the
+            resource settings.
+        """
+        return {
+            **super().hyperparameters,
+            "max_iter": self._max_iter,
+            "early_stopping": self._early_stopping,
+            "validation_fraction": self._validation_fraction,
+            "n_iter_no_change": self._n_iter_no_change,
+        }
+
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
         """
         Trains the neural network classifier on the provided dataset.
@@ -36,7 +83,144 @@ class Neural_network_classifier(Model):
             labels for each observation.
         """
 
-        self._logr.fit(observations, ground_truths)
+        self._logr.set_params(warm_start=False, max_iter=self._max_iter)
+        with self.resource_limits():
+            self._logr.fit(observations, ground_truths)
+        self._store_parameters(ground_truths)
+
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Trains the network further, starting from its current weights.
+
+        The data must contain the same classes the network was trained on.
+
+        Arg:
+            observations (ndarray): The input data, a matrix where each
+            row (n) is an observation and each coloumn (p) is a feature.
+            ground_truths (ndarray): An array containing the true
+            labels for each observation.
+            n_iterations (int): The maximum number of additional epochs,
+            defaults to max_iter.
+        """
+        if not self._param:
+            self.fit(observations, ground_truths)
+            return
+        network = self._logr
+        if not hasattr(network, "t_"):
+            self._restore_training_state()
+        # a network stopped early would stop again after one epoch
+        network._no_improvement_count = 0
+        network.set_params(warm_start=True,
+                           max_iter=n_iterations or self._max_iter)
+        try:
+            with self.resource_limits():
+                network.fit(observations, ground_truths)
+        finally:
+            network.set_params(warm_start=False, max_iter=self._max_iter)
+        self._store_parameters(ground_truths)
+
+    def adapt(self, inputs: dict, outputs: dict) -> None:
+        """
+        Rewrites the first layer for changed input columns.
+
+        An input rescaled as x' = x * scale + shift is undone by dividing
+        its weights by the scale and moving the shift into the biases, so
+        the network computes the same for the rows it was trained on. The
+        weights of new columns start at zero.
+
+        Args:
+            inputs (dict): The change of the input columns, as returned
+            by DesignMatrixBuilder.partial_fit.
+            outputs (dict): The change of the label columns.
+
+        Raises:
+            NotImplementedError: If the network is not fitted or new
+            classes were added.
+        """
+        if not self._param:
+            raise NotImplementedError("The network is not fitted")
+        classes = np.arange(outputs["n_columns"])
+        if not np.array_equal(outputs["positions"], classes):
+            raise NotImplementedError(
+                "The network cannot learn new classes incrementally")
+        weights = self._param["coefs"][0] / inputs["scale"][:, None]
+        coefs = np.zeros((inputs["n_columns"], weights.shape[1]),
+                         dtype=weights.dtype)
+        coefs[inputs["positions"]] = weights
+        intercepts = self._param["intercepts"][0] - inputs["shift"] @ weights
+        self.set_parameters({
+            **self._param,
+            "coefs": [coefs, *self._param["coefs"][1:]],
+            "intercepts": [intercepts, *self._param["intercepts"][1:]],
+        })
+        self._restore_training_state()
+
+    def _restore_training_state(self) -> None:
+        """
+        Sets up the training state scikit-learn keeps after a fit.
+
+        Restored weights are read-only views on the serialized model, so
+        they are copied before the optimizer updates them in place. Part
+        of the state is private to scikit-learn, it is only set, never
+        read, and matches the versions requirements.txt allows.
+        """
+        network = self._logr
+        network.coefs_ = [np.array(c) for c in network.coefs_]
+        network.intercepts_ = [np.array(i) for i in network.intercepts_]
+        network.n_iter_ = 0
+        network.t_ = 0
+        network.loss_curve_ = []
+        network._no_improvement_count = 0
+        network._best_coefs = [c.copy() for c in network.coefs_]
+        network._best_intercepts = [i.copy() for i in network.intercepts_]
+        if self._early_stopping:
+            network.validation_scores_ = []
+            network.best_validation_score_ = -np.inf
+            network.best_loss_ = None
+        else:
+            network.best_loss_ = np.inf
+            network.validation_scores_ = None
+            network.best_validation_score_ = None
+
+    def _store_parameters(self, ground_truths: np.ndarray) -> None:
+        """
+        Keeps the weights and labels of the fitted network as parameters.
+
+        Args:
+            ground_truths (ndarray): The labels the network was trained
+            on, whose type of target the network predicts.
+        """
+        self._param = {
+            "coefs": self._logr.coefs_,
+            "intercepts": self._logr.intercepts_,
+            "classes": self._logr.classes_,
+            "label_type": type_of_target(ground_truths),
+            "out_activation": self._logr.out_activation_,
+        }
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the fitted weights into the network.
+
+        Args:
+            parameters (dict): The parameters of a fitted neural network.
+        """
+        super().set_parameters(parameters)
+        coefs = list(parameters["coefs"])
+        self._logr.coefs_ = coefs
+        self._logr.intercepts_ = list(parameters["intercepts"])
+        self._logr.n_layers_ = len(coefs) + 1
+        self._logr.n_outputs_ = coefs[-1].shape[1]
+        self._logr.n_features_in_ = coefs[0].shape[0]
+        self._logr.out_activation_ = parameters["out_activation"]
+        self._logr.classes_ = parameters["classes"]
+        binarizer = LabelBinarizer()
+        binarizer.classes_ = parameters["classes"]
+        binarizer.y_type_ = parameters["label_type"]
+        binarizer.sparse_input_ = False
+        self._logr._label_binarizer = binarizer
 
     def predict(self, observations: np.ndarray) -> np.ndarray:
         """
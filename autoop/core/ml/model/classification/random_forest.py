@@ -3,6 +3,12 @@ from pydantic import PrivateAttr
 from sklearn.ensemble import RandomForestClassifier as RFC
 
 from autoop.core.ml.model import Model
+from autoop.core.ml.model.tree_ensemble import (
+    compile_trees, concatenate_trees, predict_trees
+)
+
+# the batch size up to which the compiled trees beat scikit-learn
+SMALL_BATCH = 256
 
 
 class Random_forest(Model):
@@ -11,16 +17,28 @@ class Random_forest(Model):
 
     This model uses an ensemble of decision trees to classify observations
     based on patterns learned from the training data.
+
+    Batches of up to SMALL_BATCH observations are predicted with the
+    fitted trees compiled into flat arrays, which avoids the per call
+    overhead of scikit-learn. Larger batches use the scikit-learn
+    estimator, as long as it holds the whole fitted model.
+
+    A fitted forest can continue training by growing more trees, for
+    example on new rows, which are added to the existing ones.
     """
 
     _rfc: RFC = PrivateAttr(default=None)
 
-    def __init__(self) -> None:
+    def __init__(self, **resources) -> None:
         """
         Initializes the random forest classifier.
+
+        Args:
+            **resources: The resource settings of Model: n_jobs,
+            memory_budget and random_state.
         """
-        super().__init__()
-        self._rfc = RFC()
+        super().__init__(**resources)
+        self._rfc = self._estimator()
         self._type = "classification"
 
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
@@ -33,7 +51,131 @@ class Random_forest(Model):
             ground_truths (ndarray): An array containing the true
             labels for each observation.
         """
-        self._rfc.fit(observations, ground_truths)
+        self._rfc = self._estimator()
+        with self.resource_limits():
+            self._rfc.fit(observations, ground_truths)
+        self._param = self._compile(self._rfc)
+
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Grows more trees on the provided dataset and adds them to the
+        forest.
+
+        Classes that only occur in the new data are added to the classes
+        of the forest. The model predicts with its compiled trees
+        afterwards.
+
+        Arg:
+            observations (ndarray): The input data, a matrix where each
+            row (n) is an observation. Each column (p) is a feature.
+            ground_truths (ndarray): An array containing the true
+            labels for each observation.
+            n_iterations (int): The number of trees to add, defaults to
+            the number of trees of a full fit.
+        """
+        if not self._param:
+            self.fit(observations, ground_truths)
+            return
+        current = self._param
+        # a fixed seed would grow the same trees again on the same rows
+        forest = self._estimator(n_iterations, len(current["roots"]))
+        with self.resource_limits():
+            forest.fit(observations, ground_truths)
+        grown = self._compile(forest)
+        if grown["n_outputs"] != current["n_outputs"]:
+            raise ValueError("The new data has a different number of outputs")
+        classes = [np.union1d(old, new) for old, new
+                   in zip(current["classes"], grown["classes"])]
+        trees = concatenate_trees(self._widen(current, classes),
+                                  self._widen(grown, classes))
+        self._param = {
+            **trees,
+            "classes": classes,
+            "n_outputs": current["n_outputs"],
+        }
+        self._rfc = self._estimator()
+
+    @staticmethod
+    def _compile(forest: RFC) -> dict:
+        """
+        Compiles the trees of a fitted forest.
+
+        Returns:
+            dict: The node arrays of the trees, the classes of every output
+            and the number of outputs.
+        """
+        classes = forest.classes_
+        if forest.n_outputs_ == 1:
+            classes = [classes]
+        return {
+            **compile_trees(
+                [estimator.tree_ for estimator in forest.estimators_],
+                normalize=True
+            ),
+            "classes": [np.asarray(c) for c in classes],
+            "n_outputs": forest.n_outputs_,
+        }
+
+    @staticmethod
+    def _widen(parameters: dict, classes: list) -> dict:
+        """
+        Lays out the leaf probabilities of compiled trees for a superset
+        of their classes.
+
+        Args:
+            parameters (dict): The compiled trees, as made by _compile.
+            classes (list): The sorted classes of every output, each a
+            superset of the classes of the trees.
+
+        Returns:
+            dict: The node arrays of the trees with the new leaf values.
+        """
+        width = max(len(c) for c in classes)
+        value = parameters["value"].reshape(
+            parameters["value"].shape[0], parameters["n_outputs"], -1
+        )
+        widened = np.zeros((value.shape[0], value.shape[1], width))
+        for k, (own, target) in enumerate(zip(parameters["classes"],
+                                              classes)):
+            widened[:, k, np.searchsorted(target, own)] = \
+                value[:, k, :len(own)]
+        trees = {key: parameters[key] for key in
+                 ["feature", "threshold", "left", "right", "roots"]}
+        trees["value"] = widened.reshape(value.shape[0], -1)
+        return trees
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the model from its compiled trees.
+
+        The restored model predicts with the compiled trees instead of the
+        scikit-learn estimator.
+
+        Args:
+            parameters (dict): The parameters of a fitted random forest.
+        """
+        super().set_parameters(parameters)
+        self._rfc = self._estimator()
+
+    def _estimator(self, n_estimators: int = None,
+                   n_grown: int = 0) -> RFC:
+        """
+        Creates an unfitted forest that grows its trees in parallel.
+
+        Args:
+            n_estimators (int): The number of trees, defaults to the
+            scikit-learn default.
+            n_grown (int): The number of trees the model already has,
+            added to a fixed seed so new trees differ from them.
+        """
+        random_state = self._resources["random_state"]
+        if random_state is not None:
+            random_state += n_grown
+        return RFC(n_estimators=n_estimators or 100,
+                   n_jobs=self._resources["n_jobs"],
+                   random_state=random_state)
 
     def predict(self, observations: np.ndarray) -> np.ndarray:
         """
@@ -47,4 +189,20 @@ class Random_forest(Model):
         Returns:
             A list of predicted labels for each observation in the input data.
         """
-        return self._rfc.predict(observations)
+        small = np.shape(observations)[0] <= SMALL_BATCH
+        if not small and hasattr(self._rfc, "estimators_"):
+            return self._rfc.predict(observations)
+        params = self._param
+        # scikit-learn evaluates its trees on float32 inputs
+        observations = np.asarray(observations, dtype=np.float32)
+        n_outputs = params["n_outputs"]
+        proba = predict_trees(params, observations).reshape(
+            observations.shape[0], n_outputs, -1
+        )
+        predictions = [
+            classes[np.argmax(proba[:, k, :len(classes)], axis=1)]
+            for k, classes in enumerate(params["classes"])
+        ]
+        if n_outputs == 1:
+            return predictions[0]
+        return np.stack(predictions, axis=1)
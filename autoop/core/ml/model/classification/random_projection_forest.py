@@ -0,0 +1,197 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+import numpy as np
+
+LEAF = -1
+
+
+class RandomProjectionForest:
+    """
+    An approximate nearest neighbor index built from random projection trees.
+
+    Every tree splits the training points recursively at the median of
+    their projection on a random direction, until at most `leaf_size`
+    points remain. A query descends every tree to a leaf, and the union of
+    those leaves is searched exactly. More trees find more of the true
+    neighbors (higher recall) at the cost of more distance computations.
+    """
+
+    def __init__(self, n_trees: int = 10, leaf_size: int = 30,
+                 chunk_size: int = 256, random_state: int = None) -> None:
+        """
+        Initializes an empty index.
+
+        Args:
+            n_trees (int): The number of trees, the recall/speed knob.
+            leaf_size (int): The maximum number of points in a leaf.
+            chunk_size (int): The number of queries searched at once.
+            random_state (int): The seed of the random directions.
+        """
+        self._n_trees = n_trees
+        self._leaf_size = leaf_size
+        self._chunk_size = chunk_size
+        self._random_state = random_state
+        self._points = None
+        self._trees = []
+
+    def build(self, points: np.ndarray) -> None:
+        """
+        Builds the trees over the training points.
+
+        Args:
+            points (ndarray): The training points, one row per point.
+        """
+        self._points = np.asarray(points, dtype=np.float64)
+        rng = np.random.default_rng(self._random_state)
+        self._trees = [self._build_tree(rng) for _ in range(self._n_trees)]
+
+    def _build_tree(self, rng: np.random.Generator) -> dict:
+        """
+        Builds a single tree as flat node arrays.
+
+        Returns:
+            dict: The split directions and thresholds, the children of
+            every node (LEAF for leaves), the leaf number of every leaf
+            node and a matrix of the point ids in every leaf, padded
+            with -1.
+        """
+        n_points, n_features = self._points.shape
+        directions, thresholds, left, right, leaf_of = [], [], [], [], []
+        leaves = []
+        stack = [(0, np.arange(n_points))]
+        directions.append(None)
+        thresholds.append(0.0)
+        left.append(LEAF)
+        right.append(LEAF)
+        leaf_of.append(LEAF)
+        while stack:
+            node, ids = stack.pop()
+            direction = rng.normal(size=n_features)
+            directions[node] = direction
+            if len(ids) > self._leaf_size:
+                projection = self._points[ids] @ direction
+                threshold = np.median(projection)
+                goes_left = projection <= threshold
+                # identical points cannot be separated, keep a large leaf
+                if goes_left.all() or not goes_left.any():
+                    goes_left = None
+            else:
+                goes_left = None
+            if goes_left is None:
+                leaf_of[node] = len(leaves)
+                leaves.append(ids)
+                continue
+            thresholds[node] = threshold
+            for side, child_ids in ((left, ids[goes_left]),
+                                    (right, ids[~goes_left])):
+                side[node] = len(directions)
+                directions.append(None)
+                thresholds.append(0.0)
+                left.append(LEAF)
+                right.append(LEAF)
+                leaf_of.append(LEAF)
+                stack.append((side[node], child_ids))
+        width = max(len(ids) for ids in leaves)
+        members = np.full((len(leaves), width), -1, dtype=np.int64)
+        for i, ids in enumerate(leaves):
+            members[i, :len(ids)] = ids
+        return {
+            "directions": np.vstack(directions),
+            "thresholds": np.asarray(thresholds),
+            "left": np.asarray(left),
+            "right": np.asarray(right),
+            "leaf_of": np.asarray(leaf_of),
+            "members": members,
+        }
+
+    def query(self, queries: np.ndarray, k: int,
+              n_jobs: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the approximate k nearest training points of every query.
+
+        Args:
+            queries (ndarray): The query points, one row per point.
+            k (int): The number of neighbors.
+            n_jobs (int): The number of threads searching chunks of the
+                queries in parallel. Defaults to a single thread.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The euclidean distances and the
+            ids of the neighbors, nearest first. Rows are padded with inf
+            and -1 when fewer than k candidates were found.
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        chunks = [
+            queries[start:start + self._chunk_size]
+            for start in range(0, queries.shape[0], self._chunk_size)
+        ]
+        if n_jobs is None or n_jobs == 1 or len(chunks) <= 1:
+            results = [self._query_chunk(chunk, k) for chunk in chunks]
+        else:
+            workers = None if n_jobs < 0 else n_jobs
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda chunk: self._query_chunk(chunk, k), chunks))
+        if not results:
+            return np.empty((0, k)), np.empty((0, k), dtype=np.int64)
+        distances, ids = zip(*results)
+        return np.vstack(distances), np.vstack(ids)
+
+    def _leaf(self, tree: dict, queries: np.ndarray) -> np.ndarray:
+        """
+        Descends a tree to the leaf of every query.
+
+        Returns:
+            np.ndarray: The leaf number of every query.
+        """
+        node = np.zeros(queries.shape[0], dtype=np.int64)
+        active = np.flatnonzero(tree["left"][node] != LEAF)
+        while active.size:
+            current = node[active]
+            projection = np.einsum("ij,ij->i", queries[active],
+                                   tree["directions"][current])
+            node[active] = np.where(
+                projection <= tree["thresholds"][current],
+                tree["left"][current], tree["right"][current]
+            )
+            active = active[tree["left"][node[active]] != LEAF]
+        return tree["leaf_of"][node]
+
+    def _query_chunk(self, queries: np.ndarray,
+                     k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Searches the leaves reached by a chunk of queries exactly.
+        """
+        candidates = np.hstack([
+            tree["members"][self._leaf(tree, queries)]
+            for tree in self._trees
+        ])
+        # the same point is often found by several trees
+        candidates.sort(axis=1)
+        duplicate = np.zeros_like(candidates, dtype=bool)
+        duplicate[:, 1:] = candidates[:, 1:] == candidates[:, :-1]
+        invalid = duplicate | (candidates < 0)
+
+        points = self._points[np.maximum(candidates, 0)]
+        differences = points - queries[:, np.newaxis, :]
+        distances = np.einsum("ijk,ijk->ij", differences, differences)
+        distances[invalid] = np.inf
+        candidates = np.where(invalid, -1, candidates)
+
+        if distances.shape[1] > k:
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(distances.shape[1]),
+                                      distances.shape)
+        distances = np.take_along_axis(distances, nearest, axis=1)
+        ids = np.take_along_axis(candidates, nearest, axis=1)
+        order = np.argsort(distances, axis=1, kind="stable")
+        distances = np.sqrt(np.take_along_axis(distances, order, axis=1))
+        ids = np.take_along_axis(ids, order, axis=1)
+        if ids.shape[1] < k:
+            padding = k - ids.shape[1]
+            distances = np.pad(distances, ((0, 0), (0, padding)),
+                               constant_values=np.inf)
+            ids = np.pad(ids, ((0, 0), (0, padding)), constant_values=-1)
+        return distances, ids
@@ -1,11 +1,14 @@
 
 from abc import ABC, abstractmethod
 from autoop.core.ml.artifact import Artifact
+from autoop.core.ml.model import serialization
 import numpy as np
-import pickle
+from contextlib import ExitStack, contextmanager
 from copy import deepcopy
-from typing import Literal
+from typing import Iterator, Literal
 from pydantic import PrivateAttr
+from sklearn import config_context
+from threadpoolctl import threadpool_limits
 
 
 class Model(Artifact, ABC):
@@ -15,19 +18,38 @@ class Model(Artifact, ABC):
     This model provides a "blueprint" for building a machine learning
     algorithm.
     It uses "fit" and "predict" methods, which derived classes must implement.
+
+    Every model shares the same resource settings: the number of parallel
+    jobs, a memory budget and a random seed. Wrappers pass them on to
+    their estimator and train inside resource_limits.
     """
 
     _param: dict = PrivateAttr(default=dict)
+    _resources: dict = PrivateAttr(default=dict)
     _type: Literal["classification", "regression"]
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, n_jobs: int = None, memory_budget: int = None,
+                 random_state: int = None, **kwargs) -> None:
         """
         Initializes the model with specified parameters.
 
         Args:
+            n_jobs (int): The number of cores the model may use, -1 for
+            all cores. Defaults to the estimator's own default.
+            memory_budget (int): The size in MiB of the temporary arrays
+            scikit-learn works with in chunked computations, such as
+            pairwise distances. Defaults to the scikit-learn setting.
+            random_state (int): The seed of the model's randomness, so
+            training is reproducible.
             **kwargs: Additional keyword arguments for configuring the model.
         """
         super(Artifact, self).__init__(**kwargs)
+        self._param = {}
+        self._resources = {
+            "n_jobs": n_jobs,
+            "memory_budget": memory_budget,
+            "random_state": random_state,
+        }
 
     @property
     def type(self) -> str:
@@ -53,6 +75,74 @@ class Model(Artifact, ABC):
         """
         return deepcopy(self._param)
 
+    @property
+    def resources(self) -> dict:
+        """
+        Getter method for the model's resource settings.
+
+        Returns:
+            dict: The number of jobs, the memory budget and the random seed.
+        """
+        return dict(self._resources)
+
+    @property
+    def hyperparameters(self) -> dict:
+        """
+        Getter method for the arguments the model was created with.
+
+        Subclasses with arguments of their own extend this dictionary.
+
+        Returns:
+            dict: The keyword arguments that recreate an unfitted model of
+            the same configuration.
+        """
+        return self.resources
+
+    @property
+    def memory_layout(self) -> str:
+        """
+        Getter method for the memory order the model trains fastest on.
+
+        The pipeline allocates the design matrix in this order, so the
+        estimator does not copy it into its preferred layout.
+
+        Returns:
+            str: "C" for row major, "F" for column major arrays.
+        """
+        return "C"
+
+    @contextmanager
+    def resource_limits(self) -> Iterator[None]:
+        """
+        Applies the resource settings to the code run inside the block.
+
+        The number of jobs also caps the BLAS and OpenMP thread pools, so
+        estimators without an n_jobs argument respect it too, and the
+        memory budget sets scikit-learn's working memory.
+        """
+        with ExitStack() as stack:
+            n_jobs = self._resources["n_jobs"]
+            if n_jobs is not None and n_jobs > 0:
+                stack.enter_context(threadpool_limits(limits=n_jobs))
+            memory_budget = self._resources["memory_budget"]
+            if memory_budget is not None:
+                stack.enter_context(
+                    config_context(working_memory=memory_budget))
+            yield
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the model from the parameters of a fitted model.
+
+        Subclasses that wrap an estimator extend this to put the estimator
+        back into its fitted state.
+
+        Args:
+            parameters (dict): The parameters, as returned by the
+            parameters property.
+        """
+        self._param = parameters
+
     @abstractmethod
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
         """
@@ -68,6 +158,49 @@ class Model(Artifact, ABC):
         """
         pass
 
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Trains a fitted model further instead of fitting it from scratch.
+
+        The data can be the training data, to train for more iterations,
+        or new rows, to refresh the model. Models that cannot continue
+        training refit on the given data, which is also what happens to
+        an unfitted model.
+
+        Args:
+            observations (ndarray): The input data, a matrix where
+            each row is an observation.
+            ground_truths (ndarray): The ground truths or targets
+            for input data.
+            n_iterations (int): The number of additional iterations, in
+            the unit of the model (boosting stages, trees or epochs).
+            Defaults to the number of iterations of a full fit.
+        """
+        self.fit(observations, ground_truths)
+
+    def adapt(self, inputs: dict, outputs: dict) -> None:
+        """
+        Rewrites the fitted model for design matrices whose columns were
+        moved, rescaled or added, so it predicts the same for the rows it
+        was trained on and can continue training on new rows.
+
+        This is how a refreshed pipeline keeps a model after its scalers
+        and encoders were updated with new rows. Models that cannot
+        follow the change raise NotImplementedError and are refitted.
+
+        Args:
+            inputs (dict): The change of the input columns, as returned
+            by DesignMatrixBuilder.partial_fit.
+            outputs (dict): The change of the target columns.
+
+        Raises:
+            NotImplementedError: If the model cannot be rewritten.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} cannot adapt to changed columns")
+
     @abstractmethod
     def predict(self, observations: np.ndarray) -> np.ndarray:
         """
@@ -85,11 +218,14 @@ class Model(Artifact, ABC):
         """
         pass
 
-    def to_artifact(self, name: str, asset_path: str) -> Artifact:
+    def to_artifact(self, name: str, asset_path: str = None) -> Artifact:
         """
         Converts the model to an artifact for
         saving including model type and parameters.
 
+        The data is in the versioned format of the serialization module:
+        a JSON header with the NumPy arrays of the parameters.
+
         Args:
             name (str): The name of the artifact.
             asset_path (str): The file path where the artifact will be stored.
@@ -97,12 +233,7 @@ class Model(Artifact, ABC):
         Returns:
             Artifact: An artifact object containing serialized model data.
         """
-        model_data = {
-            "type": self._type,
-            "parameters": self._param
-        }
-
-        serialized_data = pickle.dumps(model_data)
+        serialized_data = serialization.dumps(self)
 
         artifact = Artifact(
             name=name,
@@ -111,3 +242,16 @@ class Model(Artifact, ABC):
             data=serialized_data
         )
         return artifact
+
+    @staticmethod
+    def from_artifact(artifact: Artifact) -> "Model":
+        """
+        Restores a model from an artifact made by to_artifact.
+
+        Args:
+            artifact (Artifact): The artifact holding the serialized model.
+
+        Returns:
+            Model: The restored model.
+        """
+        return serialization.loads(artifact.read())
@@ -1,8 +1,18 @@
+from typing import Union
+
 import numpy as np
 from pydantic import PrivateAttr
 from sklearn.ensemble import GradientBoostingRegressor as GBR
+from sklearn.ensemble import HistGradientBoostingRegressor as HGBR
 
 from autoop.core.ml.model import Model
+from autoop.core.ml.model.tree_ensemble import (
+    compile_histogram_trees, compile_trees, concatenate_trees, predict_trees
+)
+
+ENGINES = ["exact", "histogram"]
+# the batch size up to which the compiled trees beat scikit-learn
+SMALL_BATCH = 64
 
 
 class GradientBoostingR(Model):
@@ -13,18 +23,122 @@ class GradientBoostingR(Model):
     This model uses an ensemble of weak learners (decision trees)
     to predict a continuous value trained using gradient boosting
     which minimizes prediction errors through iterative updates.
+
+    Two engines are available: "exact" evaluates every split point of the
+    features, "histogram" bins the features first, which trains much
+    faster on large datasets and uses all cores the resource settings
+    allow.
+
+    Batches of up to SMALL_BATCH observations are predicted with the
+    fitted trees compiled into flat arrays, which avoids the per call
+    overhead of scikit-learn. Larger batches use the scikit-learn
+    estimator, as long as it holds the whole fitted model.
+
+    With early stopping, a fraction of the training data is held out and
+    boosting stops once the validation loss no longer improves. A fitted
+    model can continue boosting on more data: the new stages are fitted
+    on the residuals of the current model and appended to its trees.
     """
 
-    _gbr: GBR = PrivateAttr(default=None)
+    _gbr: Union[GBR, HGBR] = PrivateAttr(default=None)
 
-    def __init__(self) -> None:
+    def __init__(self, engine: str = "exact", max_iter: int = 100,
+                 early_stopping: bool = False,
+                 validation_fraction: float = 0.1,
+                 n_iter_no_change: int = 10, **resources) -> None:
         """
         Initializes the gradient boosting regressor.
+
+        Args:
+            engine (str): The boosting engine, one of ENGINES.
+            max_iter (int): The maximum number of boosting stages.
+            early_stopping (bool): Whether to stop boosting when the loss
+            on a held out validation set stops improving.
+            validation_fraction (float): The fraction of the training data
+            held out for early stopping.
+            n_iter_no_change (int): The number of stages without
+            improvement after which boosting stops early.
+            **resources: The resource settings of Model: n_jobs,
+            memory_budget and random_state.
         """
-        super().__init__()
-        self._gbr = GBR()
+        super().__init__(**resources)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown gradient boosting engine: {engine}")
+        self._engine = engine
+        self._max_iter = max_iter
+        self._early_stopping = early_stopping
+        self._validation_fraction = validation_fraction
+        self._n_iter_no_change = n_iter_no_change
+        self._gbr = self._estimator()
         self._type = "regression"
 
+    @property
+    def hyperparameters(self) -> dict:
+        """
+        Getter method for the arguments the model was created with.
+
+        Returns:
+            dict: The engine, the boosting and early stopping settings and
+            the resource settings.
+        """
+        return {
+            **super().hyperparameters,
+            "engine": self._engine,
+            "max_iter": self._max_iter,
+            "early_stopping": self._early_stopping,
+            "validation_fraction": self._validation_fraction,
+            "n_iter_no_change": self._n_iter_no_change,
+        }
+
+    def _estimator(self, max_iter: int = None) -> Union[GBR, HGBR]:
+        """
+        Creates an unfitted estimator of the configured engine.
+
+        Args:
+            max_iter (int): The maximum number of boosting stages,
+            defaults to the configured number.
+        """
+        max_iter = max_iter or self._max_iter
+        random_state = self._resources["random_state"]
+        if self._engine == "histogram":
+            return HGBR(max_iter=max_iter,
+                        early_stopping=self._early_stopping,
+                        validation_fraction=self._validation_fraction,
+                        n_iter_no_change=self._n_iter_no_change,
+                        random_state=random_state)
+        n_iter_no_change = self._n_iter_no_change \
+            if self._early_stopping else None
+        return GBR(n_estimators=max_iter,
+                   validation_fraction=self._validation_fraction,
+                   n_iter_no_change=n_iter_no_change,
+                   random_state=random_state)
+
+    def _compile(self, estimator: Union[GBR, HGBR],
+                 observations: np.ndarray) -> dict:
+        """
+        Compiles the trees of a fitted estimator.
+
+        Returns:
+            dict: The node arrays of the trees and the baseline, the
+            prediction before the first stage.
+        """
+        if self._engine == "histogram":
+            # private attributes, available in the scikit-learn versions
+            # requirements.txt allows
+            return {
+                **compile_histogram_trees(
+                    [trees[0] for trees in estimator._predictors]
+                ),
+                "baseline": float(estimator._baseline_prediction.item()),
+            }
+        return {
+            **compile_trees(
+                [tree.tree_ for tree in estimator.estimators_[:, 0]],
+                scale=estimator.learning_rate
+            ),
+            "baseline": float(estimator.init_.predict(observations[:1])[0]),
+        }
+
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
         """
         Trains the gradient boosting model on the provided dataset.
@@ -35,7 +149,57 @@ class GradientBoostingR(Model):
             ground_truths (ndarray): An array containing the true values for
             each observation.
         """
-        self._gbr.fit(observations, ground_truths)
+        self._gbr = self._estimator()
+        with self.resource_limits():
+            self._gbr.fit(observations, ground_truths)
+        self._param = self._compile(self._gbr, observations)
+
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Adds boosting stages fitted on the residuals of the current model.
+
+        The model predicts with its compiled trees afterwards, since the
+        scikit-learn estimator only holds the stages of the first fit.
+
+        Arg:
+            observations (ndarray): The input data, a matrix where each
+            row (n) is an observation. Each column (p) is a feature.
+            ground_truths (ndarray): An array containing the true values for
+            each observation.
+            n_iterations (int): The maximum number of stages to add,
+            defaults to max_iter.
+        """
+        if not self._param:
+            self.fit(observations, ground_truths)
+            return
+        residuals = np.ravel(ground_truths) - self.predict(observations)
+        booster = self._estimator(n_iterations)
+        with self.resource_limits():
+            booster.fit(observations, residuals)
+        stages = self._compile(booster, observations)
+        current = dict(self._param)
+        baseline = current.pop("baseline") + stages.pop("baseline")
+        self._param = {
+            **concatenate_trees(current, stages),
+            "baseline": baseline,
+        }
+        self._gbr = self._estimator()
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the model from its compiled trees.
+
+        The restored model predicts with the compiled trees instead of the
+        scikit-learn estimator.
+
+        Args:
+            parameters (dict): The parameters of a fitted gradient boosting
+            model.
+        """
+        super().set_parameters(parameters)
+        self._gbr = self._estimator()
 
     def predict(self, observation: np.ndarray) -> np.ndarray:
         """
@@ -49,4 +213,12 @@ class GradientBoostingR(Model):
         Returns:
             A list of predicted values for each observation in the input data.
         """
-        return self._gbr.predict(observation)
+        small = np.shape(observation)[0] <= SMALL_BATCH
+        if not small and hasattr(self._gbr, "n_features_in_"):
+            return self._gbr.predict(observation)
+        # the exact engine evaluates its trees on float32 inputs, the
+        # histogram engine on float64 inputs
+        dtype = np.float64 if self._engine == "histogram" else np.float32
+        observation = np.asarray(observation, dtype=dtype)
+        values = predict_trees(self._param, observation)[:, 0]
+        return self._param["baseline"] + values
@@ -11,18 +11,42 @@ class Lasso(Model):
     regreesion model from Scikit-learn package.
 
     This model fits input and forms predictions based on learned parameters.
+
+    Predictions are a single matrix product with the learned coefficients,
+    without the input validation of scikit-learn, which costs more than
+    the product itself for small batches.
     """
 
     _ls: ls = PrivateAttr(default=None)
 
-    def __init__(self) -> None:
+    def __init__(self, **resources) -> None:
         """
         Initializes the Lasso regression model.
+
+        The cross-validation folds are fitted in parallel.
+
+        Args:
+            **resources: The resource settings of Model: n_jobs,
+            memory_budget and random_state.
         """
-        super().__init__()
-        self._ls = ls()
+        super().__init__(**resources)
+        self._ls = ls(n_jobs=self._resources["n_jobs"],
+                      random_state=self._resources["random_state"])
         self._type = "regression"
 
+    @property
+    def memory_layout(self) -> str:
+        """
+        Getter method for the memory order the model trains fastest on.
+
+        Coordinate descent walks the observations one feature column at a
+        time, and scikit-learn copies row major data to column major.
+
+        Returns:
+            str: "F", column major.
+        """
+        return "F"
+
     def fit(self, observations: np.ndarray, ground_truths: np.ndarray) -> None:
         """
         Trains the Lasso model on the provided dataset.
@@ -33,7 +57,26 @@ class Lasso(Model):
             ground_truths (ndarray): An array of true values corresponding to
             each observation in the input data.
         """
-        self._ls.fit(observations, ground_truths)
+        with self.resource_limits():
+            self._ls.fit(observations, ground_truths)
+        self._param = {
+            "coef": self._ls.coef_,
+            "intercept": self._ls.intercept_,
+            "alpha": self._ls.alpha_,
+        }
+
+    def set_parameters(self, parameters: dict) -> None:
+        """
+        Restores the fitted coefficients into the estimator.
+
+        Args:
+            parameters (dict): The parameters of a fitted Lasso model.
+        """
+        super().set_parameters(parameters)
+        self._ls.coef_ = parameters["coef"]
+        self._ls.intercept_ = parameters["intercept"]
+        self._ls.alpha_ = parameters["alpha"]
+        self._ls.n_features_in_ = np.shape(parameters["coef"])[-1]
 
     def predict(self, observation: np.ndarray) -> np.ndarray:
         """
@@ -47,4 +90,5 @@ class Lasso(Model):
         Returns:
             A list of predicted values for each observation in the input data.
         """
-        return self._ls.predict(observation)
+        coef = self._param["coef"]
+        return np.asarray(observation) @ coef.T + self._param["intercept"]
@@ -9,13 +9,21 @@ class MultipleLinearRegression(Model):
 
     This model fits a linear equation to provided observed data and makes
     predictions based on learned parameters
+
+    The normal equations of the fit are kept with the parameters, so new
+    rows are added to them exactly, at a cost independent of the rows
+    trained on before.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, **resources) -> None:
         """
         Initializes the multiple linear regression model.
+
+        Args:
+            **resources: The resource settings of Model: n_jobs,
+            memory_budget and random_state.
         """
-        super().__init__()
+        super().__init__(**resources)
         self._type = "regression"
 
     def _x_bar(self, observations: np.ndarray) -> np.ndarray:
@@ -29,7 +37,8 @@ class MultipleLinearRegression(Model):
         Returns:
             An augmented matrix with an added column for the intercept term.
         """
-        x_bar = np.hstack((observations, np.ones((observations.shape[0], 1))))
+        ones = np.ones((observations.shape[0], 1), dtype=observations.dtype)
+        x_bar = np.hstack((observations, ones))
         return x_bar
 
     def fit(self, observations: np.ndarray,
@@ -47,11 +56,118 @@ class MultipleLinearRegression(Model):
 
         """
 
-        x_bar_T = np.transpose(self._x_bar(observations))
-        inverse = np.linalg.inv(x_bar_T @ self._x_bar(observations))
+        x_bar = self._x_bar(observations)
+        # singular values below the precision of the data are noise, e.g.
+        # from collinear or constant columns; numpy would otherwise judge
+        # float32 data by the precision of float64, and integer data is
+        # solved in float64
+        precision = np.result_type(x_bar.dtype, np.float32)
+        rcond = np.finfo(precision).eps * max(x_bar.shape)
+        with self.resource_limits():
+            # least squares on the augmented matrix gives the solution of
+            # the normal equations without squaring their condition number
+            w_parameters = np.linalg.lstsq(
+                x_bar, ground_truths, rcond=rcond
+            )[0]
+            gram, moment = self._normal_equations(x_bar, ground_truths)
+        self._param = {"optimal_parameters": w_parameters, "gram": gram,
+                       "moment": moment}
+
+    def continue_fit(self, observations: np.ndarray,
+                     ground_truths: np.ndarray,
+                     n_iterations: int = None) -> None:
+        """
+        Adds new rows to the normal equations and solves them again, which
+        gives the fit on the old and the new rows together.
+
+        A model fitted before the normal equations were kept is refitted
+        on the given rows.
+
+        Args:
+            observations (ndarray): The new observations.
+            ground_truths (ndarray): The target values of the new rows.
+            n_iterations (int): Unused, the solution is exact.
+        """
+        if "gram" not in self._param:
+            self.fit(observations, ground_truths)
+            return
+        with self.resource_limits():
+            gram, moment = self._normal_equations(
+                self._x_bar(observations), ground_truths)
+            self._solve(self._param["gram"] + gram,
+                        self._param["moment"] + moment,
+                        self._param["optimal_parameters"].dtype)
+
+    def adapt(self, inputs: dict, outputs: dict) -> None:
+        """
+        Rewrites the normal equations for changed columns.
+
+        The old rows of the new design matrix are an affine map of their
+        old rows, so their normal equations follow exactly from the old
+        ones, and so does the rescaled target.
+
+        Args:
+            inputs (dict): The change of the input columns, as returned
+            by DesignMatrixBuilder.partial_fit.
+            outputs (dict): The change of the target columns.
+
+        Raises:
+            NotImplementedError: If the model was fitted before the normal
+            equations were kept.
+        """
+        if "gram" not in self._param:
+            raise NotImplementedError(
+                "The model was fitted without its normal equations")
+        gram = self._param["gram"]
+        moment = self._param["moment"]
+        vector = moment.ndim == 1
+        moment = moment.reshape(len(moment), -1)
+        # old augmented row -> new augmented row, the bias stays last
+        bias = len(inputs["positions"])
+        rows = np.zeros((inputs["n_columns"] + 1, bias + 1))
+        rows[inputs["positions"], np.arange(bias)] = inputs["scale"]
+        rows[inputs["positions"], bias] = inputs["shift"]
+        rows[-1, -1] = 1
+        targets = np.zeros((outputs["n_columns"], moment.shape[1]))
+        targets[outputs["positions"], np.arange(moment.shape[1])] = \
+            outputs["scale"]
+        offsets = np.zeros(outputs["n_columns"])
+        offsets[outputs["positions"]] = outputs["shift"]
+        # the bias column of the gram matrix sums the old rows
+        moment = rows @ (moment @ targets.T + np.outer(gram[:, bias],
+                                                       offsets))
+        if vector and moment.shape[1] == 1:
+            moment = moment[:, 0]
+        self._solve(rows @ gram @ rows.T, moment,
+                    self._param["optimal_parameters"].dtype)
+
+    @staticmethod
+    def _normal_equations(x_bar: np.ndarray,
+                          ground_truths: np.ndarray) -> tuple:
+        """
+        Computes the normal equations of rows, in float64.
+
+        Returns:
+            tuple: The gram matrix of the augmented observations and their
+            products with the ground truths.
+        """
+        x_bar = x_bar.astype(np.float64, copy=False)
+        return x_bar.T @ x_bar, x_bar.T @ np.asarray(ground_truths,
+                                                     dtype=np.float64)
 
-        w_parameters = inverse @ (x_bar_T @ ground_truths)
-        self._param = {"optimal_parameters": w_parameters}
+    def _solve(self, gram: np.ndarray, moment: np.ndarray,
+               dtype: np.dtype) -> None:
+        """
+        Solves normal equations and keeps them with the solution.
+        """
+        # exact collinearity, as of one-hot columns with the bias, leaves
+        # singular values at the rounding error of the gram matrix
+        rcond = np.finfo(np.float64).eps * gram.shape[0]
+        w_parameters = np.linalg.lstsq(gram, moment, rcond=rcond)[0]
+        # the weights are never truncated to an integer type
+        dtype = np.result_type(dtype, np.float32)
+        self._param = {"optimal_parameters": w_parameters.astype(dtype),
+                       "gram": gram, "moment": moment}
 
     def predict(self, observations: np.ndarray) -> np.ndarray:
         """
@@ -65,4 +181,7 @@ class MultipleLinearRegression(Model):
         Returns:
             A list of predicted values corresponding to each observation.
         """
-        return self._x_bar(observations) @ self._param["optimal_parameters"]
+        # equivalent to multiplying _x_bar(observations), without copying
+        # the observations into a new matrix
+        parameters = self._param["optimal_parameters"]
+        return observations @ parameters[:-1] + parameters[-1]
@@ -0,0 +1,209 @@
+"""
+Compact, versioned serialization format for models.
+
+A serialized model is laid out as::
+
+    MAGIC | header size (uint64) | JSON header | padding | arrays
+
+The JSON header holds the format version, the model class, its
+hyperparameters and the parameters that are not arrays. Every NumPy array
+of the parameters is stored as raw bytes, aligned to 64 bytes, so loading
+only wraps the buffer (or a memory-mapped file) without copying it.
+"""
+import importlib
+import json
+import mmap
+import struct
+from typing import TYPE_CHECKING, Dict, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from autoop.core.ml.model.model import Model
+
+MAGIC = b"AUTOOPML"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+MODEL_PACKAGE = "autoop.core.ml.model"
+
+
+def _align(size: int) -> int:
+    """
+    Rounds a size up to the next multiple of ALIGNMENT.
+    """
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def _encode(value: object, arrays: Dict[str, np.ndarray],
+            path: str) -> object:
+    """
+    Replaces the arrays in a parameter value by references to them.
+
+    Args:
+        value (object): The parameter value.
+        arrays (Dict[str, np.ndarray]): Collects the referenced arrays.
+        path (str): The name of the value within the parameters.
+
+    Returns:
+        object: The JSON-compatible value.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            converted = np.asarray(value.tolist())
+            if converted.dtype == object:
+                raise TypeError(f"Cannot serialize object array '{path}'")
+            value = converted
+        arrays[path] = np.ascontiguousarray(value)
+        return {"__array__": path}
+    if isinstance(value, dict):
+        return {key: _encode(item, arrays, f"{path}.{key}")
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, arrays, f"{path}.{i}")
+                for i, item in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value: object, arrays: Dict[str, np.ndarray]) -> object:
+    """
+    Puts the arrays back into a decoded parameter value.
+    """
+    if isinstance(value, dict):
+        if set(value) == {"__array__"}:
+            return arrays[value["__array__"]]
+        return {key: _decode(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item, arrays) for item in value]
+    return value
+
+
+def dumps(model: "Model") -> bytes:
+    """
+    Serializes a model.
+
+    Args:
+        model (Model): The model to serialize.
+
+    Returns:
+        bytes: The serialized model.
+    """
+    model_class = type(model)
+    arrays = {}
+    parameters = _encode(model.parameters, arrays, "parameters")
+    # encoded before the layout, which must include their arrays
+    hyperparameters = _encode(model.hyperparameters, arrays, "hyper")
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        "format_version": FORMAT_VERSION,
+        "class": f"{model_class.__module__}.{model_class.__qualname__}",
+        "type": model.type,
+        "hyperparameters": hyperparameters,
+        "parameters": parameters,
+        "arrays": layout,
+    }).encode()
+    start = _align(len(MAGIC) + 8 + len(header))
+    buffer = bytearray(start + offset)
+    buffer[:len(MAGIC)] = MAGIC
+    buffer[len(MAGIC):len(MAGIC) + 8] = struct.pack("<Q", len(header))
+    buffer[len(MAGIC) + 8:len(MAGIC) + 8 + len(header)] = header
+    for name, array in arrays.items():
+        position = start + layout[name]["offset"]
+        buffer[position:position + array.nbytes] = array.tobytes()
+    return bytes(buffer)
+
+
+def _read_header(buffer: Union[bytes, memoryview]) -> Tuple[dict, int]:
+    """
+    Reads and validates the header of a serialized model.
+
+    Returns:
+        Tuple[dict, int]: The header and the position of the first array.
+    """
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Data is not a serialized model")
+    (size,) = struct.unpack("<Q", buffer[len(MAGIC):len(MAGIC) + 8])
+    header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + size]))
+    if header["format_version"] > FORMAT_VERSION:
+        raise ValueError(
+            f"Model format version {header['format_version']} is newer "
+            f"than the supported version {FORMAT_VERSION}"
+        )
+    return header, _align(len(MAGIC) + 8 + size)
+
+
+def loads(data: Union[bytes, memoryview]) -> "Model":
+    """
+    Deserializes a model.
+
+    The arrays of the returned model are read-only views on the data.
+
+    Args:
+        data (Union[bytes, memoryview]): The serialized model.
+
+    Returns:
+        Model: The restored model.
+    """
+    header, start = _read_header(data)
+    arrays = {}
+    for name, layout in header["arrays"].items():
+        dtype = np.dtype(layout["dtype"])
+        count = int(np.prod(layout["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(
+            data, dtype=dtype, count=count, offset=start + layout["offset"]
+        ).reshape(layout["shape"])
+
+    from autoop.core.ml.model.model import Model
+
+    module_name, _, class_name = header["class"].rpartition(".")
+    if not module_name.startswith(MODEL_PACKAGE + "."):
+        raise ValueError(f"Refusing to load model class {header['class']}")
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(model_class, type) and issubclass(model_class, Model)):
+        raise ValueError(f"{header['class']} is not a model class")
+    model = model_class(**_decode(header["hyperparameters"], arrays))
+    parameters = _decode(header["parameters"], arrays)
+    # an unfitted model has no parameters to restore
+    if parameters:
+        model.set_parameters(parameters)
+    return model
+
+
+def save(model: "Model", path: str) -> None:
+    """
+    Serializes a model into a file.
+
+    Args:
+        model (Model): The model to save.
+        path (str): The path of the file.
+    """
+    with open(path, "wb") as f:
+        f.write(dumps(model))
+
+
+def load(path: str, memory_map: bool = True) -> "Model":
+    """
+    Loads a model from a file.
+
+    Args:
+        path (str): The path of the file.
+        memory_map (bool): Whether to memory-map the file, so the arrays
+            are paged in on use instead of read up front.
+
+    Returns:
+        Model: The restored model.
+    """
+    with open(path, "rb") as f:
+        if memory_map:
+            return loads(memoryview(
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)))
+        return loads(f.read())
@@ -0,0 +1,202 @@
+"""
+Flat array representation of fitted decision tree ensembles.
+
+The nodes of all trees are concatenated into a few NumPy arrays, so a
+fitted forest or boosting model can be stored without pickling the
+scikit-learn estimators and evaluated without them.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+LEAF = -1
+CHUNK_SIZE = 1 << 18
+
+
+def compile_trees(trees: List[object], scale: float = 1.0,
+                  normalize: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Concatenates fitted scikit-learn trees into flat node arrays.
+
+    Args:
+        trees (List[object]): The `tree_` objects of the fitted estimators.
+        scale (float): Factor applied to every leaf value, e.g. the
+            learning rate of a boosting model.
+        normalize (bool): Whether to turn the leaf values of each output
+            into class probabilities, as classification trees predict.
+
+    Returns:
+        Dict[str, np.ndarray]: The node arrays "feature", "threshold",
+        "left", "right" and "value" (one row per node), and "roots", the
+        index of the first node of every tree.
+    """
+    roots = []
+    feature, threshold, left, right, value = [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        roots.append(offset)
+        is_leaf = tree.children_left == LEAF
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        left.append(np.where(is_leaf, LEAF, tree.children_left + offset))
+        right.append(np.where(is_leaf, LEAF, tree.children_right + offset))
+        node_value = np.asarray(tree.value, dtype=np.float64)
+        if normalize:
+            totals = node_value.sum(axis=2, keepdims=True)
+            node_value = np.divide(node_value, totals,
+                                   out=np.zeros_like(node_value),
+                                   where=totals > 0)
+        value.append(node_value.reshape(tree.node_count, -1) * scale)
+        offset += tree.node_count
+    return {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+
+def compile_histogram_trees(
+        predictors: List[object]) -> Dict[str, np.ndarray]:
+    """
+    Concatenates the trees of a histogram gradient boosting model.
+
+    The trees use the same node arrays as compile_trees, plus
+    "missing_left", which tells whether missing values go to the left
+    child of a node. Their leaf values already include the learning rate.
+
+    Args:
+        predictors (List[object]): The `TreePredictor` objects of the
+            fitted model, one per boosting iteration.
+
+    Returns:
+        Dict[str, np.ndarray]: The node arrays of all trees.
+    """
+    roots = []
+    feature, threshold, left, right, value, missing_left = (
+        [], [], [], [], [], []
+    )
+    offset = 0
+    for predictor in predictors:
+        nodes = predictor.nodes
+        if nodes["is_categorical"].any():
+            raise ValueError("Categorical splits cannot be compiled")
+        roots.append(offset)
+        is_leaf = nodes["is_leaf"].astype(bool)
+        feature.append(np.where(is_leaf, 0, nodes["feature_idx"]))
+        threshold.append(nodes["num_threshold"])
+        left.append(np.where(is_leaf, LEAF, nodes["left"] + offset))
+        right.append(np.where(is_leaf, LEAF, nodes["right"] + offset))
+        value.append(nodes["value"].reshape(-1, 1))
+        missing_left.append(nodes["missing_go_to_left"].astype(bool))
+        offset += len(nodes)
+    return {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "missing_left": np.concatenate(missing_left),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+
+def concatenate_trees(first: Dict[str, np.ndarray],
+                      second: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Appends the trees of one compiled ensemble to another.
+
+    Args:
+        first (Dict[str, np.ndarray]): The node arrays of the first trees.
+        second (Dict[str, np.ndarray]): The node arrays of the trees to
+            append, with leaf values of the same width.
+
+    Returns:
+        Dict[str, np.ndarray]: The node arrays of all trees.
+    """
+    if first["value"].shape[1] != second["value"].shape[1]:
+        raise ValueError("Leaf values of the trees have different widths")
+    offset = first["feature"].shape[0]
+    shifted = {
+        "left": np.where(second["left"] == LEAF, LEAF,
+                         second["left"] + offset),
+        "right": np.where(second["right"] == LEAF, LEAF,
+                          second["right"] + offset),
+        "roots": second["roots"] + offset,
+    }
+    return {
+        key: np.concatenate(
+            [first[key], shifted.get(key, second[key])]
+        ).astype(first[key].dtype)
+        for key in first
+    }
+
+
+def predict_trees(trees: Dict[str, np.ndarray],
+                  observations: np.ndarray,
+                  chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """
+    Sums the leaf values the observations reach in every tree.
+
+    All trees are walked at once: every step moves each (observation,
+    tree) pair that has not reached a leaf one level down, so the number
+    of NumPy calls grows with the depth of the trees rather than with
+    their number. Observations are processed in chunks of about
+    chunk_size pairs to bound the memory of the walk.
+
+    Args:
+        trees (Dict[str, np.ndarray]): Node arrays made by compile_trees.
+        observations (ndarray): The input data, a matrix where each row is
+            an observation.
+        chunk_size (int): The number of (observation, tree) pairs walked
+            at once.
+
+    Returns:
+        np.ndarray: The summed leaf values, one row per observation.
+    """
+    observations = np.asarray(observations)
+    n_trees = trees["roots"].shape[0]
+    rows = max(1, chunk_size // max(n_trees, 1))
+    total = np.empty((observations.shape[0], trees["value"].shape[1]))
+    for start in range(0, observations.shape[0], rows):
+        chunk = observations[start:start + rows]
+        leaves = _walk(trees, chunk).reshape(chunk.shape[0], n_trees)
+        total[start:start + rows] = trees["value"][leaves].sum(axis=1)
+    return total
+
+
+def _walk(trees: Dict[str, np.ndarray],
+          observations: np.ndarray) -> np.ndarray:
+    """
+    Finds the leaf every observation reaches in every tree.
+
+    Returns:
+        np.ndarray: The leaf node of every (observation, tree) pair, in
+        observation major order.
+    """
+    left, right = trees["left"], trees["right"]
+    feature, threshold = trees["feature"], trees["threshold"]
+    missing_left = trees.get("missing_left")
+    n_trees = trees["roots"].shape[0]
+    # gathering from the flattened matrix with take is much cheaper than
+    # two dimensional fancy indexing
+    flat = np.ascontiguousarray(observations).ravel()
+    node = np.tile(trees["roots"], observations.shape[0]).astype(np.intp)
+    offset = np.repeat(
+        np.arange(observations.shape[0]) * observations.shape[1], n_trees
+    )
+    active = np.flatnonzero(left.take(node) != LEAF)
+    while active.size:
+        current = node.take(active)
+        values = flat.take(offset.take(active) + feature.take(current))
+        goes_left = values <= threshold.take(current)
+        if missing_left is not None:
+            missing = np.isnan(values)
+            goes_left[missing] = missing_left.take(current[missing])
+        current = np.where(goes_left, left.take(current),
+                           right.take(current))
+        node[active] = current
+        active = active[left.take(current) != LEAF]
+    return node
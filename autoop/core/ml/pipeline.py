@@ -1,12 +1,21 @@
-from typing import List
+from typing import Dict, List
+import copy
 import pickle
+import time
 from autoop.core.ml.artifact import Artifact
 from autoop.core.ml.dataset import Dataset
-from autoop.core.ml.model import Model
+from autoop.core.ml.design_matrix import DesignMatrixBuilder
+from autoop.core.ml.model import Model, serialization
 from autoop.core.ml.feature import Feature
 from autoop.core.ml.metric import Metric
-from autoop.functional.preprocessing import preprocess_features
+from autoop.core.ml.preprocessing_cache import PreprocessingCache
+from autoop.core.ml.profiler import StageProfiler, array_sizes
+from autoop.core.ml.split import Ordered, Split
+from autoop.core.storage import Storage
 import numpy as np
+import pandas as pd
+
+DTYPES = ["float64", "float32"]
 
 
 class Pipeline():
@@ -16,6 +25,11 @@ class Pipeline():
     This class manages the end-to-end ML pipeline
     including data preprocessing, model training,
     evaluation and artifact management.
+
+    The dtype policy sets the floating point type of the whole data path:
+    the preprocessed features, the design matrices the model is trained
+    and evaluated on and, through them, the model and the metrics.
+    float32 halves the memory and bandwidth of every array.
     """
 
     def __init__(self,
@@ -25,6 +39,10 @@ class Pipeline():
                  input_features: List[Feature],
                  target_feature: Feature,
                  split: float = 0.8,
+                 dtype: str = "float64",
+                 split_strategy: Split = None,
+                 cache: PreprocessingCache = None,
+                 profiler: StageProfiler = None,
                  ) -> None:
         """
         Initializes the Pipeline with the
@@ -42,7 +60,18 @@ class Pipeline():
             feature for prediction.
             split (float): Ratio for splitting data into
             training and test sets. Defaults to 0.8.
+            dtype (str): The floating point type of the data, one of
+            DTYPES. Defaults to "float64".
+            split_strategy (Split): Chooses the training and test rows.
+            Defaults to the leading and trailing rows, Ordered.
+            cache (PreprocessingCache): Shares preprocessed data between
+            pipelines on the same dataset and features. Defaults to no
+            cache.
+            profiler (StageProfiler): Records the time, memory and array
+            sizes of every stage of a run. Defaults to timing only.
         """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
 
         self._dataset = dataset
         self._model = model
@@ -51,6 +80,20 @@ class Pipeline():
         self._metrics = metrics
         self._artifacts = {}
         self._split = split
+        self._dtype = dtype
+        self._split_strategy = split_strategy \
+            if split_strategy is not None else Ordered()
+        self._column_map = {}
+        self._columns = []
+        self._builders = None
+        self._input_matrix = None
+        self._output_vector = None
+        self._split_frame = None
+        self._split_buffers = None
+        self._cache = cache
+        self._profiler = profiler if profiler is not None \
+            else StageProfiler()
+        self._profile = None
 
     def __str__(self) -> str:
         """
@@ -65,6 +108,8 @@ Pipeline(
     input_features={list(map(str, self._input_features))},
     target_feature={str(self._target_feature)},
     split={self._split},
+    split_strategy={self._split_strategy},
+    dtype={self._dtype},
     metrics={list(map(str, self._metrics))},
 )
 """
@@ -76,6 +121,41 @@ Pipeline(
         """
         return self._model
 
+    @property
+    def profile(self) -> dict:
+        """
+        Getter method for the profile of the last run.
+
+        Returns:
+            dict: The wall-clock time, CPU time, peak memory and array
+            sizes of every stage, as reported by StageProfiler. None
+            before the pipeline is run.
+        """
+        return self._profile
+
+    @property
+    def column_map(self) -> Dict[str, slice]:
+        """
+        Getter method for the design matrix columns of every input feature,
+        used to attribute model weights or importances to features.
+
+        Returns:
+            Dict[str, slice]: The columns of every input feature, by
+            feature name. Empty before the pipeline is executed.
+        """
+        return dict(self._column_map)
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Getter method for the names of the design matrix columns.
+
+        Returns:
+            List[str]: The name of every column, "<feature>=<category>"
+            for one-hot encoded columns.
+        """
+        return list(self._columns)
+
     @property
     def artifacts(self) -> List[Artifact]:
         """Used to get the artifacts generated during the pipeline execution
@@ -96,6 +176,9 @@ Pipeline(
             "input_features": self._input_features,
             "target_feature": self._target_feature,
             "split": self._split,
+            "split_strategy": self._split_strategy,
+            "dtype": self._dtype,
+            "profile": self._profile,
         }
         artifacts.append(
             Artifact(name="pipeline_config", data=pickle.dumps(pipeline_data))
@@ -121,106 +204,399 @@ Pipeline(
         Preprocesses input and target features
         registering preprocessing artifacts.
 
-        This function uses preprocessing functions to prepare
-        features and stores any artifacts created for later use.
-        """
-        (target_feature_name, target_data, artifact) = preprocess_features(
-            [self._target_feature], self._dataset)[0]
-        self._register_artifact(target_feature_name, artifact)
-        input_results = preprocess_features(self._input_features,
-                                            self._dataset
-                                            )
-        for (feature_name, data, artifact) in input_results:
-            self._register_artifact(feature_name, artifact)
-        # Get the input vectors and output vector, sort by feature name for
-        # consistency
-        self._output_vector = target_data
-        self._input_vectors = [
-            data for (feature_name, data, artifact) in input_results
-        ]
+        The input features are written into a single design matrix, laid
+        out in the memory order the model prefers, and the columns of
+        every feature are kept in self._column_map. With a cache, data
+        preprocessed before for the same dataset and features is reused,
+        unless the content of the dataset is unknown.
+        """
+        with self._profiler.stage("preprocess_features") as record:
+            order = self._model.memory_layout
+            entry = None
+            key = None
+            if self._cache is not None:
+                key = PreprocessingCache.key(
+                    self._dataset, self._input_features,
+                    self._target_feature, self._dtype, order)
+            if key is not None:
+                entry = self._cache.get(key)
+            record["cached"] = entry is not None
+            if entry is None:
+                entry = self._build_design_matrices(order)
+                if key is not None:
+                    entry = self._cache.put(key, entry)
+            self._input_matrix = entry["input_matrix"]
+            self._output_vector = entry["output_vector"]
+            for feature_name, artifact in entry["artifacts"].items():
+                self._register_artifact(feature_name, artifact)
+            self._column_map = entry["column_map"]
+            self._columns = entry["columns"]
+            # entries spilled before the builders were kept lack them
+            self._builders = entry.get("builders")
+            self._split_frame = entry["split_frame"]
+            self._add_split_columns()
+            self._split_buffers = None
+            record["arrays"] = array_sizes(
+                input_matrix=self._input_matrix,
+                output_vector=self._output_vector)
+
+    def _build_design_matrices(self, order: str) -> dict:
+        """
+        Reads the dataset and builds the design matrix and target vector.
 
-    def _split_data(self) -> None:
+        Args:
+            order (str): The memory layout of the design matrix.
+
+        Returns:
+            dict: The design matrix, the target vector, the preprocessing
+            artifacts, the column layout, the fitted input and target
+            builders and the columns of the split.
         """
-        Splits the data into training and
-        testing sets based on the defined split ratio.
+        # compact dtypes need the statistics of the profile, computing
+        # them would cost more than the dtypes save
+        compact = "statistics" in (self._dataset.profile or {})
+        with self._profiler.stage("read_dataset"):
+            data = self._dataset.read(columns=self._data_columns(),
+                                      compact=compact)
+        target_builder = DesignMatrixBuilder([self._target_feature],
+                                             np.dtype(self._dtype))
+        input_builder = DesignMatrixBuilder(self._input_features,
+                                            np.dtype(self._dtype), order)
+        with self._profiler.stage("build_design_matrix"):
+            input_matrix = input_builder.build(data)
+            output_vector = target_builder.build(data)
+        return {
+            "input_matrix": input_matrix,
+            "output_vector": output_vector,
+            "artifacts": {**target_builder.artifacts,
+                          **input_builder.artifacts},
+            "column_map": input_builder.column_map,
+            "columns": input_builder.columns,
+            "builders": (input_builder, target_builder),
+            "split_frame": data[self._split_columns()],
+        }
+
+    def _add_split_columns(self) -> None:
         """
-        # Split the data into training and testing sets
-        split = self._split
-        self._train_X = [
-            vector[:int(split * len(vector))] for vector in self._input_vectors
-        ]
-        self._test_X = [
-            vector[int(split * len(vector)):] for vector in self._input_vectors
-        ]
-        self._train_y = self._output_vector[
-            :int(split * len(self._output_vector))
-        ]
+        Reads the columns the split strategy needs that were not kept yet.
+        """
+        missing = [name for name in self._split_columns()
+                   if name not in self._split_frame]
+        if missing:
+            self._split_frame = self._split_frame.join(
+                self._dataset.read(columns=missing))
 
-        self._test_y = self._output_vector[
-            int(split * len(self._output_vector)):
-        ]
+    def _data_columns(self) -> List[str]:
+        """
+        Returns the data columns the pipeline reads, the only ones decoded
+        of the dataset.
 
-    def _compact_vectors(self, vectors: List[np.array]) -> np.array:
+        Returns:
+            List[str]: The columns of the input and target features and of
+            the split strategy.
         """
-        Concatenates a list of arrays along axis 1.
+        names = [feature.name for feature in self._input_features]
+        return list(dict.fromkeys(names + self._split_columns()))
 
-        Args:
-            vectors (List): List of arrays to concatenate.
+    def _split_columns(self) -> List[str]:
+        """
+        Returns the data columns the split strategy needs.
 
         Returns:
-            array: The concatenated array.
+            List[str]: The target column and the columns of the strategy.
         """
-        return np.concatenate(vectors, axis=1)
+        names = [self._target_feature.name, *self._split_strategy.columns]
+        return list(dict.fromkeys(names))
+
+    def _split_data(self) -> None:
+        """
+        Splits the data into training and
+        testing sets based on the defined split ratio.
+
+        The split strategy chooses the rows of each set. When the training
+        rows lead the design matrix, as in an ordered split, the sets are
+        views on it. Otherwise the rows are gathered once, training rows
+        first, into buffers that are reused by later splits, and the sets
+        are views on those buffers.
+        """
+        with self._profiler.stage("split_data") as record:
+            train_rows, test_rows = self._split_strategy.indices(
+                self._split_frame, self._target_feature.name, self._split)
+            rows = np.concatenate([train_rows, test_rows])
+            if np.array_equal(rows, np.arange(self._input_matrix.shape[0])):
+                X, Y = self._input_matrix, self._output_vector
+            else:
+                if self._split_buffers is None:
+                    self._split_buffers = (
+                        np.empty_like(self._input_matrix),
+                        np.empty_like(self._output_vector))
+                X, Y = self._split_buffers
+                # indices are valid, "clip" skips the bounds-checking copy
+                np.take(self._input_matrix, rows, axis=0, out=X, mode="clip")
+                np.take(self._output_vector, rows, axis=0, out=Y,
+                        mode="clip")
+                record["arrays"] = array_sizes(input_buffer=X,
+                                               output_buffer=Y)
+            n_train = len(train_rows)
+            self._train_rows, self._test_rows = train_rows, test_rows
+            self._train_X = X[:n_train]
+            self._test_X = X[n_train:]
+            self._train_y = Y[:n_train]
+            self._test_y = Y[n_train:]
 
     def _train(self) -> None:
         """
         Trains the model using the training data.
+
+        The wall-clock time the model takes to fit is kept in
+        self._fit_time.
         """
-        X = self._compact_vectors(self._train_X)
+        X = self._train_X
         Y = self._train_y
-        self._model.fit(observations=X, ground_truths=Y)
+        with self._profiler.stage("train"):
+            start = time.perf_counter()
+            self._model.fit(observations=X, ground_truths=Y)
+            self._fit_time = time.perf_counter() - start
+
+    def _continue_training(self, n_iterations: int = None) -> None:
+        """
+        Trains the fitted model further on the training data.
+
+        Args:
+            n_iterations (int): The number of additional iterations of the
+            model, defaults to the model's own default.
+        """
+        X = self._train_X
+        Y = self._train_y
+        with self._profiler.stage("continue_training"):
+            start = time.perf_counter()
+            self._model.continue_fit(observations=X, ground_truths=Y,
+                                     n_iterations=n_iterations)
+            self._fit_time = time.perf_counter() - start
 
     def _evaluate(self) -> None:
         """
         Evaluates the model using the test data and stores the results.
         """
-        X = self._compact_vectors(self._test_X)
+        X = self._test_X
         Y = self._test_y
-        self._metrics_results = []
-        predictions = self._model.predict(X)
-        for metric in self._metrics:
-            result = metric.evaluate(predictions, Y)
-            self._metrics_results.append((metric, result))
-        self._predictions = predictions
+        with self._profiler.stage("evaluate") as record:
+            self._metrics_results = []
+            predictions = self._model.predict(X)
+            for metric in self._metrics:
+                result = metric.evaluate(Y, predictions)
+                self._metrics_results.append((metric, result))
+            self._predictions = predictions
+            record["arrays"] = array_sizes(predictions=predictions)
 
     def execute(self) -> dict:
         """
         Executes the pipeline, running preprocessing, training and evaluation.
 
         Returns:
-            dict: Dictionary containing training,test metrics and predictions.
+            dict: Dictionary containing training,test metrics and predictions,
+            and the time in seconds it took to fit the model, and the
+            profile of the run's stages.
         """
+        self._profiler.reset()
         self._preprocess_features()
         self._split_data()
         self._train()
-        self._evaluate()
+        return self._results()
+
+    def continue_training(self, n_iterations: int = None) -> dict:
+        """
+        Executes the pipeline, training the model further instead of
+        fitting it from scratch.
+
+        This is how a saved pipeline is trained for more iterations, or
+        refreshed after rows were added to its dataset. Models that cannot
+        continue training are refitted.
+
+        Args:
+            n_iterations (int): The number of additional iterations of the
+            model, defaults to the model's own default.
+
+        Returns:
+            dict: The same results as execute.
+        """
+        self._profiler.reset()
+        self._preprocess_features()
+        self._split_data()
+        self._continue_training(n_iterations)
+        return self._results()
+
+    def resplit(self, split_strategy: Split) -> dict:
+        """
+        Trains and evaluates the model on a different split of the
+        already preprocessed data. A pipeline without preprocessed data,
+        such as a loaded one, is preprocessed first.
+
+        Args:
+            split_strategy (Split): The new split strategy.
+
+        Returns:
+            dict: The same results as execute.
+        """
+        self._profiler.reset()
+        self._split_strategy = split_strategy
+        if self._input_matrix is None:
+            self._preprocess_features()
+        else:
+            self._add_split_columns()
+        self._split_data()
+        self._train()
+        return self._results()
 
-        train_x = self._compact_vectors(self._train_X)
-        test_x = self._compact_vectors(self._test_X)
+    def refresh(self, dataset: Dataset) -> dict:
+        """
+        Brings the pipeline up to a newer version of its dataset.
 
-        train_predictions = self._model.predict(train_x)
-        train_metrics_results = [(metric, metric.evaluate(
-            train_predictions, self._train_y)) for metric in self._metrics]
+        When the new version only appends rows, the rows are read from the
+        delta versions, without reading the rows trained on before. The
+        model is first evaluated on them, so the new rows test the model
+        that has not seen them yet. Then the scalers and encoders are
+        updated with the rows, the model is adapted to the changed columns
+        and trained further on them. Versions that delete rows, and
+        models that cannot adapt, are refitted on the new version.
 
-        test_predictions = self._model.predict(test_x)
-        test_metrics_results = [(metric, metric.evaluate(
-            test_predictions, self._test_y)) for metric in self._metrics]
+        Args:
+            dataset (Dataset): A newer version of the dataset, with its
+            parents linked, as by ArtifactRegistry.dataset.
 
+        Raises:
+            ValueError: If the dataset is the version the pipeline was
+            trained on.
+
+        Returns:
+            dict: The "mode", "incremental" or "refit". An incremental
+            refresh returns the number of "rows" added, their metrics and
+            predictions before training on them, "delta_metrics" and
+            "delta_predictions", the fit time and the profile; a refit
+            returns the results of execute.
+        """
+        if dataset.id == self._dataset.id:
+            raise ValueError("The pipeline is trained on this version")
+        self._profiler.reset()
+        with self._profiler.stage("read_delta") as record:
+            frames = []
+            version = dataset
+            while True:
+                delta = version.delta
+                if delta is None or len(delta["deleted"]) > 0:
+                    frames = None
+                    break
+                frames.append(version.read_delta(self._data_columns()))
+                if delta["parent"] == self._dataset.id:
+                    break
+                version = version.parent
+            if frames is not None:
+                data = pd.concat(frames[::-1], ignore_index=True)
+                record["rows"] = len(data)
+        if frames is None:
+            return self._refit(dataset)
+
+        if self._builders is None:
+            with self._profiler.stage("fit_transformers"):
+                builders = self._fit_builders(
+                    self._dataset.read(columns=self._data_columns()))
+        else:
+            # the builders may be shared through the preprocessing cache
+            builders = copy.deepcopy(self._builders)
+        input_builder, target_builder = builders
+        with self._profiler.stage("evaluate_delta") as record:
+            predictions = self._model.predict(input_builder.transform(data))
+            targets = target_builder.transform(data)
+            delta_metrics = [(metric, metric.evaluate(targets, predictions))
+                             for metric in self._metrics]
+            record["arrays"] = array_sizes(predictions=predictions)
+        with self._profiler.stage("update_transformers"):
+            inputs = input_builder.partial_fit(data)
+            outputs = target_builder.partial_fit(data)
+        with self._profiler.stage("adapt_model"):
+            try:
+                self._model.adapt(inputs, outputs)
+            except NotImplementedError:
+                return self._refit(dataset)
+        with self._profiler.stage("continue_training") as record:
+            X = input_builder.transform(data)
+            Y = target_builder.transform(data)
+            start = time.perf_counter()
+            self._model.continue_fit(observations=X, ground_truths=Y)
+            self._fit_time = time.perf_counter() - start
+            record["arrays"] = array_sizes(input_matrix=X, output_vector=Y)
+
+        self._dataset = dataset
+        self._builders = builders
+        self._column_map = input_builder.column_map
+        self._columns = input_builder.columns
+        # the preprocessed data is of the old version, resplit
+        # preprocesses the new version
+        self._input_matrix = self._output_vector = None
+        self._split_frame = None
+        self._split_buffers = None
+        self._profile = self._profiler.report
+        return {
+            "mode": "incremental",
+            "rows": len(data),
+            "delta_metrics": delta_metrics,
+            "delta_predictions": predictions,
+            "fit_time": self._fit_time,
+            "profile": self._profile,
+        }
+
+    def _refit(self, dataset: Dataset) -> dict:
+        """
+        Trains the pipeline from scratch on a new version of its dataset.
+
+        Returns:
+            dict: The results of execute, with the mode.
+        """
+        self._dataset = dataset
+        return {**self.execute(), "mode": "refit"}
+
+    def _fit_builders(self, data: pd.DataFrame) -> tuple:
+        """
+        Fits the input and target builders of a pipeline saved without
+        them.
+
+        Returns:
+            tuple: The fitted input and target builders.
+        """
+        input_builder = DesignMatrixBuilder(self._input_features,
+                                            np.dtype(self._dtype),
+                                            self._model.memory_layout)
+        target_builder = DesignMatrixBuilder([self._target_feature],
+                                             np.dtype(self._dtype))
+        return input_builder.fit(data), target_builder.fit(data)
+
+    def _results(self) -> dict:
+        """
+        Evaluates the trained model on the training and the test data.
+
+        Returns:
+            dict: Dictionary containing training,test metrics and predictions,
+            and the time in seconds it took to fit the model, and the
+            profile of the run's stages.
+        """
+        self._evaluate()
+
+        with self._profiler.stage("predict_train") as record:
+            train_predictions = self._model.predict(self._train_X)
+            train_metrics_results = [(metric, metric.evaluate(
+                self._train_y, train_predictions))
+                for metric in self._metrics]
+            record["arrays"] = array_sizes(predictions=train_predictions)
+
+        self._profile = self._profiler.report
         return {
             "train_metrics": train_metrics_results,
             "train_predictions": train_predictions,
-            "test_metrics": test_metrics_results,
-            "test_predictions": test_predictions,
+            # _evaluate already predicted and scored the test set
+            "test_metrics": list(self._metrics_results),
+            "test_predictions": self._predictions,
+            "fit_time": self._fit_time,
+            "profile": self._profile,
         }
 
     def save(self, name: str, version: str, save_path: str) -> Artifact:
@@ -236,16 +612,7 @@ Pipeline(
             Artifact: The created artifact for the pipeline.
         """
 
-        data = pickle.dumps({
-            "dataset": self._dataset,
-            "input_features": self._input_features,
-            "target_feature": self._target_feature,
-            "split": self._split,
-            "metrics": self._metrics,
-            "model": self._model
-        })
-
-        serialized_data = data
+        serialized_data = pickle.dumps(self._state())
 
         artifact = Artifact(
             name=name,
@@ -259,6 +626,38 @@ Pipeline(
 
         return artifact
 
+    def save_to(self, storage: Storage, key: str) -> None:
+        """
+        Saves the pipeline to storage, pickling it straight into the
+        stored data instead of into bytes in memory first.
+
+        Args:
+            storage (Storage): The storage to save to.
+            key (str): The key of the serialized pipeline.
+        """
+        with storage.open_write(key) as f:
+            pickle.dump(self._state(), f)
+
+    def _state(self) -> dict:
+        """
+        Collects what is saved of the pipeline.
+
+        Returns:
+            dict: The picklable state, read back by load.
+        """
+        return {
+            "dataset": self._dataset,
+            "input_features": self._input_features,
+            "target_feature": self._target_feature,
+            "split": self._split,
+            "split_strategy": self._split_strategy,
+            "dtype": self._dtype,
+            "profile": self._profile,
+            "metrics": self._metrics,
+            "builders": self._builders,
+            "model": serialization.dumps(self._model)
+        }
+
     @staticmethod
     def load(load_path: str) -> "Pipeline":
         """
@@ -271,15 +670,50 @@ Pipeline(
             Pipeline: The loaded pipeline instance.
         """
         with open(load_path, "rb") as f:
-            data = pickle.load(f)
+            return Pipeline._from_state(pickle.load(f))
+
+    @staticmethod
+    def load_from(storage: Storage, key: str) -> "Pipeline":
+        """
+        Loads a pipeline from storage, unpickling it from a stream.
+
+        Args:
+            storage (Storage): The storage holding the pipeline.
+            key (str): The key of the serialized pipeline.
+
+        Returns:
+            Pipeline: The loaded pipeline instance.
+        """
+        with storage.open_read(key) as f:
+            return Pipeline._from_state(pickle.load(f))
+
+    @staticmethod
+    def _from_state(data: dict) -> "Pipeline":
+        """
+        Creates a pipeline from its saved state.
+
+        Args:
+            data (dict): The state, as collected by _state.
+
+        Returns:
+            Pipeline: The loaded pipeline instance.
+        """
+        model = data["model"]
+        # pipelines saved before the model format pickled the model itself
+        if isinstance(model, bytes):
+            model = serialization.loads(model)
 
         pipeline = Pipeline(
             metrics=data["metrics"],
             dataset=data["dataset"],
-            model=data["model"],
+            model=model,
             input_features=data["input_features"],
             target_feature=data["target_feature"],
-            split=data["split"]
+            split=data["split"],
+            dtype=data.get("dtype", "float64"),
+            split_strategy=data.get("split_strategy"),
         )
+        pipeline._profile = data.get("profile")
+        pipeline._builders = data.get("builders")
 
         return pipeline
@@ -0,0 +1,298 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.design_matrix import DesignMatrixBuilder
+from autoop.core.ml.feature import Feature
+
+ARRAYS = ["input_matrix", "output_vector"]
+
+
+class PreprocessingCache():
+    """
+    Keeps the preprocessed data of pipelines, so pipelines that differ only
+    in their model, metrics or split reuse it instead of preprocessing the
+    dataset again.
+
+    An entry holds the design matrix, the target vector, the fitted
+    transformers and the column layout. Entries are kept in memory up to a
+    byte budget and evicted least recently used first. With a spill path,
+    evicted entries are written to disk as .npy files and memory-mapped
+    back when they are needed again. Spilled entries have a budget of
+    their own and are deleted least recently used first.
+
+    Cached arrays are shared by every pipeline that uses them and are
+    therefore read-only.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2**20,
+                 spill_path: str = None,
+                 max_spill_bytes: int = 2 * 2**30) -> None:
+        """
+        Initializes an empty cache, picking up the entries spilled to
+        the spill path before.
+
+        Args:
+            max_bytes (int): The memory budget of the cached arrays.
+            spill_path (str): The directory evicted entries are written to,
+            for example a hidden directory inside the artifact store, so
+            its files are not listed as artifacts. Defaults to no spill,
+            evicted entries are dropped.
+            max_spill_bytes (int): The disk budget of the spilled entries.
+        """
+        self._max_bytes = max_bytes
+        self._spill_path = spill_path
+        self._max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._spilled = OrderedDict()
+        self._spill_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "spill_hits": 0, "misses": 0}
+        self._scan_spilled()
+
+    @staticmethod
+    def key(dataset: Dataset, input_features: List[Feature],
+            target_feature: Feature, dtype: str,
+            order: str) -> Optional[str]:
+        """
+        Computes the cache key of a preprocessing run.
+
+        Args:
+            dataset (Dataset): The dataset, identified by its id, version
+            and content hash. A registered version never changes, so
+            neither its data is loaded nor hashed for the key.
+            input_features (List[Feature]): The input features.
+            target_feature (Feature): The target feature.
+            dtype (str): The floating point type of the arrays.
+            order (str): The memory layout of the design matrix.
+
+        Returns:
+            Optional[str]: A hexadecimal key, also used as the spill
+            directory name, or None if the dataset has no content hash and
+            its preprocessing must not be cached. Its id alone would serve
+            the data of an earlier dataset stored under the same name.
+        """
+        if dataset.content_hash is None:
+            return None
+        spec = (
+            dataset.id,
+            dataset.version,
+            dataset.content_hash,
+            sorted((f.name, f.type) for f in input_features),
+            (target_feature.name, target_feature.type),
+            DesignMatrixBuilder.__name__,
+            str(dtype),
+            order,
+        )
+        return hashlib.sha256(repr(spec).encode()).hexdigest()
+
+    @property
+    def stats(self) -> dict:
+        """
+        Getter method for the cache statistics.
+
+        Returns:
+            dict: The number of hits in memory, hits on disk and misses,
+            and the number and size in bytes of the entries in memory
+            and on disk.
+        """
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries),
+                    "bytes": self._bytes,
+                    "spilled_entries": len(self._spilled),
+                    "spill_bytes": self._spill_bytes}
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Looks up the preprocessed data of a key.
+
+        Args:
+            key (str): The key, as returned by key.
+
+        Returns:
+            Optional[dict]: The entry, or None when it is not cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key]
+            entry = self._load_spilled(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["spill_hits"] += 1
+            self._insert(key, entry)
+            return entry
+
+    def put(self, key: str, entry: dict) -> dict:
+        """
+        Caches preprocessed data.
+
+        Args:
+            key (str): The key, as returned by key.
+            entry (dict): The arrays named in ARRAYS and any other
+            picklable values of the preprocessing run.
+
+        Returns:
+            dict: The cached entry, with read-only arrays.
+        """
+        entry = dict(entry)
+        for name in ARRAYS:
+            entry[name] = entry[name].view()
+            entry[name].setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, entry)
+        return entry
+
+    def clear(self, disk: bool = False) -> None:
+        """
+        Drops all entries from memory.
+
+        Args:
+            disk (bool): Whether to delete the spilled entries as well.
+            Defaults to keeping them.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk:
+                while self._spilled:
+                    self._delete_spilled(next(iter(self._spilled)))
+
+    @staticmethod
+    def _size(entry: dict) -> int:
+        """
+        Returns the size in bytes of the arrays of an entry.
+        """
+        return sum(entry[name].nbytes for name in ARRAYS)
+
+    def _insert(self, key: str, entry: dict) -> None:
+        """
+        Adds an entry, evicting the least recently used entries when the
+        memory budget is exceeded. An entry larger than the whole budget
+        is kept until the next insertion.
+        """
+        self._entries[key] = entry
+        self._bytes += self._size(entry)
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._spill(oldest, self._entries[oldest])
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        """
+        Removes an entry from memory.
+        """
+        self._bytes -= self._size(self._entries.pop(key))
+
+    def _spill(self, key: str, entry: dict) -> None:
+        """
+        Writes an evicted entry to the spill directory, once.
+        """
+        if self._spill_path is None:
+            return
+        directory = os.path.join(self._spill_path, key)
+        if os.path.exists(os.path.join(directory, "entry.pkl")):
+            if key in self._spilled:
+                self._spilled.move_to_end(key)
+            return
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), entry[name])
+        rest = {name: value for name, value in entry.items()
+                if name not in ARRAYS}
+        # written last, it marks the entry as complete
+        with open(os.path.join(directory, "entry.pkl"), "wb") as f:
+            pickle.dump(rest, f)
+        self._add_spilled(key, self._directory_size(directory))
+
+    def _load_spilled(self, key: str) -> Optional[dict]:
+        """
+        Memory-maps a spilled entry.
+
+        Returns:
+            Optional[dict]: The entry, or None when it was not spilled.
+        """
+        if self._spill_path is None:
+            return None
+        directory = os.path.join(self._spill_path, key)
+        try:
+            with open(os.path.join(directory, "entry.pkl"), "rb") as f:
+                entry = pickle.load(f)
+            for name in ARRAYS:
+                entry[name] = np.load(
+                    os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            # deleted from disk by another cache sharing the directory
+            if key in self._spilled:
+                self._spill_bytes -= self._spilled.pop(key)
+            return None
+        if key in self._spilled:
+            self._spilled.move_to_end(key)
+        return entry
+
+    def _scan_spilled(self) -> None:
+        """
+        Records the complete entries of the spill directory, the least
+        recently written first, and deletes the oldest beyond the disk
+        budget.
+        """
+        if self._spill_path is None or not os.path.isdir(self._spill_path):
+            return
+        found = []
+        for name in os.listdir(self._spill_path):
+            directory = os.path.join(self._spill_path, name)
+            try:
+                written = os.stat(os.path.join(directory, "entry.pkl"))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            found.append((written.st_mtime_ns, name,
+                          self._directory_size(directory)))
+        for _, key, size in sorted(found):
+            self._add_spilled(key, size)
+
+    @staticmethod
+    def _directory_size(directory: str) -> int:
+        """
+        Returns the size in bytes of the files of a spilled entry.
+        """
+        with os.scandir(directory) as it:
+            return sum(entry.stat().st_size for entry in it
+                       if entry.is_file())
+
+    def _add_spilled(self, key: str, size: int) -> None:
+        """
+        Records a spilled entry, deleting the least recently used spilled
+        entries when the disk budget is exceeded. An entry larger than
+        the whole budget is kept until the next spill.
+        """
+        self._spilled[key] = size
+        self._spill_bytes += size
+        budget = self._max_spill_bytes
+        while self._spill_bytes > budget and len(self._spilled) > 1:
+            self._delete_spilled(next(iter(self._spilled)))
+
+    def _delete_spilled(self, key: str) -> None:
+        """
+        Deletes a spilled entry from disk. Entries in memory that were
+        memory-mapped from it stay readable where the platform allows it.
+        """
+        self._spill_bytes -= self._spilled.pop(key)
+        directory = os.path.join(self._spill_path, key)
+        try:
+            # removed first, so the entry is never read half deleted
+            os.remove(os.path.join(directory, "entry.pkl"))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,153 @@
+import cProfile
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import numpy as np
+
+TOP_CALLS = 20
+
+
+def array_sizes(**arrays: np.ndarray) -> dict:
+    """
+    Describes the arrays a stage produced.
+
+    Args:
+        **arrays (np.ndarray): The arrays by name, None values are skipped.
+
+    Returns:
+        dict: The shape, dtype and size in bytes of every array.
+    """
+    return {
+        name: {"shape": list(array.shape), "dtype": str(array.dtype),
+               "bytes": int(array.nbytes)}
+        for name, array in arrays.items() if array is not None
+    }
+
+
+class StageProfiler():
+    """
+    Records where the time and memory of a pipeline run go.
+
+    Every stage records its wall-clock time, the CPU time of the process
+    and the sizes of the arrays it produced. Optionally it also records
+    the peak memory allocated during the stage, traced with tracemalloc,
+    and the functions that took the most time, profiled with cProfile.
+    Both slow the stages they measure down, so they are off by default.
+
+    Stages may be nested; a nested stage is reported as "outer/inner".
+    """
+
+    def __init__(self, trace_memory: bool = False,
+                 profile_calls: bool = False) -> None:
+        """
+        Initializes the profiler.
+
+        Args:
+            trace_memory (bool): Whether to record the peak memory of every
+            stage.
+            profile_calls (bool): Whether to record the TOP_CALLS slowest
+            functions of every outermost stage.
+        """
+        self._trace_memory = trace_memory
+        self._profile_calls = profile_calls
+        self._stages = []
+        self._active = []
+
+    @property
+    def report(self) -> dict:
+        """
+        Getter method for the report of the stages recorded so far.
+
+        Returns:
+            dict: The stages in the order they finished, and the wall-clock
+            time of the outermost stages.
+        """
+        total = sum(stage["wall_time"] for stage in self._stages
+                    if "/" not in stage["name"])
+        return {"stages": [dict(stage) for stage in self._stages],
+                "total_wall_time": total}
+
+    def reset(self) -> None:
+        """
+        Forgets the recorded stages, before a new run.
+        """
+        self._stages = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """
+        Measures the code run inside the block as a stage.
+
+        Args:
+            name (str): The name of the stage.
+
+        Yields:
+            dict: The record of the stage. Code inside the block adds the
+            sizes of the arrays it produces under "arrays".
+        """
+        record = {"name": "/".join([*(s["name"] for s in self._active),
+                                    name]),
+                  "arrays": {}}
+        started_tracing = False
+        if self._trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            self._fold_peaks()
+            tracemalloc.reset_peak()
+            record["_base"] = tracemalloc.get_traced_memory()[0]
+            record["peak_memory"] = 0
+        profile = None
+        if self._profile_calls and not self._active:
+            profile = cProfile.Profile()
+            profile.enable()
+        self._active.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall
+            record["cpu_time"] = time.process_time() - cpu
+            if self._trace_memory:
+                self._fold_peaks()
+                del record["_base"]
+                if started_tracing:
+                    tracemalloc.stop()
+            self._active.pop()
+            if profile is not None:
+                profile.disable()
+                record["calls"] = self._top_calls(profile)
+            self._stages.append(record)
+
+    def _fold_peaks(self) -> None:
+        """
+        Adds the traced peak since the last reset to every active stage,
+        relative to the memory allocated when the stage started.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self._active:
+            record["peak_memory"] = max(record["peak_memory"],
+                                        peak - record["_base"])
+
+    @staticmethod
+    def _top_calls(profile: cProfile.Profile) -> List[dict]:
+        """
+        Summarizes the slowest functions of a cProfile run.
+
+        Returns:
+            List[dict]: The TOP_CALLS functions with the highest cumulative
+            time, with their number of calls, own time and cumulative time.
+        """
+        stats = pstats.Stats(profile).stats
+        calls = [
+            {"function": f"{file}:{line}({function})",
+             "calls": primitive, "total_time": own,
+             "cumulative_time": cumulative}
+            for (file, line, function), (primitive, _, own, cumulative, _)
+            in stats.items()
+        ]
+        calls.sort(key=lambda call: call["cumulative_time"], reverse=True)
+        return calls[:TOP_CALLS]
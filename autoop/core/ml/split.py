@@ -0,0 +1,296 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+SPLITS = [
+    "ordered",
+    "shuffled",
+    "stratified",
+    "grouped",
+    "time_ordered",
+]
+N_BINS = 10
+
+
+def get_split(name: str, column: str = None,
+              random_state: int = None) -> "Split":
+    """Gets the split strategy instance by name
+
+    Args:
+        name (str): The name of the split strategy to get
+        column (str): The group column of a grouped split or the time
+            column of a time ordered split
+        random_state (int): The seed of the randomized strategies
+
+    Raises:
+        ValueError: Error occurs if the provided name does not exist
+
+    Returns:
+        Split: An instance of the split strategy
+    """
+
+    splits_map = {
+        "ordered": lambda: Ordered(),
+        "shuffled": lambda: Shuffled(random_state),
+        "stratified": lambda: Stratified(random_state),
+        "grouped": lambda: Grouped(column, random_state),
+        "time_ordered": lambda: TimeOrdered(column),
+    }
+
+    if name not in splits_map:
+        raise ValueError(f"Unknown split name: {name}")
+
+    return splits_map[name]()
+
+
+class Split(ABC):
+    """Base class for all split strategies.
+
+    A strategy only decides which rows of the dataset are used for training
+    and which for testing, as arrays of row indices. The pipeline applies
+    them to the preprocessed design matrix, so a different split never
+    requires preprocessing the features again.
+    """
+
+    @property
+    def columns(self) -> List[str]:
+        """Getter method for the data columns the strategy splits on,
+        besides the target
+
+        Returns:
+            List[str]: The column names
+        """
+        return []
+
+    @abstractmethod
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits the rows of the data
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The indices of the training rows
+            and of the test rows
+        """
+        pass
+
+    def __str__(self) -> str:
+        """Returns the class name with the settings of the strategy"""
+        settings = ", ".join(f"{key.lstrip('_')}={value}"
+                             for key, value in vars(self).items())
+        return f"{self.__class__.__name__}({settings})"
+
+# add here concrete implementations of the Split class
+
+
+class Ordered(Split):
+    """Trains on the leading rows and tests on the trailing rows."""
+
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits the rows of the data in their order
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The indices of the training rows
+            and of the test rows
+        """
+        rows = np.arange(len(data))
+        n_train = int(fraction * len(data))
+        return rows[:n_train], rows[n_train:]
+
+
+class Shuffled(Split):
+    """Draws the training rows at random."""
+
+    def __init__(self, random_state: int = None) -> None:
+        """Initializes the strategy
+
+        Args:
+            random_state (int): The seed of the draw
+        """
+        self._random_state = random_state
+
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits a random permutation of the rows
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted indices of the
+            training rows and of the test rows
+        """
+        rows = np.random.default_rng(self._random_state).permutation(
+            len(data))
+        n_train = int(fraction * len(data))
+        return np.sort(rows[:n_train]), np.sort(rows[n_train:])
+
+
+class Stratified(Split):
+    """Draws the training rows at random, per class of the target.
+
+    Every class keeps its share of the rows in both sets. A numerical
+    target is stratified on N_BINS quantile bins of its values.
+    """
+
+    def __init__(self, random_state: int = None) -> None:
+        """Initializes the strategy
+
+        Args:
+            random_state (int): The seed of the draw
+        """
+        self._random_state = random_state
+
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits every class of the target
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted indices of the
+            training rows and of the test rows
+        """
+        values = data[target]
+        if pd.api.types.is_numeric_dtype(values):
+            if values.nunique() > N_BINS:
+                values = pd.qcut(values, N_BINS, labels=False,
+                                 duplicates="drop")
+        classes = pd.factorize(values)[0]
+        # a random order, then grouped by class
+        rows = np.random.default_rng(self._random_state).permutation(
+            len(data))
+        rows = rows[np.argsort(classes[rows], kind="stable")]
+        # rows with a missing target form no class and are tested on
+        missing = rows[:np.count_nonzero(classes < 0)]
+        rows = rows[len(missing):]
+        if len(rows) == 0:
+            return rows, np.sort(missing)
+        counts = np.bincount(classes[rows])
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        rank = np.arange(len(rows)) - np.repeat(starts, counts)
+        quota = np.round(fraction * counts).astype(np.int64)
+        in_train = rank < np.repeat(quota, counts)
+        test = np.concatenate([rows[~in_train], missing])
+        return np.sort(rows[in_train]), np.sort(test)
+
+
+class Grouped(Split):
+    """Keeps all rows of a group in the same set.
+
+    Groups, such as all measurements of one patient, are drawn at random
+    until the training set holds the fraction of the rows, so no group is
+    seen in training and in testing.
+    """
+
+    def __init__(self, column: str, random_state: int = None) -> None:
+        """Initializes the strategy
+
+        Args:
+            column (str): The name of the column identifying the groups
+            random_state (int): The seed of the draw
+        """
+        if column is None:
+            raise ValueError("A grouped split needs a group column")
+        self._column = column
+        self._random_state = random_state
+
+    @property
+    def columns(self) -> List[str]:
+        """Getter method for the group column
+
+        Returns:
+            List[str]: The name of the group column
+        """
+        return [self._column]
+
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits the groups of the rows
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The sorted indices of the
+            training rows and of the test rows
+        """
+        groups, names = pd.factorize(data[self._column], use_na_sentinel=False)
+        order = np.random.default_rng(self._random_state).permutation(
+            len(names))
+        sizes = np.bincount(groups, minlength=len(names))[order]
+        n_train = int(fraction * len(data))
+        # the first groups that fit, but never an empty training set
+        n_groups = max(1, np.searchsorted(np.cumsum(sizes), n_train,
+                                          side="right"))
+        in_train = np.isin(groups, order[:n_groups])
+        return np.flatnonzero(in_train), np.flatnonzero(~in_train)
+
+
+class TimeOrdered(Split):
+    """Trains on the earliest rows and tests on the latest rows.
+
+    The rows are ordered by a time column, so the model is never evaluated
+    on rows older than the ones it was trained on.
+    """
+
+    def __init__(self, column: str) -> None:
+        """Initializes the strategy
+
+        Args:
+            column (str): The name of the column the rows are ordered by
+        """
+        if column is None:
+            raise ValueError("A time ordered split needs a time column")
+        self._column = column
+
+    @property
+    def columns(self) -> List[str]:
+        """Getter method for the time column
+
+        Returns:
+            List[str]: The name of the time column
+        """
+        return [self._column]
+
+    def indices(self, data: pd.DataFrame, target: str,
+                fraction: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Splits the rows in the order of the time column
+
+        Args:
+            data (pd.DataFrame): The target column and the columns of the
+                strategy, one row per dataset row
+            target (str): The name of the target column
+            fraction (float): The fraction of the rows used for training
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The indices of the training rows
+            and of the test rows, both in time order
+        """
+        rows = np.argsort(data[self._column].to_numpy(), kind="stable")
+        n_train = int(fraction * len(data))
+        return rows[:n_train], rows[n_train:]
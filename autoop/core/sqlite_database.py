@@ -0,0 +1,303 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List, Tuple, Union
+
+
+class SQLiteDatabase():
+    """Database backed by a single SQLite file
+
+    Offers the same interface as `Database`, but keeps every collection in
+    its own table with the entries stored as JSON columns. The file runs in
+    WAL mode, so readers in other processes are never blocked by a writer,
+    and secondary indexes live in an indexed side table.
+    """
+    def __init__(self, path: str = "./assets/dbo.sqlite3") -> None:
+        """Initializer method
+
+        Args:
+            path (str): Path of the SQLite file. It is created, together
+                        with its parent directory, if it does not exist.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS _index ("
+            "collection TEXT, field TEXT, value TEXT, id TEXT, "
+            "PRIMARY KEY (collection, field, value, id)) WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS _index_by_id "
+            "ON _index (collection, id)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS _indexed ("
+            "collection TEXT, field TEXT, PRIMARY KEY (collection, field))"
+        )
+        self._tables = set()
+        self._indexes = {}
+        self.refresh()
+
+    def set(self, collection: str, id: str, entry: dict) -> dict:
+        """Set a key in the database
+        Args:
+            collection (str): The collection to store the data in
+            id (str): The id of the data
+            entry (dict): The data to store
+        Returns:
+            dict: The data that was stored
+        """
+        assert isinstance(entry, dict), "Data must be a dictionary"
+        assert isinstance(collection, str), "Collection must be a string"
+        assert isinstance(id, str), "ID must be a string"
+        with self.batch():
+            table = self._table(collection, create=True)
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {table} (id, data) VALUES (?, ?)",
+                (id, json.dumps(entry)),
+            )
+            self._unindex(collection, id)
+            self._index(collection, id, entry)
+        return entry
+
+    def get(self, collection: str, id: str) -> Union[dict, None]:
+        """Get a key from the database
+        Args:
+            collection (str): The collection to get the data from
+            id (str): The id of the data
+        Returns:
+            Union[dict, None]: The data that was stored, or None if it doesn't
+            exist
+        """
+        table = self._table(collection)
+        if table is None:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT data FROM {table} WHERE id = ?", (id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def delete(self, collection: str, id: str) -> None:
+        """Delete a key from the database
+        Args:
+            collection (str): The collection to delete the data from
+            id (str): The id of the data
+        Returns:
+            None
+        """
+        table = self._table(collection)
+        if table is None:
+            return
+        with self.batch():
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE id = ?", (id,)
+            )
+            self._unindex(collection, id)
+
+    def list(self, collection: str) -> List[Tuple[str, dict]]:
+        """Lists all data in a collection
+        Args:
+            collection (str): The collection to list the data from
+        Returns:
+            List[Tuple[str, dict]]: A list of tuples containing the id and
+            data for each item in the collection
+        """
+        table = self._table(collection)
+        if table is None:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, data FROM {table}"
+            ).fetchall()
+        return [(id, json.loads(data)) for id, data in rows]
+
+    def collections(self) -> List[str]:
+        """Lists the names of all collections
+        Returns:
+            List[str]: The collection names
+        """
+        self.refresh()
+        return sorted(self._tables)
+
+    def create_index(self, collection: str, field: str) -> None:
+        """Create a secondary index on a field of a collection
+
+        The index is persisted in the file, so it is built only once and is
+        maintained by every process writing to the database.
+        Args:
+            collection (str): The collection to index
+            field (str): The entry field to index
+        Returns:
+            None
+        """
+        if field in self._indexes.get(collection, set()):
+            return
+        with self.batch():
+            self._connection.execute(
+                "INSERT OR IGNORE INTO _indexed (collection, field) "
+                "VALUES (?, ?)", (collection, field)
+            )
+            self._indexes.setdefault(collection, set()).add(field)
+            for id, entry in self.list(collection):
+                self._index_field(collection, field, id, entry.get(field))
+
+    def find(self, collection: str, **criteria) -> List[Tuple[str, dict]]:
+        """Find the entries of a collection matching all given criteria
+        Args:
+            collection (str): The collection to search
+            **criteria: Field values the entries must match. For list
+                fields an entry matches when the value is one of its
+                elements. Indexed fields are resolved through the index,
+                other fields are checked on the remaining candidates.
+        Returns:
+            List[Tuple[str, dict]]: A list of tuples containing the id and
+            data of every matching entry, sorted by id
+        """
+        table = self._table(collection)
+        if table is None:
+            return []
+        indexed = self._indexes.get(collection, set())
+        joins = []
+        parameters = []
+        unindexed = {}
+        for field, value in criteria.items():
+            if field not in indexed or not isinstance(value, Hashable):
+                unindexed[field] = value
+                continue
+            alias = f"i{len(joins)}"
+            joins.append(
+                f"JOIN _index {alias} ON {alias}.id = t.id "
+                f"AND {alias}.collection = ? AND {alias}.field = ? "
+                f"AND {alias}.value = ?"
+            )
+            parameters += [collection, field, json.dumps(value)]
+        query = (f"SELECT t.id, t.data FROM {table} t "
+                 f"{' '.join(joins)} ORDER BY t.id")
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        results = []
+        for id, data in rows:
+            entry = json.loads(data)
+            if all(self._matches(entry.get(field), value)
+                   for field, value in unindexed.items()):
+                results.append((id, entry))
+        return results
+
+    def refresh(self) -> None:
+        """Refresh the known tables and indexes
+
+        Entries are always read from the file, so this only picks up
+        collections and indexes created by other processes.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()
+            self._tables = {name for (name,) in rows
+                            if not name.startswith("_")}
+            indexes = {}
+            for collection, field in self._connection.execute(
+                    "SELECT collection, field FROM _indexed"):
+                indexes.setdefault(collection, set()).add(field)
+            self._indexes = indexes
+
+    @contextmanager
+    def batch(self) -> Iterator["SQLiteDatabase"]:
+        """Group writes into a single transaction
+
+        Every set and delete made inside the block is committed at once
+        when it exits, or rolled back if it raises. Batches can be nested,
+        in which case only the outermost one commits.
+
+        Yields:
+            SQLiteDatabase: The database itself
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._connection.execute("ROLLBACK")
+                    self.refresh()
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._connection.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the connection to the SQLite file"""
+        self._connection.close()
+
+    @staticmethod
+    def _matches(stored: object, value: object) -> bool:
+        """Check whether a stored field value matches a query value"""
+        if isinstance(stored, list):
+            return value in stored
+        return stored == value
+
+    def _table(self, collection: str, create: bool = False) -> Union[str,
+                                                                     None]:
+        """Get the quoted table name of a collection
+
+        Args:
+            collection (str): The collection name
+            create (bool): Whether to create the table if it is missing
+        Returns:
+            Union[str, None]: The quoted table name, or None if the
+            collection does not exist and is not created
+        """
+        if collection.startswith("_"):
+            raise ValueError("Collection names cannot start with '_'")
+        quoted = '"' + collection.replace('"', '""') + '"'
+        if collection in self._tables:
+            return quoted
+        if not create:
+            # the table may have been created by another process
+            self.refresh()
+            return quoted if collection in self._tables else None
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {quoted} "
+            "(id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._tables.add(collection)
+        return quoted
+
+    def _index_field(self, collection: str, field: str, id: str,
+                     value: object) -> None:
+        """Add the values of a single field of an entry to the index"""
+        values = value if isinstance(value, list) else [value]
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO _index (collection, field, value, id) "
+            "VALUES (?, ?, ?, ?)",
+            [(collection, field, json.dumps(v), id) for v in values
+             if v is not None and isinstance(v, Hashable)],
+        )
+
+    def _index(self, collection: str, id: str, entry: dict) -> None:
+        """Add an entry to every index of its collection"""
+        for field in self._indexes.get(collection, set()):
+            self._index_field(collection, field, id, entry.get(field))
+
+    def _unindex(self, collection: str, id: str) -> None:
+        """Remove an entry from every index of its collection"""
+        self._connection.execute(
+            "DELETE FROM _index WHERE collection = ? AND id = ?",
+            (collection, id),
+        )
@@ -1,7 +1,119 @@
 from abc import ABC, abstractmethod
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from bisect import bisect_left, bisect_right
+from itertools import islice, takewhile
 import os
-from typing import List
-from glob import glob
+from typing import (
+    BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+)
+import uuid
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_STRIPES = 64
+IO_WORKERS = 16
+MANIFEST = ".manifest"
+KeyStat = Tuple[str, Optional[Tuple[int, int]]]
+T = TypeVar("T")
+
+
+def _lock_file(file: BinaryIO) -> None:
+    """
+    Takes an exclusive advisory lock on an open file, blocking until it is
+    available.
+
+    Args:
+        file (BinaryIO): The open lock file.
+    """
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK gives up after ten seconds, keep waiting
+            continue
+
+
+def _unlock_file(file: BinaryIO) -> None:
+    """
+    Releases the advisory lock taken with _lock_file.
+
+    Args:
+        file (BinaryIO): The open lock file.
+    """
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _parts(key: str) -> Tuple[str, ...]:
+    """
+    Splits a key into its path components, the order keys are listed in.
+
+    Args:
+        key (str): The key.
+
+    Returns:
+        Tuple[str, ...]: The components of the normalized key.
+    """
+    key = os.path.normpath(key).strip(os.sep)
+    return () if key in ("", ".") else tuple(key.split(os.sep))
+
+
+def _paginate(keys: Iterable[str],
+              start_after: str = None) -> Iterator[str]:
+    """
+    Sorts keys by their path components and skips the keys up to and
+    including start_after.
+
+    Args:
+        keys (Iterable[str]): The keys.
+        start_after (str): The last key of the previous page, if any.
+
+    Returns:
+        Iterator[str]: The keys of the page and all later pages.
+    """
+    after = None if start_after is None else _parts(start_after)
+    for parts in sorted(_parts(key) for key in keys):
+        if after is None or parts > after:
+            yield os.path.join(*parts)
+
+
+def _run_many(function: Callable[..., T], calls: List[tuple],
+              max_workers: int) -> List[T]:
+    """
+    Runs a function on many argument tuples on a bounded thread pool.
+
+    Args:
+        function (Callable[..., T]): The function to run.
+        calls (List[tuple]): The arguments of every call.
+        max_workers (int): The maximum number of concurrent calls.
+
+    Returns:
+        List[T]: The results, in the order of the calls. The first error
+        is raised after the calls in flight finished.
+    """
+    if len(calls) <= 1 or max_workers == 1:
+        return [function(*arguments) for arguments in calls]
+    workers = min(max_workers, len(calls))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, *arguments)
+                   for arguments in calls]
+        return [future.result() for future in futures]
 
 
 class NotFoundError(Exception):
@@ -64,15 +176,169 @@ class Storage(ABC):
         """
         pass
 
+    def load_many(self, paths: Iterable[str],
+                  max_workers: int = IO_WORKERS) -> List[bytes]:
+        """
+        Load the data of many paths, with at most max_workers loads in
+        flight on a thread pool, so waiting on the disk overlaps
+        Args:
+            paths (Iterable[str]): Paths to load data
+            max_workers (int): The maximum number of concurrent loads
+        Returns:
+            List[bytes]: The loaded data, in the order of the paths
+        Raises:
+            NotFoundError: If any of the paths does not exist
+        """
+        return _run_many(self.load, [(path,) for path in paths], max_workers)
+
+    def save_many(self, items: Iterable[Tuple[bytes, str]],
+                  max_workers: int = IO_WORKERS) -> None:
+        """
+        Save data to many paths, with at most max_workers saves in flight
+        on a thread pool
+        Args:
+            items (Iterable[Tuple[bytes, str]]): The data and the path to
+                save it to
+            max_workers (int): The maximum number of concurrent saves
+        """
+        _run_many(self.save, list(items), max_workers)
+
+    def iter_keys(self, path: str = "/", start_after: str = None,
+                  limit: int = None) -> Iterator[str]:
+        """
+        Iterate over the paths under a given path in sorted order, one page
+        at a time. Storages that can stream their listing override this
+        Args:
+            path (str): Path to list
+            start_after (str): Only paths sorted after this path, the last
+                path of the previous page
+            limit (int): The maximum number of paths
+        Returns:
+            Iterator[str]: The paths
+        """
+        keys = _paginate(self.list(path), start_after)
+        return islice(keys, limit)
+
+    def scan(self, path: str = "/", start_after: str = None,
+             limit: int = None) -> Iterator[KeyStat]:
+        """
+        Iterate over the paths under a given path with their stat, as
+        iter_keys
+        Args:
+            path (str): Path to list
+            start_after (str): Only paths sorted after this path
+            limit (int): The maximum number of paths
+        Returns:
+            Iterator[KeyStat]: The paths with
+            their size and modification time, or None if the storage
+            cannot tell or the path disappeared
+        """
+        for key in self.iter_keys(path, start_after, limit):
+            try:
+                yield key, self.stat(key)
+            except (NotFoundError, NotImplementedError):
+                yield key, None
+
+    def open_read(self, path: str) -> BinaryIO:
+        """
+        Open the data at a given path as a binary file to read from. The
+        default reads the whole data into memory; storages that can stream
+        override this
+        Args:
+            path (str): Path of the data
+        Returns:
+            BinaryIO: A readable, seekable binary file, to be closed by the
+            caller
+        """
+        return io.BytesIO(self.load(path))
+
+    @contextmanager
+    def open_write(self, path: str) -> Iterator[BinaryIO]:
+        """
+        Open a binary file whose content is saved to a given path when the
+        block exits without an error. The default collects the content in
+        memory; storages that can stream override this
+        Args:
+            path (str): Path to save data
+        Yields:
+            BinaryIO: A writable binary file
+        """
+        buffer = io.BytesIO()
+        yield buffer
+        self.save(buffer.getvalue(), path)
+
+    def load_range(self, path: str, offset: int, length: int) -> bytes:
+        """
+        Load part of the data at a given path
+        Args:
+            path (str): Path to load data
+            offset (int): The position of the first byte
+            length (int): The number of bytes, fewer are returned at the
+                end of the data
+        Returns:
+            bytes: Loaded data
+        """
+        with self.open_read(path) as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def size(self, path: str) -> int:
+        """
+        Get the size of the data at a given path
+        Args:
+            path (str): Path of the data
+        Returns:
+            int: The size in bytes
+        """
+        try:
+            return self.stat(path)[0]
+        except NotImplementedError:
+            return len(self.load(path))
+
+    def stat(self, path: str) -> Tuple[int, int]:
+        """
+        Get the size and modification time of the data at a given path,
+        used to detect changes without loading the data
+        Args:
+            path (str): Path of the data
+        Returns:
+            Tuple[int, int]: Size in bytes and modification time in
+            nanoseconds
+        Raises:
+            NotImplementedError: If the storage cannot tell
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support stat")
+
+    @contextmanager
+    def lock(self, *paths: str) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the given paths for the duration of the
+        block, shared with every other process using the same storage.
+        The lock is advisory and not re-entrant. Storages without locking
+        support do not lock.
+        Args:
+            *paths (str): Paths to lock
+        """
+        yield
+
 
 class LocalStorage(Storage):
     """
     A storage class for managing local
     file operations including saving,loading,
     deleting and listing files under a specified base path.
+
+    Listing walks the directories with os.scandir, in sorted order, so the
+    keys stream out a page at a time. With a manifest, the storage also
+    keeps a log of the keys it saves and deletes in a hidden ".manifest"
+    file, and lists from it without touching the directory tree. The
+    manifest only sees files written through a LocalStorage with a
+    manifest; rebuild_manifest picks up files changed by other means.
     """
 
-    def __init__(self, base_path: str = "./assets") -> None:
+    def __init__(self, base_path: str = "./assets",
+                 manifest: bool = False) -> None:
         """
         Initializes the local storage with
         a base directory path.
@@ -81,27 +347,118 @@ class LocalStorage(Storage):
 
         Args:
             base_path (str): The root directory for storage operations.
+            manifest (bool): Whether to keep and list from a manifest of
+            the keys. A missing manifest is built from the files present.
         """
         self._base_path = os.path.normpath(base_path)
         if not os.path.exists(self._base_path):
             os.makedirs(self._base_path)
+        self._manifest = None
+        if manifest:
+            self._manifest = set()
+            self._manifest_order = None
+            self._manifest_file = (None, 0, 0)
+            with self._manifest_lock():
+                if not os.path.exists(self._manifest_path()):
+                    self._write_manifest(set(self._walk(())))
+                self._refresh_manifest()
 
     def save(self, data: bytes, key: str) -> None:
         """
         Saves data to the specified key within the base path.
         Creates any necessary parent directories.
 
+        The data is written to a hidden temporary file that then replaces
+        the target, so readers never see a partially written file.
+
         Args:
             data (bytes): The binary data to save.
             key (str): The relative path key within the base path where data
             will be stored.
         """
+        with self.open_write(key) as f:
+            f.write(data)
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Opens a file to stream data to the specified key, so the data never
+        has to be in memory at once.
+
+        Like save, the data goes to a hidden temporary file that replaces
+        the target when the block exits, and is discarded if the block
+        raises.
+
+        Args:
+            key (str): The relative path key within the base path where data
+            will be stored.
+
+        Yields:
+            BinaryIO: The open temporary file.
+        """
         path = self._join_path(key)
-        print(path, key)
         # Ensure parent directories are created
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'wb') as f:
-            f.write(data)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        temporary = os.path.join(
+            directory, f".tmp-{uuid.uuid4().hex}-{os.path.basename(path)}"
+        )
+        try:
+            with open(temporary, 'xb') as f:
+                yield f
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        if self._manifest is not None:
+            self._record("+", key)
+
+    def open_read(self, key: str) -> BinaryIO:
+        """
+        Opens the file of the specified key to stream its data.
+
+        Args:
+            key (str): The relative path key within the base path.
+
+        Returns:
+            BinaryIO: The open file, to be closed by the caller.
+        """
+        path = self._join_path(key)
+        try:
+            return open(path, 'rb')
+        except (FileNotFoundError, IsADirectoryError):
+            raise NotFoundError(path)
+
+    def load_range(self, key: str, offset: int, length: int) -> bytes:
+        """
+        Loads part of the data of the specified key, reading only that part
+        from disk.
+
+        Args:
+            key (str): The relative path key within the base path.
+            offset (int): The position of the first byte.
+            length (int): The number of bytes, fewer are returned at the end
+            of the file.
+
+        Returns:
+            bytes: The binary data of the range.
+        """
+        with self.open_read(key) as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def size(self, key: str) -> int:
+        """
+        Gets the size of the file at the specified key.
+
+        Args:
+            key (str): The relative path key within the base path.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return self.stat(key)[0]
 
     def load(self, key: str) -> bytes:
         """
@@ -131,6 +488,8 @@ class LocalStorage(Storage):
         path = self._join_path(key)
         self._assert_path_exists(path)
         os.remove(path)
+        if self._manifest is not None:
+            self._record("-", key)
 
     def list(self, prefix: str = "/") -> List[str]:
         """
@@ -143,14 +502,234 @@ class LocalStorage(Storage):
             Defaults to the root ("/").
 
         Returns:
-            List[str]: A list of file paths relative to the base path.
+            List[str]: A list of file paths relative to the base path, in
+            the order of iter_keys. Hidden files, such as temporary and
+            lock files, are skipped.
         """
-        path = self._join_path(prefix)
-        self._assert_path_exists(path)
-        # Use os.path.join for compatibility across platforms
-        keys = glob(os.path.join(path, "**", "*"), recursive=True)
-        return [os.path.relpath(p, self._base_path) for p in keys
-                if os.path.isfile(p)]
+        self._assert_path_exists(
+            os.path.join(self._base_path, *_parts(prefix)))
+        return list(self.iter_keys(prefix))
+
+    def iter_keys(self, prefix: str = "/", start_after: str = None,
+                  limit: int = None) -> Iterator[str]:
+        """
+        Streams the file paths under a prefix, sorted by their path
+        components, so a listing can be read a page at a time.
+
+        Args:
+            prefix (str): The relative path prefix within the base path.
+            start_after (str): Only keys sorted after this key, the last
+            key of the previous page.
+            limit (int): The maximum number of keys.
+
+        Returns:
+            Iterator[str]: The file paths relative to the base path.
+        """
+        # a leading separator is relative to the base path, not the root
+        parts = _parts(prefix)
+        if self._manifest is not None:
+            with self._manifest_lock():
+                self._refresh_manifest()
+                if self._manifest_order is None:
+                    self._manifest_order = sorted(self._manifest)
+                order = self._manifest_order
+            start = bisect_left(order, parts)
+            if start_after is not None:
+                start = max(start, bisect_right(order, _parts(start_after)))
+            keys = takewhile(lambda key: key[:len(parts)] == parts,
+                             islice(order, start, None))
+            return islice((os.path.join(*key) for key in keys), limit)
+        after = None if start_after is None else _parts(start_after)
+        return islice(self._walk(parts, after), limit)
+
+    def scan(self, prefix: str = "/", start_after: str = None,
+             limit: int = None) -> Iterator[KeyStat]:
+        """
+        Streams the file paths under a prefix with their size and
+        modification time in nanoseconds, as iter_keys.
+
+        Args:
+            prefix (str): The relative path prefix within the base path.
+            start_after (str): Only keys sorted after this key.
+            limit (int): The maximum number of keys.
+
+        Returns:
+            Iterator[KeyStat]: The file paths with their stat, None for
+            files that disappeared.
+        """
+        for key in self.iter_keys(prefix, start_after, limit):
+            try:
+                result = os.stat(self._join_path(key))
+            except FileNotFoundError:
+                yield key, None
+                continue
+            yield key, (result.st_size, result.st_mtime_ns)
+
+    def rebuild_manifest(self) -> None:
+        """
+        Rebuilds the manifest from the files present, after files were
+        added or removed without going through the storage.
+        """
+        if self._manifest is None:
+            return
+        with self._manifest_lock():
+            self._write_manifest(set(self._walk(())))
+            self._refresh_manifest()
+
+    def stat(self, key: str) -> Tuple[int, int]:
+        """
+        Gets the size and modification time of the file at the specified key.
+
+        Args:
+            key (str): The relative path key within the base path.
+
+        Returns:
+            Tuple[int, int]: The size in bytes and the modification time in
+            nanoseconds.
+        """
+        path = self._join_path(key)
+        try:
+            result = os.stat(path)
+        except FileNotFoundError:
+            raise NotFoundError(path)
+        return result.st_size, result.st_mtime_ns
+
+    @contextmanager
+    def lock(self, *keys: str) -> Iterator[None]:
+        """
+        Holds an exclusive advisory file lock on the specified keys.
+
+        Keys are hashed onto a fixed set of lock files under ".locks", so
+        writers of unrelated keys rarely wait for each other. The lock
+        files are taken in a fixed order, which rules out deadlocks
+        between writers locking several keys.
+
+        Args:
+            *keys (str): The relative path keys to lock.
+        """
+        directory = os.path.join(self._base_path, ".locks")
+        os.makedirs(directory, exist_ok=True)
+        stripes = sorted({
+            zlib.crc32(os.path.normpath(key).encode()) % LOCK_STRIPES
+            for key in keys
+        })
+        with ExitStack() as stack:
+            for stripe in stripes:
+                file = stack.enter_context(
+                    open(os.path.join(directory, f"{stripe:02d}.lock"), "ab")
+                )
+                _lock_file(file)
+                stack.callback(_unlock_file, file)
+            yield
+
+    def _walk(self, parts: Tuple[str, ...],
+              after: Tuple[str, ...] = None) -> Iterator[str]:
+        """
+        Walks a directory depth first in sorted order with os.scandir.
+
+        Args:
+            parts (Tuple[str, ...]): The components of the directory
+            relative to the base path.
+            after (Tuple[str, ...]): Skip the keys up to and including
+            these components, and the directories holding only such keys.
+
+        Returns:
+            Iterator[str]: The keys of the files, hidden entries skipped.
+        """
+        try:
+            with os.scandir(os.path.join(self._base_path, *parts)) as it:
+                entries = sorted((entry for entry in it
+                                  if not entry.name.startswith(".")),
+                                 key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            key = parts + (entry.name,)
+            if entry.is_dir():
+                if after is None or key >= after[:len(key)]:
+                    yield from self._walk(key, after)
+            elif entry.is_file():
+                if after is None or key > after:
+                    yield os.path.join(*key)
+
+    def _manifest_path(self) -> str:
+        """
+        Returns the path of the manifest file.
+        """
+        return os.path.join(self._base_path, MANIFEST)
+
+    @contextmanager
+    def _manifest_lock(self) -> Iterator[None]:
+        """
+        Holds the lock of the manifest, separate from the key locks, so
+        saving under a key lock never waits for itself.
+        """
+        with open(self._manifest_path() + ".lock", "ab") as file:
+            _lock_file(file)
+            try:
+                yield
+            finally:
+                _unlock_file(file)
+
+    def _refresh_manifest(self) -> None:
+        """
+        Applies the lines other processes appended to the manifest since
+        it was last read. A rewritten manifest is read again in full.
+
+        The keys are kept as their path components, and their sorted
+        order is cached until the manifest changes.
+        """
+        try:
+            result = os.stat(self._manifest_path())
+        except FileNotFoundError:
+            self._manifest, self._manifest_order = set(), None
+            self._manifest_file = (None, 0, 0)
+            return
+        inode, offset, lines = self._manifest_file
+        if inode != result.st_ino:
+            self._manifest, self._manifest_order = set(), None
+            offset, lines = 0, 0
+        if result.st_size > offset:
+            with open(self._manifest_path(), "rb") as f:
+                f.seek(offset)
+                data = f.read(result.st_size - offset)
+            for line in data.decode().splitlines():
+                if line.startswith("+"):
+                    self._manifest.add(_parts(line[1:]))
+                else:
+                    self._manifest.discard(_parts(line[1:]))
+                lines += 1
+            self._manifest_order = None
+            offset = result.st_size
+        self._manifest_file = (result.st_ino, offset, lines)
+
+    def _record(self, operation: str, key: str) -> None:
+        """
+        Appends a saved ("+") or deleted ("-") key to the manifest, and
+        rewrites the manifest when it is mostly outdated lines. Hidden
+        keys are not listed and not recorded.
+        """
+        parts = _parts(key)
+        if any(part.startswith(".") for part in parts):
+            return
+        with self._manifest_lock():
+            self._refresh_manifest()
+            with open(self._manifest_path(), "ab") as f:
+                f.write(f"{operation}{os.path.join(*parts)}\n".encode())
+            self._refresh_manifest()
+            if self._manifest_file[2] > 2 * len(self._manifest) + 100:
+                self._write_manifest(
+                    os.path.join(*key) for key in self._manifest)
+                self._refresh_manifest()
+
+    def _write_manifest(self, keys: Iterable[str]) -> None:
+        """
+        Replaces the manifest with the given keys, under the manifest lock.
+        """
+        temporary = self._manifest_path() + f".tmp-{uuid.uuid4().hex}"
+        with open(temporary, "wb") as f:
+            f.write("".join(f"+{key}\n" for key in sorted(keys)).encode())
+        os.replace(temporary, self._manifest_path())
 
     def _assert_path_exists(self, path: str) -> None:
         """
@@ -175,3 +754,141 @@ class LocalStorage(Storage):
         """
         # Ensure paths are OS-agnostic
         return os.path.normpath(os.path.join(self._base_path, path))
+
+
+class AsyncStorage():
+    """
+    The async companion of a storage.
+
+    Every operation runs the synchronous storage call on a thread pool, so
+    coroutines overlap disk I/O instead of blocking the event loop. The
+    bulk operations bound the number of calls in flight.
+    """
+
+    def __init__(self, storage: Storage,
+                 max_workers: int = IO_WORKERS) -> None:
+        """
+        Initializes the companion of a storage.
+
+        Args:
+            storage (Storage): The storage the calls are made on.
+            max_workers (int): The number of threads of the pool.
+        """
+        self._storage = storage
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def save(self, data: bytes, key: str) -> None:
+        """
+        Saves data to a key.
+
+        Args:
+            data (bytes): The binary data to save.
+            key (str): The key to save the data to.
+        """
+        await self._run(self._storage.save, data, key)
+
+    async def load(self, key: str) -> bytes:
+        """
+        Loads the data of a key.
+
+        Args:
+            key (str): The key to load.
+
+        Returns:
+            bytes: The loaded data.
+        """
+        return await self._run(self._storage.load, key)
+
+    async def load_range(self, key: str, offset: int, length: int) -> bytes:
+        """
+        Loads part of the data of a key.
+
+        Args:
+            key (str): The key to load.
+            offset (int): The position of the first byte.
+            length (int): The number of bytes.
+
+        Returns:
+            bytes: The loaded data.
+        """
+        return await self._run(self._storage.load_range, key, offset, length)
+
+    async def delete(self, key: str) -> None:
+        """
+        Deletes the data of a key.
+
+        Args:
+            key (str): The key to delete.
+        """
+        await self._run(self._storage.delete, key)
+
+    async def list(self, prefix: str = "/") -> List[str]:
+        """
+        Lists the keys under a prefix.
+
+        Args:
+            prefix (str): The prefix to list.
+
+        Returns:
+            List[str]: The keys.
+        """
+        return await self._run(self._storage.list, prefix)
+
+    async def load_many(self, keys: Iterable[str],
+                        limit: int = None) -> List[bytes]:
+        """
+        Loads the data of many keys concurrently.
+
+        Args:
+            keys (Iterable[str]): The keys to load.
+            limit (int): The maximum number of loads in flight. Defaults
+            to the number of threads.
+
+        Returns:
+            List[bytes]: The loaded data, in the order of the keys.
+        """
+        return await self._gather(self.load, [(key,) for key in keys],
+                                  limit)
+
+    async def save_many(self, items: Iterable[Tuple[bytes, str]],
+                        limit: int = None) -> None:
+        """
+        Saves data to many keys concurrently.
+
+        Args:
+            items (Iterable[Tuple[bytes, str]]): The data and the key to
+            save it to.
+            limit (int): The maximum number of saves in flight. Defaults
+            to the number of threads.
+        """
+        await self._gather(self.save, list(items), limit)
+
+    def close(self) -> None:
+        """
+        Shuts the thread pool down.
+        """
+        self._executor.shutdown()
+
+    async def _run(self, function: Callable[..., T], *arguments) -> T:
+        """
+        Runs a storage call on the thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function,
+                                          *arguments)
+
+    async def _gather(self, function: Callable[..., T], calls: List[tuple],
+                      limit: int = None) -> List[T]:
+        """
+        Awaits a coroutine function on many argument tuples, with at most
+        limit of them in flight.
+        """
+        semaphore = asyncio.Semaphore(limit or self._max_workers)
+
+        async def bounded(arguments: tuple) -> T:
+            async with semaphore:
+                return await function(*arguments)
+
+        return await asyncio.gather(*(bounded(arguments)
+                                      for arguments in calls))
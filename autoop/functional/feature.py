@@ -4,15 +4,31 @@ from autoop.core.ml.dataset import Dataset
 from autoop.core.ml.feature import Feature
 
 
-def detect_feature_types(dataset: Dataset) -> List[Feature]:
+def detect_feature_types(dataset: Dataset,
+                         columns: List[str] = None) -> List[Feature]:
     """Assumption: only categorical and numerical features and no NaN values.
+    The types are taken from the dataset's profile when it has one, so the
+    data is not decoded.
     Args:
         dataset: Dataset
+        columns: The columns to detect the types of, only they are read
+            of a dataset without a profile. Defaults to all columns.
     Returns:
         List[Feature]: List of features with their types.
     """
 
-    df = dataset.read()
+    if dataset.profile is not None:
+        # string columns are categorical, numbers and booleans numerical,
+        # like the dtypes pandas reads them as below
+        return [
+            Feature(name=column["name"],
+                    type="categorical" if column["dtype"] == "string"
+                    else "numerical")
+            for column in dataset.profile["schema"]
+            if columns is None or column["name"] in columns
+        ]
+
+    df = dataset.read(columns=columns)
     features = []
 
     for column in df.columns:
@@ -6,22 +6,25 @@ from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 
 def preprocess_features(features: List[Feature],
-                        dataset: Dataset) -> List[
+                        dataset: Dataset,
+                        dtype: np.dtype = np.float64) -> List[
                             Tuple[str, np.ndarray, dict]]:
     """Preprocess features.
     Args:
         features (List[Feature]): List of features.
         dataset (Dataset): Dataset object.
+        dtype (np.dtype): The floating point type of the preprocessed
+            data, float32 halves its memory.
     Returns:
         List[str, Tuple[np.ndarray, dict]]: List of preprocessed features.
         Each ndarray of shape (N, ...)
     """
     results = []
-    raw = dataset.read()
+    raw = dataset.read(columns=[feature.name for feature in features])
     for feature in features:
         print(type(raw), feature.name)
         if feature.type == "categorical":
-            encoder = OneHotEncoder()
+            encoder = OneHotEncoder(dtype=dtype)
             data = encoder.fit_transform(
                 raw[feature.name].values.reshape(-1, 1)).toarray()
             aritfact = {
@@ -29,8 +32,12 @@ def preprocess_features(features: List[Feature],
             results.append((feature.name, data, aritfact))
         if feature.type == "numerical":
             scaler = StandardScaler()
+            # the statistics are computed in float64 and only the scaled
+            # column is stored in dtype, so float32 data equals rounded
+            # float64 data
             data = scaler.fit_transform(
-                raw[feature.name].values.reshape(-1, 1))
+                raw[feature.name].values.reshape(-1, 1).astype(np.float64)
+            ).astype(dtype, copy=False)
             artifact = {
                 "type": "StandardScaler", "scaler": scaler.get_params()}
             results.append((feature.name, data, artifact))
@@ -1,9 +1,21 @@
 
 import unittest
 from autoop.tests.test_database import TestDatabase
+from autoop.tests.test_sqlite_database import TestSQLiteDatabase
 from autoop.tests.test_storage import TestStorage
+from autoop.tests.test_columnar import TestColumnar
+from autoop.tests.test_dataset import TestDatasetVersions
 from autoop.tests.test_features import TestFeatures
-from autoop.tests.test_pipeline import TestPipeline
+from autoop.tests.test_pipeline import (
+    TestPipeline, TestPipelineDtype, TestPipelineRefresh, TestDesignMatrix
+)
+from autoop.tests.test_split import TestSplit
+from autoop.tests.test_profiler import TestStageProfiler
+from autoop.tests.test_preprocessing_cache import TestPreprocessingCache
+from autoop.tests.test_models import (
+    TestModelSerialization, TestKNN, TestModelResources, TestContinueFit,
+    TestLeanInference
+)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
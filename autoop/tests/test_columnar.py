@@ -0,0 +1,193 @@
+import io
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.columnar import (
+    DISTINCT_LIMIT, ColumnarReader, ColumnarWriter, ColumnStatistics,
+    compact_dtypes, infer_schema, ingest_csv, is_columnar, profile
+)
+from autoop.core.ml.dataset import Dataset
+from autoop.core.storage import LocalStorage
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.frame = pd.DataFrame({
+            "count": rng.integers(0, 100, 1000),
+            "value": rng.normal(size=1000),
+            "label": rng.choice(["a", "b", "c"], 1000),
+            "flag": rng.random(1000) < 0.5,
+        })
+        self.frame.loc[::7, "value"] = np.nan
+        self.frame.loc[::11, "label"] = None
+        self.csv = self.frame.to_csv(index=False).encode()
+
+    def ingest(self, chunksize=128):
+        output = io.BytesIO()
+        summary = ingest_csv(io.BytesIO(self.csv), output, chunksize)
+        return output.getvalue(), summary
+
+    def test_round_trip(self):
+        data, summary = self.ingest()
+        self.assertTrue(is_columnar(data))
+        self.assertFalse(is_columnar(self.csv))
+        self.assertEqual(summary["num_rows"], 1000)
+        self.assertEqual([column["dtype"] for column in summary["schema"]],
+                         ["int64", "float64", "string", "bool"])
+        reader = ColumnarReader.from_bytes(data)
+        expected = pd.read_csv(io.BytesIO(self.csv))
+        pd.testing.assert_frame_equal(reader.read(), expected)
+        groups = list(reader.iter_row_groups())
+        self.assertEqual(len(groups), 8)
+        pd.testing.assert_frame_equal(
+            pd.concat(groups, ignore_index=True), expected)
+
+    def test_statistics(self):
+        _, summary = self.ingest()
+        statistics = summary["statistics"]
+        self.assertEqual(statistics["value"]["nulls"],
+                         int(self.frame["value"].isna().sum()))
+        self.assertAlmostEqual(statistics["value"]["mean"],
+                               self.frame["value"].mean())
+        self.assertEqual(statistics["count"]["max"],
+                         int(self.frame["count"].max()))
+        self.assertEqual(statistics["label"]["distinct"], 3)
+        top = dict((value, count)
+                   for value, count in statistics["label"]["top"])
+        self.assertEqual(top, self.frame["label"].value_counts().to_dict())
+
+    def test_distinct_strings_bounded(self):
+        statistics = ColumnStatistics("string")
+        for start in range(0, 3 * DISTINCT_LIMIT, 5000):
+            ids = [f"id{i}" for i in range(start, start + 5000)]
+            statistics.update(pd.Series(ids + ["common"] * 10))
+        self.assertLessEqual(len(statistics._counts), DISTINCT_LIMIT + 1)
+        summary = statistics.to_dict()
+        self.assertFalse(summary["distinct_exact"])
+        self.assertEqual(summary["distinct"], DISTINCT_LIMIT)
+        self.assertEqual(summary["top"][0],
+                         ["common", 10 * 3 * DISTINCT_LIMIT // 5000])
+
+    def test_profile_matches_ingestion(self):
+        _, summary = self.ingest()
+        profiled = profile(pd.read_csv(io.BytesIO(self.csv)))
+        # the means are summed per chunk when ingesting
+        self.assertAlmostEqual(profiled["statistics"]["value"].pop("mean"),
+                               summary["statistics"]["value"].pop("mean"))
+        self.assertEqual(profiled, summary)
+
+    def test_head_reads_leading_row_groups(self):
+        data, _ = self.ingest()
+        ranges = []
+
+        def read_range(offset, length):
+            ranges.append((offset, length))
+            return data[offset:offset + length]
+
+        reader = ColumnarReader(read_range, len(data))
+        footer_reads = len(ranges)
+        head = reader.read(rows=200)
+        self.assertEqual(len(head), 200)
+        # two row groups of four columns
+        self.assertEqual(len(ranges) - footer_reads, 8)
+        self.assertLess(sum(length for _, length in ranges), len(data) / 2)
+
+    def test_column_projection(self):
+        data, _ = self.ingest()
+        ranges = []
+
+        def read_range(offset, length):
+            ranges.append((offset, length))
+            return data[offset:offset + length]
+
+        reader = ColumnarReader(read_range, len(data))
+        footer_reads = len(ranges)
+        projected = reader.read(columns=["label", "count"])
+        pd.testing.assert_frame_equal(
+            projected, pd.read_csv(io.BytesIO(self.csv))[["label", "count"]])
+        # two of four columns in eight row groups
+        self.assertEqual(len(ranges) - footer_reads, 16)
+        groups = list(reader.iter_row_groups(["value"]))
+        self.assertEqual(list(groups[0].columns), ["value"])
+        with self.assertRaises(ValueError):
+            reader.read(columns=["missing"])
+
+    def test_compact_dtypes(self):
+        frame = pd.read_csv(io.BytesIO(self.csv))
+        compacted = compact_dtypes(frame)
+        self.assertEqual(compacted["count"].dtype, np.int8)
+        self.assertEqual(compacted["value"].dtype, np.float64)
+        self.assertIsInstance(compacted["label"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(compacted, frame, check_dtype=False,
+                                      check_categorical=False)
+        nullable = compact_dtypes(frame, dtype_backend="numpy_nullable")
+        self.assertEqual(str(nullable["count"].dtype), "Int8")
+        self.assertEqual(str(nullable["flag"].dtype), "boolean")
+        with self.assertRaises(ValueError):
+            compact_dtypes(frame, dtype_backend="unknown")
+
+    def test_compact_read(self):
+        data, summary = self.ingest()
+        columnar = Dataset(name="compact", asset_path="compact", data=data,
+                           metadata={"profile": summary})
+        csv = Dataset(name="compact", asset_path="compact", data=self.csv,
+                      metadata={"profile": summary})
+        expected = compact_dtypes(pd.read_csv(io.BytesIO(self.csv)),
+                                  summary["statistics"])
+        for dataset in [columnar, csv]:
+            read = dataset.read(compact=True)
+            pd.testing.assert_frame_equal(read, expected)
+            self.assertEqual(list(read["label"].cat.categories),
+                             ["a", "b", "c"])
+        report = columnar.memory_report()
+        self.assertEqual(report["columns"]["count"]["compact_dtype"], "int8")
+        self.assertLess(report["compact_bytes"], report["bytes"] / 2)
+
+    def test_integers_with_missing_values(self):
+        frame = pd.DataFrame({"count": np.arange(300), "label": "a"})
+        frame["count"] = frame["count"].astype(object)
+        frame.loc[[200, 250], "count"] = None
+        csv = frame.to_csv(index=False).encode()
+        output = io.BytesIO()
+        summary = ingest_csv(io.BytesIO(csv), output, chunksize=100)
+        self.assertEqual(summary["schema"][0]["dtype"], "int64")
+        self.assertEqual(summary["statistics"]["count"]["nulls"], 2)
+        pd.testing.assert_frame_equal(
+            ColumnarReader.from_bytes(output.getvalue()).read(),
+            pd.read_csv(io.BytesIO(csv)))
+        compacted = compact_dtypes(pd.read_csv(io.BytesIO(csv)),
+                                   summary["statistics"])
+        self.assertEqual(compacted["count"].dtype, np.float32)
+        nullable = compact_dtypes(pd.read_csv(io.BytesIO(csv)),
+                                  summary["statistics"], "numpy_nullable")
+        self.assertEqual(str(nullable["count"].dtype), "Int16")
+        self.assertEqual(int(nullable["count"].isna().sum()), 2)
+
+    def test_locked_schema(self):
+        schema = infer_schema(self.frame)
+        writer = ColumnarWriter(io.BytesIO(), schema)
+        changed = self.frame.assign(count=self.frame["value"])
+        with self.assertRaises(ValueError):
+            writer.write(changed)
+        with self.assertRaises(ValueError):
+            writer.write(self.frame[["value", "count", "label", "flag"]])
+
+    def test_ingested_dataset(self):
+        storage = LocalStorage(tempfile.mkdtemp())
+        dataset = Dataset.ingest(io.BytesIO(self.csv), name="ingested",
+                                 asset_path="ingested", storage=storage,
+                                 chunksize=100)
+        self.assertIsNone(dataset.data)
+        self.assertEqual(dataset.profile["num_rows"], 1000)
+        expected = pd.read_csv(io.BytesIO(self.csv))
+        pd.testing.assert_frame_equal(dataset.head(storage, 5),
+                                      expected.head(5))
+        pd.testing.assert_frame_equal(dataset.read_from(storage), expected)
+        stored = Dataset(name="ingested", asset_path="ingested",
+                         data=storage.load("ingested"))
+        pd.testing.assert_frame_equal(stored.read(), expected)
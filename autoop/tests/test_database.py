@@ -1,9 +1,11 @@
 import unittest
 
-from autoop.core.database import Database
+from autoop.core.database import ConflictError, Database
 from autoop.core.storage import LocalStorage
+import os
 import random
 import tempfile
+import threading
 
 class TestDatabase(unittest.TestCase):
 
@@ -49,4 +51,113 @@ class TestDatabase(unittest.TestCase):
         value = {"key": random.randint(0, 100)}
         self.db.set("collection", key, value)
         # collection should now contain the key
-        self.assertIn((key, value), self.db.list("collection"))
\ No newline at end of file
+        self.assertIn((key, value), self.db.list("collection"))
+
+    def test_find(self):
+        self.db.create_index("collection", "type")
+        self.db.set("collection", "a", {"type": "dataset", "name": "x"})
+        self.db.set("collection", "b", {"type": "pipeline", "name": "x"})
+        self.db.set("collection", "c", {"type": "dataset", "name": "y"})
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", type="dataset")],
+            ["a", "c"])
+        # unindexed fields are filtered on the indexed candidates
+        self.assertEqual(
+            self.db.find("collection", type="dataset", name="y"),
+            [("c", {"type": "dataset", "name": "y"})])
+        self.assertEqual(self.db.find("collection", type="model"), [])
+
+    def test_find_tags(self):
+        self.db.create_index("collection", "tags")
+        self.db.set("collection", "a", {"tags": ["red", "blue"]})
+        self.db.set("collection", "b", {"tags": ["blue"]})
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", tags="blue")],
+            ["a", "b"])
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", tags="red")], ["a"])
+
+    def test_index_updates(self):
+        self.db.create_index("collection", "type")
+        self.db.set("collection", "a", {"type": "dataset"})
+        self.db.set("collection", "a", {"type": "pipeline"})
+        self.assertEqual(self.db.find("collection", type="dataset"), [])
+        self.db.delete("collection", "a")
+        self.assertEqual(self.db.find("collection", type="pipeline"), [])
+        self.db.set("collection", "b", {"type": "dataset"})
+        self.db.refresh()
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", type="dataset")],
+            ["b"])
+
+    def test_refresh_changes(self):
+        other_db = Database(self.storage)
+        self.db.set("collection", "a", {"key": 1})
+        self.db.set("collection", "b", {"key": 2})
+        other_db.refresh()
+        self.db.set("collection", "a", {"key": 3})
+        self.db.delete("collection", "b")
+        other_db.refresh()
+        self.assertEqual(other_db.get("collection", "a"), {"key": 3})
+        self.assertIsNone(other_db.get("collection", "b"))
+
+    def test_refresh_unchanged_generation(self):
+        self.db.set("collection", "a", {"key": 1})
+        # written behind the database's back, so the generation is unchanged
+        self.storage.save(b'{"key": 2}', os.path.join("collection", "a"))
+        self.db.refresh()
+        self.assertEqual(self.db.get("collection", "a"), {"key": 1})
+        self.assertEqual(
+            Database(self.storage).get("collection", "a"), {"key": 2})
+
+    def test_batch(self):
+        other_db = Database(self.storage)
+        with self.db.batch():
+            self.db.set("collection", "a", {"key": 1})
+            self.db.set("collection", "b", {"key": 2})
+            self.assertEqual(self.db.get("collection", "a"), {"key": 1})
+            # nothing is written before the batch exits
+            other_db.refresh()
+            self.assertIsNone(other_db.get("collection", "a"))
+        other_db.refresh()
+        self.assertEqual(other_db.get("collection", "b"), {"key": 2})
+
+    def test_batch_rollback(self):
+        self.db.set("collection", "a", {"key": 1})
+        with self.assertRaises(RuntimeError):
+            with self.db.batch():
+                self.db.set("collection", "a", {"key": 2})
+                self.db.set("collection", "b", {"key": 3})
+                self.db.delete("collection", "a")
+                raise RuntimeError()
+        self.assertEqual(self.db.get("collection", "a"), {"key": 1})
+        self.assertIsNone(self.db.get("collection", "b"))
+        self.assertEqual(
+            Database(self.storage).list("collection"), [("a", {"key": 1})])
+
+    def test_conflict(self):
+        other_db = Database(self.storage)
+        self.db.set("collection", "a", {"key": 1})
+        other_db.refresh()
+        self.db.set("collection", "a", {"key": 2})
+        # other_db still holds the first revision
+        with self.assertRaises(ConflictError):
+            other_db.set("collection", "a", {"key": 3})
+        self.assertEqual(other_db.get("collection", "a"), {"key": 2})
+        other_db.set("collection", "a", {"key": 3})
+        self.db.refresh()
+        self.assertEqual(self.db.get("collection", "a"), {"key": 3})
+
+    def test_concurrent_writers(self):
+        def write(worker):
+            db = Database(self.storage)
+            for i in range(20):
+                db.set("collection", f"{worker}_{i}", {"key": i})
+
+        threads = [threading.Thread(target=write, args=(worker,))
+                   for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(Database(self.storage).list("collection")), 80)
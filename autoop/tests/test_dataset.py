@@ -0,0 +1,134 @@
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.artifact import Artifact
+from autoop.core.ml.dataset import MAX_DELTA_DEPTH, Dataset
+from autoop.core.storage import LocalStorage
+
+
+class TestDatasetVersions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.frame = pd.DataFrame({
+            "x": rng.normal(size=1000),
+            "n": rng.integers(0, 10, 1000),
+            "label": rng.choice(["a", "b"], 1000),
+        })
+        self.base = Dataset.from_dataframe(self.frame, name="growing",
+                                           asset_path="growing",
+                                           version="1")
+
+    def rows(self, start, count):
+        return self.frame.iloc[start:start + count].reset_index(drop=True)
+
+    def test_delta_stores_only_appended_rows(self):
+        version = self.base.append(self.rows(0, 10), version="2")
+        self.assertEqual(version.delta["parent"], self.base.id)
+        self.assertEqual(version.delta["num_rows"], 10)
+        self.assertEqual(version.profile["num_rows"], 1010)
+        self.assertLess(len(version.data), len(self.base.data) / 5)
+        pd.testing.assert_frame_equal(version.read_delta(),
+                                      self.rows(0, 10), check_dtype=False)
+        expected = pd.concat([self.base.read(), self.rows(0, 10)],
+                             ignore_index=True)
+        pd.testing.assert_frame_equal(version.read(), expected,
+                                      check_dtype=False)
+
+    def test_deleted_rows(self):
+        version = self.base.append(self.rows(0, 5), version="2",
+                                   deleted=[0, 3, 99])
+        data = version.read()
+        self.assertEqual(len(data), 1002)
+        self.assertEqual(version.profile["num_rows"], 1002)
+        np.testing.assert_allclose(data["x"][:3],
+                                   self.frame["x"].iloc[[1, 2, 4]])
+        with self.assertRaises(ValueError):
+            self.base.append(self.rows(0, 5), version="3", deleted=[1000])
+
+    def test_parent_loaded_lazily(self):
+        version = self.base.append(self.rows(0, 10), version="2")
+        calls = []
+
+        def parent():
+            calls.append(True)
+            return self.base
+
+        loaded = Dataset.from_artifact(version, parent=parent)
+        loaded.read_delta()
+        self.assertEqual(calls, [])
+        self.assertEqual(len(loaded.read()), 1010)
+        self.assertEqual(len(calls), 1)
+        orphan = Dataset.from_artifact(version)
+        with self.assertRaises(ValueError):
+            orphan.read()
+
+    def test_data_loaded_lazily(self):
+        metadata = Artifact(name="growing", type="dataset",
+                            asset_path="growing", version="1",
+                            metadata=self.base.metadata)
+        calls = []
+
+        def loader():
+            calls.append(True)
+            return self.base.data
+
+        loaded = Dataset.from_artifact(metadata, loader=loader)
+        self.assertEqual(loaded.profile, self.base.profile)
+        self.assertEqual(calls, [])
+        pd.testing.assert_frame_equal(loaded.read(), self.base.read())
+        loaded.read()
+        self.assertEqual(len(calls), 1)
+        restored = pickle.loads(pickle.dumps(
+            Dataset.from_artifact(metadata, loader=loader)))
+        pd.testing.assert_frame_equal(restored.read(), self.base.read())
+
+    def test_compaction(self):
+        version = self.base
+        for i in range(MAX_DELTA_DEPTH + 1):
+            version = version.append(self.rows(i, 1), version=str(i + 2))
+        self.assertIsNone(version.delta)
+        self.assertEqual(len(version.read()), 1000 + MAX_DELTA_DEPTH + 1)
+        self.assertEqual(version.profile["num_rows"],
+                         1000 + MAX_DELTA_DEPTH + 1)
+        self.assertIn("statistics", version.profile)
+
+    def test_missing_integers_appended(self):
+        rows = self.rows(0, 3).astype({"n": object})
+        rows.loc[1, "n"] = None
+        version = self.base.append(rows, version="2")
+        appended = version.read_delta()
+        self.assertTrue(np.isnan(appended["n"][1]))
+        self.assertEqual(appended["n"][2], self.frame["n"][2])
+        self.assertEqual(len(version.read()), 1003)
+
+    def test_column_projection(self):
+        columns = ["label", "x"]
+        pd.testing.assert_frame_equal(self.base.read(columns=columns),
+                                      self.base.read()[columns])
+        version = self.base.append(self.rows(0, 10), version="2",
+                                   deleted=[1])
+        pd.testing.assert_frame_equal(version.read(columns=columns),
+                                      version.read()[columns])
+        self.assertEqual(list(version.read_delta(["n"]).columns), ["n"])
+        with self.assertRaises(ValueError):
+            self.base.read(columns=["missing"])
+
+    def test_stream_to_storage(self):
+        storage = LocalStorage(tempfile.mkdtemp())
+        self.base.write_to(storage, self.base.read())
+        chunks = list(self.base.read_from(storage, chunksize=300))
+        self.assertEqual([len(chunk) for chunk in chunks],
+                         [300, 300, 300, 100])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True),
+                                      self.base.read())
+
+    def test_pickled_in_full(self):
+        version = self.base.append(self.rows(0, 10), version="2")
+        restored = pickle.loads(pickle.dumps(version))
+        self.assertIsNone(restored.delta)
+        pd.testing.assert_frame_equal(restored.read(), version.read())
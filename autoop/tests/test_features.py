@@ -2,6 +2,7 @@ import unittest
 from sklearn.datasets import load_iris, fetch_openml
 import pandas as pd
 
+from autoop.core.ml.columnar import profile
 from autoop.core.ml.dataset import Dataset
 from autoop.core.ml.feature import Feature
 from autoop.functional.feature import detect_feature_types
@@ -71,3 +72,23 @@ class TestFeatures(unittest.TestCase):
             self.assertEqual(detected_feature.type, "numerical")
         for detected_feature in filter(lambda x: x.name in categorical_columns, features):
             self.assertEqual(detected_feature.type, "categorical")
+
+    def test_detect_features_from_profile(self):
+        df = pd.DataFrame({"size": [1.5, 2.0, None], "count": [1, 2, 3],
+                           "color": ["red", None, "blue"],
+                           "flag": [True, False, True]})
+        dataset = Dataset.from_dataframe(
+            name="profiled",
+            asset_path="profiled.csv",
+            data=df,
+        )
+        expected = detect_feature_types(dataset)
+        # the profile is read instead of the data
+        profiled = Dataset(name="profiled", asset_path="profiled.csv",
+                           metadata={"profile": profile(dataset.read())})
+        features = detect_feature_types(profiled)
+        self.assertEqual([(f.name, f.type) for f in features],
+                         [(f.name, f.type) for f in expected])
+        self.assertEqual([f.type for f in features],
+                         ["numerical", "numerical", "categorical",
+                          "numerical"])
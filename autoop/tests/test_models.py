@@ -0,0 +1,360 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from autoop.core.ml.design_matrix import expand_columns
+from autoop.core.ml.model import Model, serialization
+from autoop.core.ml.model.classification import (
+    KNN, Neural_network_classifier, Random_forest
+)
+from autoop.core.ml.model.regression import (
+    GradientBoostingR, Lasso, MultipleLinearRegression
+)
+from autoop.core.ml.model.tree_ensemble import predict_trees
+
+class TestModelSerialization(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(200, 4))
+        self.y_regression = self.X @ rng.normal(size=4)
+        self.y_labels = np.array(["a", "b", "c"])[rng.integers(0, 3, 200)]
+        self.y_one_hot = np.eye(3)[rng.integers(0, 3, 200)]
+
+    def assertRoundTrip(self, model, y):
+        model.fit(self.X, y)
+        restored = serialization.loads(serialization.dumps(model))
+        self.assertIsInstance(restored, type(model))
+        expected = model.predict(self.X)
+        predicted = restored.predict(self.X)
+        if expected.dtype.kind in "fc":
+            np.testing.assert_allclose(predicted, expected)
+        else:
+            np.testing.assert_array_equal(predicted, expected)
+
+    def test_regression_models(self):
+        for model in [MultipleLinearRegression(), Lasso(),
+                      GradientBoostingR(),
+                      GradientBoostingR(engine="histogram")]:
+            self.assertRoundTrip(model, self.y_regression)
+
+    def test_classification_models(self):
+        for y in [self.y_labels, self.y_one_hot]:
+            for model in [KNN(k=5), Random_forest(),
+                          Neural_network_classifier()]:
+                self.assertRoundTrip(model, y)
+
+    def test_hyperparameters(self):
+        restored = serialization.loads(serialization.dumps(KNN(k=7)))
+        self.assertEqual(restored.hyperparameters["k"], 7)
+
+    def test_array_hyperparameters(self):
+        weights = np.arange(3.0)
+        with mock.patch.object(KNN, "hyperparameters",
+                               new_callable=mock.PropertyMock,
+                               return_value={"k": 7, "weights": weights}):
+            data = serialization.dumps(KNN(k=7))
+        header, start = serialization._read_header(data)
+        layout = header["arrays"]["hyper.weights"]
+        stored = np.frombuffer(data, dtype=layout["dtype"], count=3,
+                               offset=start + layout["offset"])
+        np.testing.assert_array_equal(stored, weights)
+
+    def test_memory_mapped_file(self):
+        model = MultipleLinearRegression()
+        model.fit(self.X, self.y_regression)
+        path = os.path.join(tempfile.mkdtemp(), "model.bin")
+        serialization.save(model, path)
+        restored = serialization.load(path)
+        np.testing.assert_allclose(restored.predict(self.X),
+                                   model.predict(self.X))
+
+    def test_artifact(self):
+        model = Lasso()
+        model.fit(self.X, self.y_regression)
+        restored = Model.from_artifact(model.to_artifact(name="lasso"))
+        np.testing.assert_allclose(restored.predict(self.X),
+                                   model.predict(self.X))
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            serialization.loads(b"not a model")
+
+
+class TestKNN(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(3, 4)) * 10
+        self.labels = rng.integers(0, 3, 300)
+        self.X = centers[self.labels] + rng.normal(size=(300, 4))
+
+    def test_backends_agree(self):
+        expected = KNN(k=5, algorithm="brute")
+        expected.fit(self.X, self.labels)
+        expected = expected.predict(self.X)
+        for algorithm in ["kd_tree", "ball_tree", "approximate"]:
+            model = KNN(k=5, algorithm=algorithm, n_jobs=2)
+            model.fit(self.X, self.labels)
+            self.assertGreater(
+                np.mean(model.predict(self.X) == expected), 0.95)
+
+    def test_approximate_multi_output(self):
+        one_hot = np.eye(3)[self.labels]
+        model = KNN(k=5, algorithm="approximate")
+        model.fit(self.X, one_hot)
+        predictions = model.predict(self.X)
+        self.assertEqual(predictions.shape, one_hot.shape)
+        self.assertGreater(np.mean(predictions == one_hot), 0.95)
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            KNN(algorithm="unknown")
+
+    def test_serialization(self):
+        model = KNN(k=5, algorithm="approximate", n_trees=4)
+        model.fit(self.X, self.labels)
+        restored = serialization.loads(serialization.dumps(model))
+        self.assertEqual(restored.hyperparameters, model.hyperparameters)
+        self.assertGreater(
+            np.mean(restored.predict(self.X) == self.labels), 0.95)
+
+
+class TestModelResources(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(300, 4))
+        self.y_regression = self.X @ rng.normal(size=4)
+        self.y_labels = rng.integers(0, 3, 300)
+
+    def test_defaults(self):
+        self.assertEqual(
+            Lasso().resources,
+            {"n_jobs": None, "memory_budget": None, "random_state": None}
+        )
+
+    def test_passed_to_estimator(self):
+        model = Random_forest(n_jobs=2, random_state=3)
+        self.assertEqual(model._rfc.n_jobs, 2)
+        self.assertEqual(model._rfc.random_state, 3)
+        self.assertEqual(Lasso(n_jobs=-1)._ls.n_jobs, -1)
+
+    def test_random_state_reproducible(self):
+        predictions = []
+        for _ in range(2):
+            model = Neural_network_classifier(random_state=0)
+            model.fit(self.X, self.y_labels)
+            predictions.append(model.predict(self.X))
+        np.testing.assert_array_equal(*predictions)
+
+    def test_serialized_with_model(self):
+        model = GradientBoostingR(engine="histogram", n_jobs=2,
+                                  memory_budget=64, random_state=0)
+        restored = serialization.loads(serialization.dumps(model))
+        self.assertEqual(restored.hyperparameters, model.hyperparameters)
+
+    def test_resource_limits(self):
+        model = KNN(n_jobs=1, memory_budget=16)
+        model.fit(self.X, self.y_labels)
+        predictions = model.predict(self.X)
+        self.assertEqual(predictions.shape, self.y_labels.shape)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            GradientBoostingR(engine="unknown")
+
+
+class TestContinueFit(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(600, 4))
+        self.y_regression = np.sin(self.X[:, 0]) * 3 + self.X[:, 1] ** 2
+        self.y_labels = np.array(["a", "b", "c", "d"])[
+            (self.X[:, 0] > 0) * 1 + (self.X[:, 1] > 0) * 2]
+
+    def error(self, model):
+        predictions = model.predict(self.X)
+        return np.mean((predictions - self.y_regression) ** 2)
+
+    def test_boosting_adds_stages(self):
+        for engine in ["exact", "histogram"]:
+            model = GradientBoostingR(engine=engine, max_iter=10,
+                                      random_state=0)
+            model.fit(self.X, self.y_regression)
+            before = self.error(model)
+            restored = serialization.loads(serialization.dumps(model))
+            restored.continue_fit(self.X, self.y_regression, 20)
+            self.assertEqual(len(restored.parameters["roots"]), 30)
+            self.assertLess(self.error(restored), before)
+
+    def test_forest_learns_new_classes(self):
+        seen = self.y_labels != "d"
+        model = Random_forest(random_state=0)
+        model.fit(self.X[seen], self.y_labels[seen])
+        model.continue_fit(self.X, self.y_labels, 300)
+        self.assertEqual(len(model.parameters["roots"]), 400)
+        self.assertIn("d", model.predict(self.X))
+
+    def test_forest_grows_new_trees(self):
+        model = Random_forest(random_state=0)
+        model.fit(self.X, self.y_labels)
+        model.continue_fit(self.X, self.y_labels, 100)
+        params = model.parameters
+        split = params["roots"][100]
+        first = params["threshold"][:split]
+        second = params["threshold"][split:]
+        self.assertFalse(first.shape == second.shape
+                         and np.array_equal(first, second))
+        for batch in [self.X[:10], self.X]:
+            accuracy = np.mean(model.predict(batch)
+                               == self.y_labels[:len(batch)])
+            self.assertGreater(accuracy, 0.95)
+
+    def test_network_continues_from_restored_weights(self):
+        model = Neural_network_classifier(max_iter=3, random_state=0)
+        model.fit(self.X, self.y_labels)
+        self.assertEqual(model.parameters["label_type"], "multiclass")
+        before = np.mean(model.predict(self.X) == self.y_labels)
+        restored = serialization.loads(serialization.dumps(model))
+        restored.continue_fit(self.X, self.y_labels, 100)
+        after = np.mean(restored.predict(self.X) == self.y_labels)
+        self.assertGreater(after, before)
+
+    def test_early_stopping(self):
+        model = GradientBoostingR(engine="histogram", max_iter=1000,
+                                  early_stopping=True, random_state=0)
+        model.fit(self.X, self.y_regression)
+        self.assertLess(len(model.parameters["roots"]), 1000)
+        network = Neural_network_classifier(
+            max_iter=1000, early_stopping=True, random_state=0)
+        network.fit(self.X, self.y_labels)
+        self.assertLess(network._logr.n_iter_, 1000)
+
+    def test_knn_appends_rows(self):
+        model = KNN(k=1)
+        model.fit(self.X[:300], self.y_labels[:300])
+        model.continue_fit(self.X[300:], self.y_labels[300:])
+        self.assertEqual(model.parameters["observations"].shape[0], 600)
+        np.testing.assert_array_equal(model.predict(self.X), self.y_labels)
+
+    def change(self, rng):
+        # a new third column, the others rescaled as by partial_fit
+        return {"positions": np.array([0, 1, 3, 4]),
+                "scale": rng.uniform(0.5, 2, 4),
+                "shift": rng.normal(size=4), "n_columns": 5}
+
+    def test_linear_regression_adapts_exactly(self):
+        rng = np.random.default_rng(1)
+        inputs = self.change(rng)
+        outputs = {"positions": np.array([0]), "scale": np.array([0.5]),
+                   "shift": np.array([2.0]), "n_columns": 1}
+        y = self.y_regression.reshape(-1, 1)
+        X = expand_columns(self.X, inputs)
+        X[300:, 2] = rng.normal(size=300)
+        Y = expand_columns(y, outputs)
+        model = MultipleLinearRegression()
+        model.fit(self.X[:300], y[:300])
+        before = model.predict(self.X[:300])
+        model.adapt(inputs, outputs)
+        np.testing.assert_allclose(model.predict(X[:300]), before * 0.5 + 2)
+        model.continue_fit(X[300:], Y[300:])
+        full = MultipleLinearRegression()
+        full.fit(X, Y)
+        np.testing.assert_allclose(model.predict(X), full.predict(X),
+                                   atol=1e-8)
+
+    def test_classifiers_adapt(self):
+        rng = np.random.default_rng(1)
+        inputs = self.change(rng)
+        labels = np.eye(4)[np.searchsorted(["a", "b", "c", "d"],
+                                           self.y_labels)]
+        same = {"positions": np.arange(4), "scale": np.ones(4),
+                "shift": np.zeros(4), "n_columns": 4}
+        X = expand_columns(self.X, inputs)
+        model = Neural_network_classifier(max_iter=20, random_state=0)
+        model.fit(self.X, labels)
+        before = model.predict(self.X)
+        model.adapt(inputs, same)
+        np.testing.assert_array_equal(model.predict(X), before)
+        model.continue_fit(X, labels, 5)
+        with self.assertRaises(NotImplementedError):
+            model.adapt(same, {**same, "n_columns": 5})
+        # rescaled columns move the neighbors, KNN is rebuilt on them
+        knn = KNN(k=3)
+        knn.fit(self.X, labels)
+        knn.adapt(inputs, same)
+        np.testing.assert_allclose(knn.parameters["observations"], X)
+        with self.assertRaises(NotImplementedError):
+            Lasso().adapt(inputs, same)
+
+    def test_linear_regression_continues_on_integers(self):
+        X = np.round(self.X * 10).astype(np.int64)
+        y = X @ np.array([1.5, -2.0, 0.5, 3.0]) + 4
+        model = MultipleLinearRegression()
+        model.fit(X[:300].astype(np.float64), y[:300])
+        model.continue_fit(X[300:], y[300:])
+        parameters = model.parameters["optimal_parameters"]
+        self.assertEqual(parameters.dtype, np.float64)
+        np.testing.assert_allclose(parameters, [1.5, -2.0, 0.5, 3.0, 4],
+                                   atol=1e-8)
+
+    def test_unfitted_model_fits(self):
+        model = Lasso()
+        model.continue_fit(self.X, self.y_regression)
+        self.assertEqual(model.predict(self.X).shape, (600,))
+
+
+class TestLeanInference(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(400, 5))
+        self.y_regression = self.X @ rng.normal(size=5) + self.X[:, 0] ** 2
+        self.y_labels = np.array(["a", "b", "c"])[
+            (self.X[:, 0] > 0) * 1 + (self.X[:, 1] > 1) * 1]
+
+    def test_linear_models(self):
+        model = Lasso()
+        model.fit(self.X, self.y_regression)
+        np.testing.assert_allclose(model.predict(self.X[:1]),
+                                   model._ls.predict(self.X[:1]))
+        model = MultipleLinearRegression()
+        model.fit(self.X, self.y_regression)
+        np.testing.assert_allclose(
+            model.predict(self.X),
+            model._x_bar(self.X) @ model.parameters["optimal_parameters"]
+        )
+
+    def test_linear_regression_integer_input(self):
+        X = np.arange(20).reshape(10, 2) % 7
+        y = X @ np.array([2.0, -1.0]) + 3
+        model = MultipleLinearRegression()
+        model.fit(X, y)
+        np.testing.assert_allclose(model.predict(X), y)
+
+    def test_compiled_trees_match_estimator(self):
+        for batch in [1, 32]:
+            model = Random_forest(random_state=0)
+            model.fit(self.X, self.y_labels)
+            np.testing.assert_array_equal(
+                model.predict(self.X[:batch]),
+                model._rfc.predict(self.X[:batch]))
+            for engine in ["exact", "histogram"]:
+                model = GradientBoostingR(engine=engine, random_state=0)
+                model.fit(self.X, self.y_regression)
+                np.testing.assert_allclose(
+                    model.predict(self.X[:batch]),
+                    model._gbr.predict(self.X[:batch]))
+
+    def test_small_chunks(self):
+        model = GradientBoostingR(random_state=0)
+        model.fit(self.X, self.y_regression)
+        trees = model.parameters
+        np.testing.assert_allclose(
+            predict_trees(trees, self.X.astype(np.float32), chunk_size=7),
+            predict_trees(trees, self.X.astype(np.float32)))
@@ -1,13 +1,31 @@
 from sklearn.datasets import fetch_openml
 import unittest
+import numpy as np
 import pandas as pd
+from sklearn.metrics import r2_score
 
 from autoop.core.ml.pipeline import Pipeline
+from autoop.core.ml.design_matrix import (
+    DesignMatrixBuilder, expand_columns
+)
 from autoop.core.ml.dataset import Dataset
 from autoop.core.ml.feature import Feature
 from autoop.functional.feature import detect_feature_types
-from autoop.core.ml.model.regression import MultipleLinearRegression
-from autoop.core.ml.metric import MeanSquaredError
+from autoop.core.ml.model.regression import MultipleLinearRegression, Lasso
+from autoop.core.ml.metric import MeanSquaredError, get_metric
+from autoop.core.ml.split import Shuffled
+
+
+def synthetic_frame(rows=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "a": rng.normal(size=rows),
+        "b": rng.normal(size=rows),
+        "c": rng.choice(["x", "y", "z"], rows),
+    })
+    df["target"] = 2 * df["a"] - df["b"] + rng.normal(size=rows) * 0.1
+    return df
+
 
 class TestPipeline(unittest.TestCase):
 
@@ -43,8 +61,8 @@ class TestPipeline(unittest.TestCase):
     def test_split_data(self):
         self.pipeline._preprocess_features()
         self.pipeline._split_data()
-        self.assertEqual(self.pipeline._train_X[0].shape[0], int(0.8 * self.ds_size))
-        self.assertEqual(self.pipeline._test_X[0].shape[0], self.ds_size - int(0.8 * self.ds_size))
+        self.assertEqual(self.pipeline._train_X.shape[0], int(0.8 * self.ds_size))
+        self.assertEqual(self.pipeline._test_X.shape[0], self.ds_size - int(0.8 * self.ds_size))
 
     def test_train(self):
         self.pipeline._preprocess_features()
@@ -59,4 +77,234 @@ class TestPipeline(unittest.TestCase):
         self.pipeline._evaluate()
         self.assertIsNotNone(self.pipeline._predictions)
         self.assertIsNotNone(self.pipeline._metrics_results)
-        self.assertEqual(len(self.pipeline._metrics_results), 1)
\ No newline at end of file
+        self.assertEqual(len(self.pipeline._metrics_results), 1)
+
+class TestPipelineDtype(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.dataset = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv",
+            data=synthetic_frame())
+        self.features = detect_feature_types(self.dataset)
+
+    def make_pipeline(self, dtype):
+        return Pipeline(
+            dataset=self.dataset,
+            model=MultipleLinearRegression(),
+            input_features=[f for f in self.features if f.name != "target"],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError(), get_metric("r-squared")],
+            dtype=dtype,
+        )
+
+    def test_float32_data_path(self):
+        pipeline = self.make_pipeline("float32")
+        results = pipeline.execute()
+        self.assertEqual(pipeline._train_X.dtype, np.float32)
+        self.assertEqual(pipeline._train_y.dtype, np.float32)
+        self.assertEqual(results["test_predictions"].dtype, np.float32)
+
+    def test_metrics_match_float64(self):
+        single = self.make_pipeline("float32").execute()["test_metrics"]
+        double = self.make_pipeline("float64").execute()["test_metrics"]
+        for (_, a), (_, b) in zip(single, double):
+            self.assertAlmostEqual(float(a), float(b), places=4)
+
+    def test_metrics_compare_rows(self):
+        pipeline = self.make_pipeline("float64")
+        results = pipeline.execute()
+        expected = r2_score(pipeline._test_y, results["test_predictions"])
+        self.assertAlmostEqual(results["test_metrics"][1][1], expected)
+
+    def test_unknown_dtype(self):
+        with self.assertRaises(ValueError):
+            self.make_pipeline("float16")
+
+
+class TestPipelineRefresh(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.data = synthetic_frame()
+        self.base = Dataset.from_dataframe(name="synthetic", version="1",
+                                           asset_path="synthetic.csv",
+                                           data=self.data.iloc[:150])
+
+    def make_pipeline(self, model):
+        pipeline = Pipeline(
+            dataset=self.base,
+            model=model,
+            input_features=[Feature(name="a", type="numerical"),
+                            Feature(name="b", type="numerical"),
+                            Feature(name="c", type="categorical")],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+        )
+        pipeline.execute()
+        return pipeline
+
+    def append(self, categories):
+        appended = self.data.iloc[150:].reset_index(drop=True)
+        appended["c"] = appended["c"].astype(object)
+        appended.loc[:len(categories) - 1, "c"] = categories
+        return self.base.append(appended, version="2")
+
+    def test_same_version(self):
+        pipeline = self.make_pipeline(MultipleLinearRegression())
+        with self.assertRaises(ValueError):
+            pipeline.refresh(self.base)
+
+    def test_equals_full_fit(self):
+        version = self.append(["zz"] * 50)
+        pipeline = self.make_pipeline(MultipleLinearRegression())
+        results = pipeline.refresh(version)
+        self.assertEqual(results["mode"], "incremental")
+        self.assertEqual(results["rows"], 50)
+        self.assertEqual(len(results["delta_predictions"]), 50)
+        # the same as fitting on the training rows and the new rows
+        builder = DesignMatrixBuilder(pipeline._input_features).fit(
+            version.read())
+        self.assertEqual(pipeline.columns, builder.columns)
+        target = DesignMatrixBuilder([pipeline._target_feature])
+        X = builder.transform(version.read())
+        Y = target.build(version.read())
+        rows = np.r_[0:120, 150:200]
+        full = MultipleLinearRegression()
+        full.fit(X[rows], Y[rows])
+        np.testing.assert_allclose(pipeline.model.predict(X),
+                                   full.predict(X), atol=1e-8)
+
+    def test_new_category_and_missing_value(self):
+        version = self.append(["zz", np.nan, "w"])
+        pipeline = self.make_pipeline(MultipleLinearRegression())
+        results = pipeline.refresh(version)
+        self.assertEqual(results["mode"], "incremental")
+        self.assertEqual(pipeline.columns[-3:], ["c=w", "c=zz", "c=nan"])
+        input_builder, _ = pipeline._builders
+        X = input_builder.transform(version.read_delta())
+        self.assertEqual(X[:3, -3:].tolist(),
+                         [[0, 1, 0], [0, 0, 1], [1, 0, 0]])
+        self.assertTrue(np.isfinite(pipeline.model.predict(X)).all())
+
+    def test_resplit_after_refresh(self):
+        version = self.append(["x"])
+        pipeline = self.make_pipeline(MultipleLinearRegression())
+        pipeline.refresh(version)
+        results = pipeline.resplit(Shuffled(random_state=0))
+        self.assertEqual(pipeline._input_matrix.shape[0], 200)
+        self.assertEqual(len(pipeline._train_rows), 160)
+        self.assertEqual(len(results["test_predictions"]), 40)
+
+    def test_model_without_adapt_refits(self):
+        pipeline = self.make_pipeline(Lasso())
+        self.assertEqual(pipeline.refresh(self.append(["x"]))["mode"],
+                         "refit")
+
+
+class TestDesignMatrix(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "b": rng.normal(size=100),
+            "a": rng.normal(size=100),
+            "c": rng.choice(["x", "y", "z"], 100),
+            "target": rng.normal(size=100),
+        })
+        self.features = [Feature(name="b", type="numerical"),
+                         Feature(name="c", type="categorical"),
+                         Feature(name="a", type="numerical")]
+
+    def test_layout(self):
+        builder = DesignMatrixBuilder(self.features)
+        matrix = builder.build(self.df)
+        self.assertEqual(matrix.shape, (100, 5))
+        self.assertEqual(builder.columns, ["a", "b", "c=x", "c=y", "c=z"])
+        self.assertEqual(builder.column_map["c"], slice(2, 5))
+        expected = (self.df["a"] - self.df["a"].mean()) / self.df["a"].std(
+            ddof=0)
+        np.testing.assert_allclose(matrix[:, 0], expected)
+        one_hot = pd.get_dummies(self.df["c"]).to_numpy(dtype=float)
+        np.testing.assert_array_equal(matrix[:, 2:], one_hot)
+
+    def test_order_and_rows(self):
+        builder = DesignMatrixBuilder(self.features, np.float32, order="F")
+        full = builder.build(self.df)
+        rows = np.array([5, 0, 7])
+        matrix = builder.transform(self.df, rows)
+        self.assertTrue(matrix.flags.f_contiguous)
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_array_equal(matrix, full[rows])
+        with self.assertRaises(ValueError):
+            DesignMatrixBuilder(self.features, order="K")
+
+    def test_unknown_category(self):
+        builder = DesignMatrixBuilder(self.features).fit(self.df)
+        new = self.df.head(2).assign(c=["x", "w"])
+        matrix = builder.transform(new)
+        np.testing.assert_array_equal(matrix[:, 2:], [[1, 0, 0], [0, 0, 0]])
+
+    def test_partial_fit(self):
+        builder = DesignMatrixBuilder(self.features).fit(self.df[:60])
+        old = builder.transform(self.df[:60])
+        new = self.df[60:].assign(c=np.where(self.df["c"][60:] == "x",
+                                             "w", self.df["c"][60:]))
+        change = builder.partial_fit(new)
+        self.assertEqual(builder.columns,
+                         ["a", "b", "c=x", "c=y", "c=z", "c=w"])
+        np.testing.assert_allclose(expand_columns(old, change),
+                                   builder.transform(self.df[:60]))
+        full = DesignMatrixBuilder(self.features).fit(
+            pd.concat([self.df[:60], new]))
+        np.testing.assert_allclose(builder.transform(new)[:, :2],
+                                   full.transform(new)[:, :2])
+
+    def test_partial_fit_missing_value(self):
+        builder = DesignMatrixBuilder(self.features).fit(self.df[:60])
+        new = self.df[60:].astype({"c": object})
+        new.loc[[60, 61, 62], "c"] = ["w", np.nan, "v"]
+        builder.partial_fit(new)
+        self.assertEqual(builder.columns[2:],
+                         ["c=x", "c=y", "c=z", "c=v", "c=w", "c=nan"])
+        np.testing.assert_array_equal(
+            builder.transform(new.loc[[60, 61, 62]])[:, 5:],
+            [[0, 1, 0], [0, 0, 1], [1, 0, 0]])
+
+    def test_categorical_columns(self):
+        builder = DesignMatrixBuilder(self.features)
+        expected = builder.build(self.df)
+        compact = self.df.astype({"c": "category", "a": "Float64"})
+        rows = np.array([3, 1, 2])
+        np.testing.assert_array_equal(
+            DesignMatrixBuilder(self.features).build(compact, rows),
+            expected[rows])
+        self.assertEqual(builder.fit(compact).columns,
+                         ["a", "b", "c=x", "c=y", "c=z"])
+        # missing values are the NaN category in either dtype
+        df = self.df.astype({"c": object})
+        df.loc[[0, 4], "c"] = np.nan
+        expected = DesignMatrixBuilder(self.features).build(df)
+        self.assertEqual(expected[[0, 4], 5].tolist(), [1, 1])
+        compact = df.astype({"c": "category"})
+        builder = DesignMatrixBuilder(self.features)
+        np.testing.assert_array_equal(builder.build(compact), expected)
+        self.assertEqual(builder.columns[-1], "c=nan")
+        np.testing.assert_array_equal(builder.transform(df), expected)
+
+    def test_split_views(self):
+        dataset = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv", data=self.df)
+        pipeline = Pipeline(
+            dataset=dataset,
+            model=Lasso(),
+            input_features=self.features,
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+        )
+        pipeline._preprocess_features()
+        pipeline._split_data()
+        self.assertTrue(pipeline._input_matrix.flags.f_contiguous)
+        self.assertTrue(np.shares_memory(pipeline._train_X,
+                                         pipeline._input_matrix))
+        self.assertTrue(np.shares_memory(pipeline._test_X,
+                                         pipeline._input_matrix))
+        self.assertEqual(pipeline.column_map["c"], slice(2, 5))
@@ -0,0 +1,170 @@
+import io
+import os
+import tempfile
+import unittest
+from functools import partial
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import Accuracy, MeanSquaredError
+from autoop.core.ml.model.classification import (
+    KNN, Neural_network_classifier, Random_forest
+)
+from autoop.core.ml.model.regression import (
+    GradientBoostingR, Lasso, MultipleLinearRegression
+)
+from autoop.core.ml.pipeline import Pipeline
+from autoop.core.ml.preprocessing_cache import PreprocessingCache
+from autoop.core.storage import LocalStorage
+
+
+class TestPreprocessingCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "a": rng.normal(size=120),
+            "c": rng.choice(["x", "y"], 120),
+        })
+        self.df["target"] = self.df["a"] + rng.normal(size=120) * 0.1
+        self.df["label"] = np.where(self.df["a"] > 0, "high", "low")
+        self.dataset = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv", data=self.df)
+        self.inputs = [Feature(name="a", type="numerical"),
+                       Feature(name="c", type="categorical")]
+
+    def make_pipeline(self, model, cache, dataset=None, target="target"):
+        categorical = target == "label"
+        return Pipeline(
+            dataset=self.dataset if dataset is None else dataset,
+            model=model,
+            input_features=self.inputs,
+            target_feature=Feature(
+                name=target,
+                type="categorical" if categorical else "numerical"),
+            metrics=[Accuracy() if categorical else MeanSquaredError()],
+            cache=cache,
+        )
+
+    def test_models_share_preprocessing(self):
+        cache = PreprocessingCache()
+        first = self.make_pipeline(MultipleLinearRegression(), cache)
+        first.execute()
+        second = self.make_pipeline(GradientBoostingR(), cache)
+        second.execute()
+        self.assertIs(first._input_matrix, second._input_matrix)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+        self.assertFalse(second._input_matrix.flags.writeable)
+        # a column major model gets its own layout
+        self.make_pipeline(Lasso(), cache).execute()
+        self.assertEqual(cache.stats["misses"], 2)
+
+    def test_read_only_arrays_train_every_model(self):
+        cache = PreprocessingCache()
+        for model in [MultipleLinearRegression(), Lasso(),
+                      GradientBoostingR()]:
+            self.make_pipeline(model, cache).execute()
+        for model in [KNN(), Random_forest(),
+                      Neural_network_classifier(max_iter=20)]:
+            self.make_pipeline(model, cache, target="label").execute()
+        self.assertEqual(cache.stats["misses"], 3)
+
+    def test_changed_dataset_misses(self):
+        cache = PreprocessingCache()
+        self.make_pipeline(MultipleLinearRegression(), cache).execute()
+        changed = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv",
+            data=self.df.head(100))
+        pipeline = self.make_pipeline(MultipleLinearRegression(), cache,
+                                      dataset=changed)
+        pipeline.execute()
+        self.assertEqual(cache.stats["misses"], 2)
+        self.assertEqual(pipeline._input_matrix.shape[0], 100)
+
+    def test_hit_does_not_load_dataset(self):
+        cache = PreprocessingCache()
+        self.make_pipeline(MultipleLinearRegression(), cache).execute()
+        loader = mock.Mock(return_value=self.dataset.data)
+        registered = Dataset(
+            name="synthetic", asset_path="synthetic.csv", version="1_0_0",
+            metadata={"content_hash": self.dataset.content_hash},
+            loader=loader)
+        self.make_pipeline(GradientBoostingR(), cache,
+                           dataset=registered).execute()
+        self.assertEqual(cache.stats["hits"], 1)
+        loader.assert_not_called()
+
+    def test_reuploaded_dataset_misses(self):
+        cache = PreprocessingCache()
+        with tempfile.TemporaryDirectory() as path:
+            storage = LocalStorage(path)
+            for rows in [10, 50]:
+                csv = self.df.head(rows).to_csv(index=False).encode()
+                uploaded = Dataset.ingest(io.BytesIO(csv), name="synthetic",
+                                          asset_path="synthetic",
+                                          storage=storage)
+                dataset = Dataset.from_artifact(
+                    uploaded, loader=partial(storage.load, "synthetic"))
+                pipeline = self.make_pipeline(MultipleLinearRegression(),
+                                              cache, dataset=dataset)
+                pipeline.execute()
+                self.assertEqual(pipeline._input_matrix.shape[0], rows)
+                storage.delete("synthetic")
+        self.assertEqual(cache.stats["misses"], 2)
+        self.assertEqual(cache.stats["hits"], 0)
+
+    def test_unknown_content_is_not_cached(self):
+        cache = PreprocessingCache()
+        unhashed = Dataset(name="synthetic", asset_path="synthetic.csv",
+                           version="1_0_0",
+                           loader=lambda: self.dataset.data)
+        self.make_pipeline(MultipleLinearRegression(), cache,
+                           dataset=unhashed).execute()
+        self.assertEqual(cache.stats["entries"], 0)
+        self.assertEqual(cache.stats["misses"], 0)
+
+    def test_eviction_spills_to_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = PreprocessingCache(max_bytes=1, spill_path=path)
+            first = self.make_pipeline(MultipleLinearRegression(), cache)
+            first.execute()
+            expected = np.array(first._input_matrix)
+            self.make_pipeline(Lasso(), cache).execute()
+            self.assertEqual(cache.stats["entries"], 1)
+
+            again = self.make_pipeline(MultipleLinearRegression(), cache)
+            again.execute()
+            self.assertEqual(cache.stats["spill_hits"], 1)
+            self.assertIsInstance(again._input_matrix, np.memmap)
+            np.testing.assert_array_equal(again._input_matrix, expected)
+            self.assertEqual(again.column_map, first.column_map)
+
+    def test_spill_budget(self):
+        def entry(value):
+            return {"input_matrix": np.full((100, 2), value),
+                    "output_vector": np.full(100, value), "layout": value}
+
+        with tempfile.TemporaryDirectory() as path:
+            cache = PreprocessingCache(max_bytes=1, spill_path=path,
+                                       max_spill_bytes=5000)
+            for key in ["a", "b", "c"]:
+                cache.put(key, entry(1.0))
+            # one spilled entry fits the disk budget, "a" was deleted
+            self.assertEqual(cache.stats["spilled_entries"], 1)
+            self.assertEqual(sorted(os.listdir(path)), ["b"])
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get("b")["layout"], 1.0)
+            # reading "b" back evicted "c" to disk, in its place
+            self.assertEqual(sorted(os.listdir(path)), ["c"])
+
+            reopened = PreprocessingCache(spill_path=path)
+            self.assertEqual(reopened.stats["spilled_entries"], 1)
+            self.assertEqual(reopened.get("c")["layout"], 1.0)
+            reopened.clear(disk=True)
+            self.assertEqual(os.listdir(path), [])
+            self.assertIsNone(reopened.get("c"))
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import MeanSquaredError
+from autoop.core.ml.model.regression import MultipleLinearRegression
+from autoop.core.ml.pipeline import Pipeline
+from autoop.core.ml.profiler import StageProfiler, array_sizes
+
+
+class TestStageProfiler(unittest.TestCase):
+
+    def test_nested_stages_and_memory(self):
+        profiler = StageProfiler(trace_memory=True, profile_calls=True)
+        with profiler.stage("outer"):
+            with profiler.stage("inner") as record:
+                array = np.ones(1_000_000)
+                record["arrays"] = array_sizes(array=array)
+            del array
+        report = profiler.report
+        names = [stage["name"] for stage in report["stages"]]
+        self.assertEqual(names, ["outer/inner", "outer"])
+        inner, outer = report["stages"]
+        self.assertGreaterEqual(inner["peak_memory"], 8_000_000)
+        self.assertGreaterEqual(outer["peak_memory"], inner["peak_memory"])
+        self.assertEqual(inner["arrays"]["array"]["bytes"], 8_000_000)
+        self.assertIn("calls", outer)
+        self.assertEqual(report["total_wall_time"], outer["wall_time"])
+
+    def test_pipeline_profile(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"a": rng.normal(size=100)})
+        df["target"] = df["a"] * 2
+        pipeline = Pipeline(
+            dataset=Dataset.from_dataframe(
+                name="synthetic", asset_path="synthetic.csv", data=df),
+            model=MultipleLinearRegression(),
+            input_features=[Feature(name="a", type="numerical")],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+        )
+        profile = pipeline.execute()["profile"]
+        names = [stage["name"] for stage in profile["stages"]]
+        self.assertEqual(names, [
+            "preprocess_features/read_dataset",
+            "preprocess_features/build_design_matrix",
+            "preprocess_features", "split_data", "train", "evaluate",
+            "predict_train",
+        ])
+        self.assertNotIn("peak_memory", profile["stages"][0])
+        with tempfile.TemporaryDirectory() as path:
+            save_path = os.path.join(path, "pipeline.pkl")
+            pipeline.save("synthetic", "1.0", save_path)
+            self.assertEqual(Pipeline.load(save_path).profile, profile)
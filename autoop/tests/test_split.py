@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import MeanSquaredError
+from autoop.core.ml.model.regression import MultipleLinearRegression
+from autoop.core.ml.pipeline import Pipeline
+from autoop.core.ml.split import (
+    SPLITS, Grouped, Shuffled, Stratified, TimeOrdered, get_split
+)
+
+
+class TestSplit(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "x": rng.normal(size=200),
+            "group": rng.integers(0, 20, size=200),
+            "time": rng.permutation(200),
+            "label": np.repeat(["a", "b", "c", "d"], [120, 50, 20, 10]),
+        })
+        self.df["target"] = 3 * self.df["x"] + rng.normal(size=200) * 0.1
+
+    def test_partitions(self):
+        for name in SPLITS:
+            split = get_split(name, column="group", random_state=0)
+            train, test = split.indices(self.df, "label", 0.8)
+            rows = np.concatenate([train, test])
+            np.testing.assert_array_equal(np.sort(rows), np.arange(200))
+        with self.assertRaises(ValueError):
+            get_split("bootstrap")
+        with self.assertRaises(ValueError):
+            get_split("grouped")
+
+    def test_shuffled_is_seeded(self):
+        first = Shuffled(random_state=1).indices(self.df, "label", 0.8)[0]
+        second = Shuffled(random_state=1).indices(self.df, "label", 0.8)[0]
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(len(first), 160)
+
+    def test_stratified_keeps_class_shares(self):
+        train, test = Stratified(random_state=0).indices(
+            self.df, "label", 0.8)
+        counts = self.df["label"].iloc[train].value_counts()
+        self.assertEqual(counts.to_dict(), {"a": 96, "b": 40, "c": 16, "d": 8})
+
+    def test_stratified_without_classes(self):
+        data = pd.DataFrame({"label": [None] * 5}, dtype=object)
+        train, test = Stratified(random_state=0).indices(data, "label", 0.8)
+        self.assertEqual(len(train), 0)
+        np.testing.assert_array_equal(test, np.arange(5))
+
+    def test_grouped_separates_groups(self):
+        train, test = Grouped("group", random_state=0).indices(
+            self.df, "label", 0.8)
+        shared = np.intersect1d(self.df["group"].iloc[train],
+                                self.df["group"].iloc[test])
+        self.assertEqual(len(shared), 0)
+
+    def test_time_ordered(self):
+        train, test = TimeOrdered("time").indices(self.df, "label", 0.8)
+        self.assertLess(self.df["time"].iloc[train].max(),
+                        self.df["time"].iloc[test].min())
+
+    def test_pipeline_resplit(self):
+        dataset = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv", data=self.df)
+        pipeline = Pipeline(
+            dataset=dataset,
+            model=MultipleLinearRegression(),
+            input_features=[Feature(name="x", type="numerical")],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+            split_strategy=Shuffled(random_state=0),
+        )
+        pipeline.execute()
+        buffer = pipeline._split_buffers[0]
+        self.assertTrue(np.shares_memory(pipeline._train_X, buffer))
+        np.testing.assert_array_equal(
+            pipeline._test_X, pipeline._input_matrix[pipeline._test_rows])
+
+        results = pipeline.resplit(Grouped("group", random_state=0))
+        self.assertIs(pipeline._split_buffers[0], buffer)
+        np.testing.assert_array_equal(
+            pipeline._train_y, pipeline._output_vector[pipeline._train_rows])
+        self.assertEqual(len(results["test_predictions"]),
+                         len(pipeline._test_rows))
+
+    def test_loaded_pipeline_resplit(self):
+        dataset = Dataset.from_dataframe(
+            name="synthetic", asset_path="synthetic.csv", data=self.df)
+        pipeline = Pipeline(
+            dataset=dataset,
+            model=MultipleLinearRegression(),
+            input_features=[Feature(name="x", type="numerical")],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+        )
+        pipeline.execute()
+        with tempfile.TemporaryDirectory() as path:
+            pipeline.save("synthetic", "1", os.path.join(path, "p.pkl"))
+            loaded = Pipeline.load(os.path.join(path, "p.pkl"))
+        results = loaded.resplit(Grouped("group", random_state=0))
+        np.testing.assert_array_equal(
+            loaded._train_y, loaded._output_vector[loaded._train_rows])
+        self.assertEqual(len(results["test_predictions"]),
+                         len(loaded._test_rows))
@@ -0,0 +1,86 @@
+import unittest
+
+from autoop.core.database import Database
+from autoop.core.migrate import migrate
+from autoop.core.sqlite_database import SQLiteDatabase
+from autoop.core.storage import LocalStorage
+import os
+import random
+import tempfile
+
+class TestSQLiteDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "db.sqlite3")
+        self.db = SQLiteDatabase(self.path)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_init(self):
+        self.assertIsInstance(self.db, SQLiteDatabase)
+
+    def test_set(self):
+        id = str(random.randint(0, 100))
+        entry = {"key": random.randint(0, 100)}
+        self.db.set("collection", id, entry)
+        self.assertEqual(self.db.get("collection", id)["key"], entry["key"])
+
+    def test_delete(self):
+        id = str(random.randint(0, 100))
+        value = {"key": random.randint(0, 100)}
+        self.db.set("collection", id, value)
+        self.db.delete("collection", id)
+        self.assertIsNone(self.db.get("collection", id))
+        self.db.refresh()
+        self.assertIsNone(self.db.get("collection", id))
+
+    def test_persistance(self):
+        id = str(random.randint(0, 100))
+        value = {"key": random.randint(0, 100)}
+        other_db = SQLiteDatabase(self.path)
+        self.db.set("collection", id, value)
+        self.assertEqual(other_db.get("collection", id)["key"], value["key"])
+        other_db.close()
+
+    def test_list(self):
+        key = str(random.randint(0, 100))
+        value = {"key": random.randint(0, 100)}
+        self.db.set("collection", key, value)
+        self.assertIn((key, value), self.db.list("collection"))
+        self.assertEqual(self.db.list("missing"), [])
+
+    def test_find(self):
+        self.db.create_index("collection", "type")
+        self.db.create_index("collection", "tags")
+        self.db.set("collection", "a", {"type": "dataset", "tags": ["x"]})
+        self.db.set("collection", "b", {"type": "pipeline", "tags": ["x"]})
+        self.db.set("collection", "c", {"type": "dataset", "tags": []})
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", type="dataset")],
+            ["a", "c"])
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", type="dataset",
+                                          tags="x")], ["a"])
+        self.db.set("collection", "a", {"type": "pipeline", "tags": []})
+        self.assertEqual(
+            [id for id, _ in self.db.find("collection", type="dataset")],
+            ["c"])
+
+    def test_batch_rollback(self):
+        self.db.set("collection", "a", {"key": 1})
+        with self.assertRaises(RuntimeError):
+            with self.db.batch():
+                self.db.set("collection", "a", {"key": 2})
+                self.db.set("collection", "b", {"key": 3})
+                raise RuntimeError()
+        self.assertEqual(self.db.get("collection", "a"), {"key": 1})
+        self.assertIsNone(self.db.get("collection", "b"))
+
+    def test_migrate(self):
+        source = Database(LocalStorage(tempfile.mkdtemp()))
+        source.set("collection", "a", {"key": 1})
+        source.set("other", "b", {"key": 2})
+        self.assertEqual(migrate(source, self.db), 2)
+        self.assertEqual(self.db.get("collection", "a"), {"key": 1})
+        self.assertEqual(self.db.get("other", "b"), {"key": 2})
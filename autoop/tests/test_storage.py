@@ -1,7 +1,16 @@
 
 import unittest
 
-from autoop.core.storage import LocalStorage, NotFoundError
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import MeanSquaredError
+from autoop.core.ml.model.regression import MultipleLinearRegression
+from autoop.core.ml.pipeline import Pipeline
+from autoop.core.storage import AsyncStorage, LocalStorage, NotFoundError
+import asyncio
 import random
 import tempfile
 import os
@@ -48,4 +57,138 @@ class TestStorage(unittest.TestCase):
         keys = self.storage.list("test")
         keys = [f"{os.sep}".join(key.split(f"{os.sep}")[-2:]) for key in keys]
         self.assertEqual(set(keys), set(random_keys))
-        
\ No newline at end of file
+        
+    def test_atomic_save(self):
+        key = f"test{os.sep}path"
+        self.storage.save(b"first", key)
+        self.storage.save(b"second", key)
+        self.assertEqual(self.storage.load(key), b"second")
+        # no temporary files are left behind or listed
+        self.assertEqual(os.listdir(os.path.dirname(
+            self.storage._join_path(key))), ["path"])
+        self.assertEqual(self.storage.list("test"), [key])
+
+    def test_lock(self):
+        with self.storage.lock("a", "b"):
+            self.storage.save(b"data", "a")
+        self.assertEqual(self.storage.list(""), ["a"])
+
+    def test_iter_keys_pages(self):
+        keys = [os.path.join("b", "x"), "a", os.path.join("b", "a", "z"),
+                os.path.join("c", "y"), os.path.join("a0", "k")]
+        for key in keys:
+            self.storage.save(b"data", key)
+        self.storage.save(b"hidden", os.path.join("b", ".hidden"))
+        expected = ["a", os.path.join("a0", "k"), os.path.join("b", "a", "z"),
+                    os.path.join("b", "x"), os.path.join("c", "y")]
+        self.assertEqual(list(self.storage.iter_keys()), expected)
+        pages, start_after = [], None
+        while True:
+            page = list(self.storage.iter_keys("", start_after, limit=2))
+            if not page:
+                break
+            pages.append(page)
+            start_after = page[-1]
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+        self.assertEqual(list(self.storage.iter_keys("b")), expected[2:4])
+        scanned = dict(self.storage.scan("c"))
+        self.assertEqual(scanned[os.path.join("c", "y")][0], 4)
+
+    def test_manifest(self):
+        path = self.storage._base_path
+        self.storage.save(b"data", os.path.join("old", "1"))
+        storage = LocalStorage(path, manifest=True)
+        other = LocalStorage(path, manifest=True)
+        self.assertEqual(storage.list(""), [os.path.join("old", "1")])
+        storage.save(b"data", os.path.join("new", "2"))
+        other.delete(os.path.join("old", "1"))
+        self.assertEqual(storage.list(""), [os.path.join("new", "2")])
+        self.assertEqual(list(other.iter_keys("new")),
+                         [os.path.join("new", "2")])
+        # files written around the storage need a rebuild
+        with open(os.path.join(path, "outside"), "wb") as f:
+            f.write(b"data")
+        self.assertNotIn("outside", storage.list(""))
+        storage.rebuild_manifest()
+        self.assertIn("outside", other.list(""))
+
+    def test_manifest_compaction(self):
+        storage = LocalStorage(self.storage._base_path, manifest=True)
+        for i in range(500):
+            storage.save(b"data", f"key{i % 5}")
+        manifest = os.path.join(self.storage._base_path, ".manifest")
+        self.assertLess(os.path.getsize(manifest), 5000)
+        self.assertEqual(len(storage.list("")), 5)
+
+    def test_streaming(self):
+        key = f"stream{os.sep}blob"
+        with self.storage.open_write(key) as f:
+            for i in range(10):
+                f.write(bytes([i]) * 100)
+        self.assertEqual(self.storage.size(key), 1000)
+        self.assertEqual(self.storage.load_range(key, 250, 100),
+                         bytes([2]) * 50 + bytes([3]) * 50)
+        self.assertEqual(self.storage.load_range(key, 990, 100),
+                         bytes([9]) * 10)
+        with self.storage.open_read(key) as f:
+            self.assertEqual(f.read(), self.storage.load(key))
+        with self.assertRaises(NotFoundError):
+            self.storage.open_read("missing")
+        with self.assertRaises(NotFoundError):
+            self.storage.size("missing")
+
+    def test_failed_stream_keeps_data(self):
+        self.storage.save(b"old", "kept")
+        with self.assertRaises(RuntimeError):
+            with self.storage.open_write("kept") as f:
+                f.write(b"new")
+                raise RuntimeError
+        self.assertEqual(self.storage.load("kept"), b"old")
+        self.assertEqual(self.storage.list(""), ["kept"])
+
+    def test_pipeline_round_trip(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"a": rng.normal(size=100)})
+        df["target"] = 2 * df["a"]
+        pipeline = Pipeline(
+            dataset=Dataset.from_dataframe(
+                name="synthetic", asset_path="synthetic.csv", data=df),
+            model=MultipleLinearRegression(),
+            input_features=[Feature(name="a", type="numerical")],
+            target_feature=Feature(name="target", type="numerical"),
+            metrics=[MeanSquaredError()],
+        )
+        pipeline.execute()
+        pipeline.save_to(self.storage, "pipeline.pkl")
+        loaded = Pipeline.load_from(self.storage, "pipeline.pkl")
+        np.testing.assert_allclose(
+            loaded.model.predict(pipeline._test_X), pipeline._predictions)
+
+    def test_load_and_save_many(self):
+        items = [(bytes([i]) * 10, f"many{os.sep}{i}") for i in range(40)]
+        self.storage.save_many(items, max_workers=4)
+        loaded = self.storage.load_many([key for _, key in items])
+        self.assertEqual(loaded, [data for data, _ in items])
+        with self.assertRaises(NotFoundError):
+            self.storage.load_many(["many/0", "missing"])
+
+    def test_async_storage(self):
+        storage = AsyncStorage(self.storage, max_workers=4)
+
+        async def run():
+            await storage.save_many(
+                [(str(i).encode(), f"async{os.sep}{i}") for i in range(20)],
+                limit=3)
+            await storage.save(b"single", "single")
+            keys = await storage.list("async")
+            data = await storage.load_many(keys)
+            await storage.delete("single")
+            return keys, data, await storage.list("")
+
+        keys, data, remaining = asyncio.run(run())
+        storage.close()
+        self.assertEqual(len(keys), 20)
+        self.assertEqual(data, [key.split(os.sep)[-1].encode()
+                                for key in keys])
+        self.assertNotIn("single", remaining)
+
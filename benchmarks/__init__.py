@@ -0,0 +1,3 @@
+"""
+This package contains the offline performance benchmarks.
+"""
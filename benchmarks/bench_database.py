@@ -0,0 +1,104 @@
+"""
+Compares the JSON-file Database with the SQLiteDatabase.
+
+Usage:
+    python -m benchmarks.bench_database --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from autoop.core.database import Database
+from autoop.core.sqlite_database import SQLiteDatabase
+from autoop.core.storage import LocalStorage
+from benchmarks.common import artifact_entries, measure, report
+
+
+def _populate_json(directory: str, entries: list) -> None:
+    """
+    Writes the entries in the JSON-file layout of Database directly.
+
+    Populating through Database.set would rewrite every record on each call.
+    """
+    collection = os.path.join(directory, "artifacts")
+    os.makedirs(collection, exist_ok=True)
+    for i, entry in enumerate(entries):
+        with open(os.path.join(collection, str(i)), "w") as f:
+            json.dump(entry, f)
+
+
+def bench_json(entries: list, lookups: list, repeat: int) -> dict:
+    """
+    Benchmarks the JSON-file Database.
+    """
+    directory = tempfile.mkdtemp()
+    _populate_json(directory, entries)
+    storage = LocalStorage(directory)
+    results = {"load": measure(lambda: Database(storage), repeat)}
+    database = Database(storage)
+    database.create_index("artifacts", "type")
+    results["get x1000"] = measure(
+        lambda: [database.get("artifacts", id) for id in lookups], repeat)
+    results["find type"] = measure(
+        lambda: database.find("artifacts", type="dataset"), repeat)
+    results["list"] = measure(
+        lambda: database.list("artifacts"), repeat)
+    results["refresh"] = measure(database.refresh, repeat)
+    results["set x1"] = measure(
+        lambda: database.set("artifacts", "new", entries[0]), repeat)
+    return results
+
+
+def bench_sqlite(entries: list, lookups: list, repeat: int) -> dict:
+    """
+    Benchmarks the SQLiteDatabase.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "db.sqlite3")
+    database = SQLiteDatabase(path)
+    database.create_index("artifacts", "type")
+
+    def insert() -> None:
+        with database.batch():
+            for i, entry in enumerate(entries):
+                database.set("artifacts", str(i), entry)
+
+    results = {"batch insert": measure(insert, 1)}
+    results["load"] = measure(lambda: SQLiteDatabase(path).close(), repeat)
+    results["get x1000"] = measure(
+        lambda: [database.get("artifacts", id) for id in lookups], repeat)
+    results["find type"] = measure(
+        lambda: database.find("artifacts", type="dataset"), repeat)
+    results["list"] = measure(
+        lambda: database.list("artifacts"), repeat)
+    results["refresh"] = measure(database.refresh, repeat)
+    results["set x1"] = measure(
+        lambda: database.set("artifacts", "new", entries[0]), repeat)
+    database.close()
+    return results
+
+
+def main() -> None:
+    """
+    Runs the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10000, 50000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    results = {}
+    for size in args.sizes:
+        entries = artifact_entries(size)
+        lookups = [str(random.randrange(size)) for _ in range(1000)]
+        results[f"json {size}"] = bench_json(entries, lookups, args.repeat)
+        results[f"sqlite {size}"] = bench_sqlite(entries, lookups,
+                                                 args.repeat)
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures prediction latency at small and large batch sizes.
+
+Every model is timed with its own prediction path, which evaluates the
+learned coefficients or the compiled trees directly, and with the predict
+of the fitted scikit-learn estimator it wraps.
+
+Usage:
+    python -m benchmarks.bench_inference --batch-sizes 1 32 1024
+"""
+import argparse
+
+import numpy as np
+
+from autoop.core.ml.model.classification import Random_forest
+from autoop.core.ml.model.regression import (
+    GradientBoostingR, Lasso, MultipleLinearRegression
+)
+from benchmarks.common import measure, report
+
+
+def main() -> None:
+    """
+    Runs the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 32, 1024])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    observations = rng.normal(size=(args.rows, args.features))
+    values = observations @ rng.normal(size=args.features)
+    labels = (values > 0).astype(int)
+    models = {
+        "linear regression": (MultipleLinearRegression(), values, None),
+        "lasso": (Lasso(), values, "_ls"),
+        "random forest": (Random_forest(random_state=0), labels, "_rfc"),
+        "boosting exact": (GradientBoostingR(random_state=0), values,
+                           "_gbr"),
+        "boosting histogram": (
+            GradientBoostingR(engine="histogram", random_state=0), values,
+            "_gbr"),
+    }
+    results = {}
+    for name, (model, targets, estimator) in models.items():
+        model.fit(observations, targets)
+        case = {}
+        for batch_size in args.batch_sizes:
+            batch = observations[:batch_size]
+            case[f"predict batch {batch_size}"] = measure(
+                lambda: model.predict(batch), args.repeat)
+            if estimator is not None:
+                fitted = getattr(model, estimator)
+                case[f"scikit-learn batch {batch_size}"] = measure(
+                    lambda: fitted.predict(batch), args.repeat)
+        results[name] = case
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures KNN predict latency against the training size per search backend.
+
+Usage:
+    python -m benchmarks.bench_knn --sizes 10000 100000 --features 16
+"""
+import argparse
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from autoop.core.ml.model.classification import KNN
+from autoop.core.ml.model.classification.k_nearest_nerighbors import (
+    ALGORITHMS
+)
+from autoop.core.ml.model.classification.random_projection_forest import (
+    RandomProjectionForest
+)
+from benchmarks.common import measure, report
+
+
+def recall(size: int, features: int, queries: int, k: int,
+           n_trees: int) -> float:
+    """
+    Computes the fraction of the true k nearest neighbors found by the
+    approximate index.
+    """
+    rng = np.random.default_rng(1)
+    points = rng.normal(size=(size, features))
+    query = rng.normal(size=(queries, features))
+    _, exact = NearestNeighbors(n_neighbors=k).fit(points).kneighbors(query)
+    index = RandomProjectionForest(n_trees=n_trees)
+    index.build(points)
+    _, found = index.query(query, k)
+    hits = [len(set(a) & set(b)) for a, b in zip(found, exact)]
+    return sum(hits) / (k * queries)
+
+
+def main() -> None:
+    """
+    Runs the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--n-trees", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    results = {}
+    for size in args.sizes:
+        observations = rng.normal(size=(size, args.features))
+        labels = rng.integers(0, 5, size)
+        queries = rng.normal(size=(args.queries, args.features))
+        case = {}
+        for algorithm in ALGORITHMS:
+            trees = args.n_trees if algorithm == "approximate" else [None]
+            for n_trees in trees:
+                name = algorithm if n_trees is None \
+                    else f"{algorithm} ({n_trees} trees)"
+                model = KNN(k=args.k, algorithm=algorithm,
+                            n_jobs=args.n_jobs, n_trees=n_trees or 10)
+                model.fit(observations, labels)
+                case[f"predict {name}"] = measure(
+                    lambda: model.predict(queries), args.repeat)
+        results[f"knn {size}x{args.features}"] = case
+    report(results, args.output)
+    for n_trees in args.n_trees:
+        value = recall(args.sizes[-1], args.features, 200, args.k, n_trees)
+        print(f"recall@{args.k} with {n_trees} trees: {value:.3f}")
+
+
+if __name__ == "__main__":
+    main()
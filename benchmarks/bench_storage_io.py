@@ -0,0 +1,90 @@
+"""
+Compares sequential, thread-pool and async loading of many blobs, with a
+warm and a cold page cache.
+
+The cold runs drop the blobs from the page cache before every repetition
+with posix_fadvise(POSIX_FADV_DONTNEED), which needs Linux; elsewhere only
+the warm runs are measured. Overlapping loads pays off most on cold
+caches and on storage with high latency, such as network file systems.
+
+Usage:
+    python -m benchmarks.bench_storage_io --blobs 1000 --size 65536
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from typing import Callable, List
+
+from autoop.core.storage import AsyncStorage, LocalStorage
+from benchmarks.common import measure, report
+
+
+def drop_cache(paths: List[str]) -> None:
+    """
+    Asks the kernel to drop the cached pages of the files.
+    """
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def cold(function: Callable[[], object],
+         paths: List[str]) -> Callable[[], object]:
+    """
+    Wraps a function so it starts on a cold page cache.
+
+    The time to drop the cache is included, it is the same for every
+    loading strategy.
+    """
+    def run() -> object:
+        drop_cache(paths)
+        return function()
+    return run
+
+
+def main() -> None:
+    """
+    Runs the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blobs", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=64 * 1024)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        storage = LocalStorage(directory)
+        keys = [f"blobs/{i}" for i in range(args.blobs)]
+        storage.save_many([(os.urandom(args.size), key) for key in keys])
+        paths = [os.path.join(directory, key) for key in keys]
+
+        loaders = {"sequential": lambda: [storage.load(key) for key in keys]}
+        for workers in args.workers:
+            loaders[f"load_many workers={workers}"] = (
+                lambda workers=workers: storage.load_many(keys, workers))
+            async_storage = AsyncStorage(storage, max_workers=workers)
+            loaders[f"async load_many workers={workers}"] = (
+                lambda async_storage=async_storage: asyncio.run(
+                    async_storage.load_many(keys)))
+
+        cache_states = {"warm": lambda function: function}
+        if hasattr(os, "posix_fadvise"):
+            cache_states["cold"] = lambda function: cold(function, paths)
+        for state, wrap in cache_states.items():
+            results[f"{state} cache {args.blobs} x {args.size} B"] = {
+                name: measure(wrap(load), args.repeat)
+                for name, load in loaders.items()
+            }
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
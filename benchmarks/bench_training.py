@@ -0,0 +1,55 @@
+"""
+Measures model fit times for a growing number of cores.
+
+Usage:
+    python -m benchmarks.bench_training --rows 100000 --n-jobs 1 -1
+"""
+import argparse
+
+import numpy as np
+
+from autoop.core.ml.model.classification import Random_forest
+from autoop.core.ml.model.regression import GradientBoostingR, Lasso
+from benchmarks.common import measure, report
+
+
+def main() -> None:
+    """
+    Runs the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    models = {
+        "random forest": lambda **resources: Random_forest(**resources),
+        "lasso": lambda **resources: Lasso(**resources),
+        "boosting exact": lambda **resources: GradientBoostingR(
+            engine="exact", **resources),
+        "boosting histogram": lambda **resources: GradientBoostingR(
+            engine="histogram", **resources),
+    }
+    results = {}
+    for rows in args.rows:
+        observations = rng.normal(size=(rows, args.features))
+        weights = rng.normal(size=args.features)
+        values = observations @ weights + rng.normal(size=rows)
+        labels = (values > 0).astype(int)
+        case = {}
+        for name, create in models.items():
+            targets = labels if name == "random forest" else values
+            for n_jobs in args.n_jobs:
+                model = create(n_jobs=n_jobs, random_state=0)
+                case[f"fit {name} n_jobs={n_jobs}"] = measure(
+                    lambda: model.fit(observations, targets), args.repeat)
+        results[f"training {rows}x{args.features}"] = case
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
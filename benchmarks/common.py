@@ -0,0 +1,170 @@
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from autoop.core.ml.model.classification import (
+    KNN, Neural_network_classifier, Random_forest
+)
+from autoop.core.ml.model.regression import (
+    GradientBoostingR, Lasso, MultipleLinearRegression
+)
+
+# the models the benchmarks train, created with fixed seeds
+REGRESSION_MODELS = {
+    "linear regression": lambda: MultipleLinearRegression(),
+    "lasso": lambda: Lasso(random_state=0),
+    "boosting": lambda: GradientBoostingR(random_state=0),
+}
+CLASSIFICATION_MODELS = {
+    "knn": lambda: KNN(),
+    "random forest": lambda: Random_forest(random_state=0),
+    "neural network": lambda: Neural_network_classifier(random_state=0),
+}
+
+
+def measure(function: Callable[[], object], repeat: int = 5) -> dict:
+    """
+    Times repeated calls of a function.
+
+    Args:
+        function (Callable): The function to time, called without arguments.
+        repeat (int): How many times to call it.
+
+    Returns:
+        dict: The minimum, median, 99th percentile and maximum wall time
+        in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "p99": _percentile(timings, 0.99),
+        "max": max(timings),
+    }
+
+
+def _percentile(timings: List[float], fraction: float) -> float:
+    """
+    Returns the timing below which the given fraction of timings lie.
+    """
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(results: Dict[str, Dict[str, dict]], output: str = None) -> None:
+    """
+    Prints benchmark results as a table and optionally writes them as JSON.
+
+    Args:
+        results (Dict[str, Dict[str, dict]]): The timings per operation,
+            per benchmark case.
+        output (str): Path of the JSON file to write, if any.
+    """
+    for case, operations in results.items():
+        print(f"\n{case}")
+        for operation, timing in operations.items():
+            print(f"  {operation:<36} median {timing['median'] * 1e3:10.3f} ms"
+                  f"   p99 {timing['p99'] * 1e3:10.3f} ms"
+                  f"   min {timing['min'] * 1e3:10.3f} ms")
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def artifact_entries(count: int) -> List[dict]:
+    """
+    Generates artifact-like database entries.
+
+    Args:
+        count (int): The number of entries.
+
+    Returns:
+        List[dict]: The entries, spread over a few types, names and tags.
+    """
+    types = ["dataset", "pipeline", "model"]
+    return [
+        {
+            "name": f"artifact_{i % 1000}",
+            "version": str(i // 1000),
+            "asset_path": f"objects/{i}",
+            "tags": [f"tag_{i % 7}"],
+            "metadata": {},
+            "type": types[i % len(types)],
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_frame(rows: int, columns: int, cardinality: int,
+                    seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a dataset with learnable regression and classification targets.
+
+    Args:
+        rows (int): The number of rows.
+        columns (int): The number of input columns, half of them
+            numerical and half categorical.
+        cardinality (int): The number of categories of every categorical
+            column.
+        seed (int): The seed of the generator.
+
+    Returns:
+        DataFrame: The input columns "num_<i>" and "cat_<i>", a numerical
+        "target" and a three-class "label" derived from the inputs.
+    """
+    rng = np.random.default_rng(seed)
+    n_numerical = (columns + 1) // 2
+    numerical = rng.normal(size=(rows, n_numerical))
+    frame = {f"num_{i}": numerical[:, i] for i in range(n_numerical)}
+    signal = numerical @ rng.normal(size=n_numerical)
+    for i in range(columns - n_numerical):
+        codes = rng.integers(0, cardinality, size=rows)
+        frame[f"cat_{i}"] = np.char.add("c", codes.astype(str))
+        signal += rng.normal(size=cardinality)[codes]
+    frame["target"] = signal + rng.normal(size=rows)
+    frame["label"] = np.array(["low", "mid", "high"])[
+        np.digitize(signal, np.quantile(signal, [1 / 3, 2 / 3]))]
+    return pd.DataFrame(frame)
+
+
+def compare(results: Dict[str, Dict[str, dict]],
+            baseline: Dict[str, Dict[str, dict]],
+            threshold: float = 0.2) -> List[str]:
+    """
+    Prints the median timings next to a stored baseline.
+
+    Args:
+        results (Dict[str, Dict[str, dict]]): The timings per operation,
+            per benchmark case, as passed to report.
+        baseline (Dict[str, Dict[str, dict]]): Earlier results in the
+            same layout, as written by report.
+        threshold (float): The relative slowdown of the median above which
+            an operation counts as a regression.
+
+    Returns:
+        List[str]: The "<case>: <operation>" names of the regressions.
+    """
+    regressions = []
+    for case, operations in results.items():
+        print(f"\n{case}")
+        for operation, timing in operations.items():
+            before = baseline.get(case, {}).get(operation)
+            if before is None:
+                print(f"  {operation:<36} new")
+                continue
+            ratio = timing["median"] / before["median"]
+            status = "REGRESSION" if ratio > 1 + threshold else "ok"
+            print(f"  {operation:<36} median {before['median'] * 1e3:10.3f}"
+                  f" -> {timing['median'] * 1e3:10.3f} ms"
+                  f"   x{ratio:6.2f}  {status}")
+            if status != "ok":
+                regressions.append(f"{case}: {operation}")
+    return regressions
@@ -0,0 +1,262 @@
+"""
+Runs the offline benchmark suite over storage, the database, the artifact
+registry, preprocessing, pipelines and metrics.
+
+Everything runs on generated data in a temporary directory, so the suite
+needs no network access and leaves the assets untouched. With --baseline
+the medians are compared with an earlier --output file, and the suite
+exits with status 1 when an operation became slower than the threshold.
+
+Usage:
+    python -m benchmarks.suite --rows 10000 --output baseline.json
+    python -m benchmarks.suite --rows 10000 --baseline baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.system import ArtifactRegistry
+from autoop.core.database import Database
+from autoop.core.ml.artifact import Artifact
+from autoop.core.ml.columnar import ingest_csv
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.design_matrix import DesignMatrixBuilder
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import METRICS, get_metric
+from autoop.core.ml.pipeline import Pipeline
+from autoop.core.storage import LocalStorage
+from autoop.functional.preprocessing import preprocess_features
+from benchmarks.common import (
+    CLASSIFICATION_MODELS, REGRESSION_MODELS, artifact_entries, compare,
+    measure, report, synthetic_frame
+)
+
+SECTIONS = ["storage", "database", "registry", "preprocessing", "pipeline",
+            "metrics"]
+REGRESSION_METRICS = ["mean_squared_error", "mean_absolute_error",
+                      "r-squared"]
+
+
+def bench_storage(directory: str, blobs: int, size: int,
+                  repeat: int) -> dict:
+    """
+    Benchmarks LocalStorage on many small blobs.
+    """
+    storage = LocalStorage(os.path.join(directory, "storage"))
+    data = os.urandom(size)
+    keys = [f"blobs/{i}" for i in range(blobs)]
+
+    def save() -> None:
+        for key in keys:
+            storage.save(data, key)
+
+    results = {f"save x{blobs}": measure(save, repeat)}
+    results[f"load x{blobs}"] = measure(
+        lambda: [storage.load(key) for key in keys], repeat)
+    results["list"] = measure(lambda: storage.list("blobs"), repeat)
+    results["first page of 100"] = measure(
+        lambda: list(storage.iter_keys("blobs", limit=100)), repeat)
+    indexed = LocalStorage(os.path.join(directory, "storage"), manifest=True)
+    results["list manifest"] = measure(
+        lambda: indexed.list("blobs"), repeat)
+    results["page of 100 manifest"] = measure(
+        lambda: list(indexed.iter_keys("blobs", start_after=keys[blobs // 2],
+                                       limit=100)), repeat)
+    return results
+
+
+def bench_database(directory: str, entries: List[dict],
+                   repeat: int) -> dict:
+    """
+    Benchmarks the JSON-file Database holding many entries.
+    """
+    database = Database(LocalStorage(os.path.join(directory, "database")))
+
+    def populate() -> None:
+        with database.batch():
+            for i, entry in enumerate(entries):
+                database.set("artifacts", str(i), entry)
+
+    results = {f"batch set x{len(entries)}": measure(populate, 1)}
+    results["set x1"] = measure(
+        lambda: database.set("artifacts", "new", entries[0]), repeat)
+    results["refresh"] = measure(database.refresh, repeat)
+    return results
+
+
+def bench_registry(directory: str, count: int, repeat: int) -> dict:
+    """
+    Benchmarks registering and listing artifacts.
+    """
+    registry = ArtifactRegistry(
+        Database(LocalStorage(os.path.join(directory, "registry_db"))),
+        LocalStorage(os.path.join(directory, "registry_objects")))
+    types = ["dataset", "pipeline", "model"]
+    artifacts = [
+        Artifact(name=f"artifact_{i}", type=types[i % len(types)],
+                 asset_path=f"artifacts/{i}", data=b"x" * 64, version="1")
+        for i in range(count)
+    ]
+    results = {f"register_many x{count}": measure(
+        lambda: registry.register_many(artifacts), 1)}
+    results["list"] = measure(registry.list, repeat)
+    results["list type"] = measure(
+        lambda: registry.list(type="dataset"), repeat)
+    return results
+
+
+def bench_preprocessing(dataset: Dataset, features: List[Feature],
+                        repeat: int) -> dict:
+    """
+    Benchmarks the per-feature preprocessing and the design matrix builder.
+    """
+    def per_feature() -> None:
+        # preprocess_features prints every feature name
+        with contextlib.redirect_stdout(io.StringIO()):
+            preprocess_features(features, dataset)
+
+    data = dataset.read()
+    columnar = io.BytesIO()
+    summary = ingest_csv(io.BytesIO(dataset.data), columnar)
+    ingested = Dataset(name="ingested", asset_path="ingested",
+                       data=columnar.getvalue(),
+                       metadata={"profile": summary})
+    projection = [feature.name for feature in features[:3]]
+    return {
+        "read dataset": measure(dataset.read, repeat),
+        "read 3 columns": measure(
+            lambda: dataset.read(columns=projection), repeat),
+        "ingest columnar": measure(
+            lambda: ingest_csv(io.BytesIO(dataset.data), io.BytesIO()),
+            repeat),
+        "read columnar": measure(ingested.read, repeat),
+        "read columnar 3 columns": measure(
+            lambda: ingested.read(columns=projection), repeat),
+        "read columnar compact": measure(
+            lambda: ingested.read(compact=True), repeat),
+        "preprocess_features": measure(per_feature, repeat),
+        "design matrix": measure(
+            lambda: DesignMatrixBuilder(features).build(data), repeat),
+    }
+
+
+def bench_pipelines(dataset: Dataset, features: List[Feature],
+                    repeat: int) -> dict:
+    """
+    Benchmarks Pipeline.execute for every model.
+    """
+    results = {}
+    cases = [
+        (REGRESSION_MODELS, Feature(name="target", type="numerical"),
+         REGRESSION_METRICS),
+        (CLASSIFICATION_MODELS, Feature(name="label", type="categorical"),
+         ["accuracy"]),
+    ]
+    for models, target, metrics in cases:
+        for name, create in models.items():
+            def execute() -> None:
+                Pipeline(
+                    metrics=[get_metric(metric) for metric in metrics],
+                    dataset=dataset,
+                    model=create(),
+                    input_features=features,
+                    target_feature=target,
+                ).execute()
+
+            results[f"execute {name}"] = measure(execute, repeat)
+    return results
+
+
+def bench_metrics(rows: int, repeat: int) -> dict:
+    """
+    Benchmarks every metric on generated predictions.
+    """
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=rows)
+    labels = np.eye(3)[rng.integers(0, 3, size=rows)]
+    predicted = np.eye(3)[rng.integers(0, 3, size=rows)]
+    results = {}
+    for name in METRICS:
+        metric = get_metric(name)
+        if name in REGRESSION_METRICS:
+            ground, prediction = values, values + rng.normal(size=rows)
+        else:
+            ground, prediction = labels, predicted
+        results[name] = measure(
+            lambda: metric.evaluate(ground, prediction), repeat)
+    return results
+
+
+def main() -> None:
+    """
+    Runs the suite from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--cardinality", type=int, default=10)
+    parser.add_argument("--entries", type=int, default=10000,
+                        help="database and registry size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS,
+                        default=SECTIONS)
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None,
+                        help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows, args.columns, args.cardinality)
+    dataset = Dataset.from_dataframe(frame, name="synthetic",
+                                     asset_path="synthetic.csv")
+    features = [
+        Feature(name=name, type="numerical" if name.startswith("num_")
+                else "categorical")
+        for name in frame.columns if name not in ["target", "label"]
+    ]
+    shape = f"{args.rows}x{args.columns}/{args.cardinality}"
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if "storage" in args.sections:
+            results["storage 1000 blobs of 4 KiB"] = bench_storage(
+                directory, 1000, 4096, args.repeat)
+        if "database" in args.sections:
+            results[f"database {args.entries}"] = bench_database(
+                directory, artifact_entries(args.entries), args.repeat)
+        if "registry" in args.sections:
+            results[f"registry {args.entries}"] = bench_registry(
+                directory, args.entries, args.repeat)
+    if "preprocessing" in args.sections:
+        results[f"preprocessing {shape}"] = bench_preprocessing(
+            dataset, features, args.repeat)
+    if "pipeline" in args.sections:
+        results[f"pipeline {shape}"] = bench_pipelines(
+            dataset, features, args.repeat)
+    if "metrics" in args.sections:
+        results[f"metrics {args.rows}"] = bench_metrics(args.rows,
+                                                        args.repeat)
+
+    report(results, args.output)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
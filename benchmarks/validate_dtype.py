@@ -0,0 +1,133 @@
+"""
+Compares the metrics of float32 pipelines against float64 pipelines.
+
+Every bundled dataset is modelled twice per model, once with each dtype
+policy, and the drift of the test metrics is reported next to the memory
+of the training design matrix. For regression the last numerical column
+is predicted from the other numerical columns, for classification the
+first categorical column with few classes is predicted from the numerical
+columns.
+
+Usage:
+    python -m benchmarks.validate_dtype --tolerance 0.01
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from autoop.core.ml.dataset import Dataset
+from autoop.core.ml.feature import Feature
+from autoop.core.ml.metric import get_metric
+from autoop.core.ml.model import Model
+from autoop.core.ml.pipeline import Pipeline
+from autoop.functional.feature import detect_feature_types
+from benchmarks.common import CLASSIFICATION_MODELS, REGRESSION_MODELS
+
+REGRESSION = {
+    "models": REGRESSION_MODELS,
+    "metrics": ["mean_squared_error", "mean_absolute_error", "r-squared"],
+}
+CLASSIFICATION = {
+    "models": CLASSIFICATION_MODELS,
+    "metrics": ["accuracy", "macro_precision", "macro_recall"],
+}
+MAX_CLASSES = 20
+
+
+def run(dataset: Dataset, create: Callable[[], Model],
+        metrics: List[str], inputs: List[Feature], target: Feature,
+        dtype: str) -> dict:
+    """
+    Runs a pipeline and collects its test metrics.
+
+    Returns:
+        dict: The test metrics and the size in bytes of the training
+        design matrix.
+    """
+    pipeline = Pipeline(
+        metrics=[get_metric(name) for name in metrics],
+        dataset=dataset,
+        model=create(),
+        input_features=inputs,
+        target_feature=target,
+        dtype=dtype,
+    )
+    results = pipeline.execute()
+    return {
+        "metrics": {name: float(value) for name, (_, value)
+                    in zip(metrics, results["test_metrics"])},
+        "matrix_bytes": pipeline._train_X.nbytes,
+    }
+
+
+def cases(path: str) -> List[dict]:
+    """
+    Chooses the regression and classification tasks of a dataset.
+    """
+    data = pd.read_csv(path)
+    dataset = Dataset.from_dataframe(
+        data, name=os.path.basename(path), asset_path=path)
+    features = detect_feature_types(dataset)
+    numerical = [f for f in features if f.type == "numerical"]
+    few_classes = data.nunique() <= MAX_CLASSES
+    categorical = [f for f in features if f.type == "categorical"
+                   if few_classes[f.name]]
+    tasks = []
+    if len(numerical) > 1:
+        tasks.append({"dataset": dataset, "task": REGRESSION,
+                      "inputs": numerical[:-1], "target": numerical[-1]})
+    if numerical and categorical:
+        tasks.append({"dataset": dataset, "task": CLASSIFICATION,
+                      "inputs": numerical, "target": categorical[0]})
+    return tasks
+
+
+def main() -> None:
+    """
+    Runs the validation from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--datasets", default="CSV_datasets",
+                        help="directory of the CSV files to validate on")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="largest accepted drift of a metric")
+    parser.add_argument("--output", default=None,
+                        help="write the results to this JSON file")
+    args = parser.parse_args()
+    results: Dict[str, dict] = {}
+    failed = False
+    for path in sorted(glob.glob(os.path.join(args.datasets, "*.csv"))):
+        for case in cases(path):
+            task = case["task"]
+            for name, create in task["models"].items():
+                runs = {
+                    dtype: run(case["dataset"], create, task["metrics"],
+                               case["inputs"], case["target"], dtype)
+                    for dtype in ["float64", "float32"]
+                }
+                single, double = (runs["float32"]["metrics"],
+                                  runs["float64"]["metrics"])
+                drift = {metric: abs(single[metric] - double[metric])
+                         for metric in task["metrics"]}
+                key = f"{case['dataset'].name} {case['target'].name} {name}"
+                results[key] = {**runs, "drift": drift}
+                worst = max(drift.values())
+                status = "ok" if worst <= args.tolerance else "DRIFT"
+                failed = failed or status != "ok"
+                print(f"{key:<60} max drift {worst:.2e}  matrix "
+                      f"{runs['float64']['matrix_bytes']:>8} -> "
+                      f"{runs['float32']['matrix_bytes']:>8} bytes  "
+                      f"{status}")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()